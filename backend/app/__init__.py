@@ -1,5 +1,6 @@
 from flask import Flask
-from .extensions import db, migrate, limiter, cache, cors, guard, blacklist, mail
+from .extensions import db, migrate, limiter, cache, cors, guard, mail
+from .token_blacklist import blacklist
 from .models.usuario import Usuario
 from .routes.alumnos import alumnos_bp
 from .routes.auto import autos_bp
@@ -17,6 +18,10 @@ from .routes.paquetes import paquetes_bp
 from .routes.admin_tareas import admin_tareas_bp
 from .routes.health import health_bp
 from .error_handlers import register_error_handlers
+from .instrumentacion_sql import registrar_instrumentacion_sql
+from .metricas import registrar_metricas
+from .services.hash_service import configurar_hash
+from .plantillas_correo import precompilar_plantillas
 
 def create_app():
     app = Flask(__name__)
@@ -30,8 +35,13 @@ def create_app():
     cors.init_app(app)
     guard.init_app(app, Usuario, is_blacklisted=blacklist.is_blacklisted)
     mail.init_app(app) 
+    configurar_hash(app)
+    precompilar_plantillas()
 
     register_error_handlers(app)
+    registrar_metricas(app)
+    if app.config["SQL_INSTRUMENTACION"]:
+        registrar_instrumentacion_sql(app)
 
     # Registrar blueprints
     app.register_blueprint(health_bp, url_prefix="/api")
@@ -50,4 +60,22 @@ def create_app():
     app.register_blueprint(paquetes_bp, url_prefix="/api/paquetes")
     app.register_blueprint(admin_tareas_bp, url_prefix="/api/admin-tareas")
 
-    return app
\ No newline at end of file
+    precalentar_pool(app)
+
+    return app
+
+def precalentar_pool(app):
+    # Abre conexiones al iniciar el worker para que la primera request no pague la conexion
+    cantidad = app.config["DB_POOL_PRECALENTAR"]
+    if not cantidad or not app.config.get("SQLALCHEMY_DATABASE_URI"):
+        return
+    with app.app_context():
+        conexiones = []
+        try:
+            for _ in range(cantidad):
+                conexiones.append(db.engine.connect())
+        except Exception as e:
+            app.logger.warning(f"No se pudo precalentar el pool de conexiones: {e}")
+        finally:
+            for conexion in conexiones:
+                conexion.close()
\ No newline at end of file
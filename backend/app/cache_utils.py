@@ -0,0 +1,51 @@
+import time
+from app.extensions import cache
+
+# Invalidacion por etiquetas: cada etiqueta guarda una version y las claves
+# cacheadas incluyen las versiones de sus etiquetas. Invalidar una etiqueta
+# cambia su version, por lo que todas las entradas asociadas dejan de usarse
+# en todos los workers sin tener que recorrer el backend de cache.
+
+def _clave_etiqueta(etiqueta):
+    return f"tag:{etiqueta}"
+
+def etiqueta_semana_bloques(fecha):
+    """Retorna la etiqueta de la semana ISO de una fecha, ej. bloques:week:2026-W42"""
+    anio, semana, _ = fecha.isocalendar()
+    return f"bloques:week:{anio}-W{semana:02d}"
+
+def versiones_etiquetas(etiquetas):
+    claves = [_clave_etiqueta(etiqueta) for etiqueta in etiquetas]
+    versiones = list(cache.get_many(*claves)) if claves else []
+
+    for i, version in enumerate(versiones):
+        if version is None:
+            # Primera vez que se usa la etiqueta
+            cache.add(claves[i], time.time_ns(), timeout=0)
+            versiones[i] = cache.get(claves[i])
+    return versiones
+
+def invalidar_etiquetas(*etiquetas):
+    for etiqueta in etiquetas:
+        cache.set(_clave_etiqueta(etiqueta), time.time_ns(), timeout=0)
+
+def clave_con_etiquetas(clave, etiquetas):
+    versiones = versiones_etiquetas(etiquetas)
+    return f"{clave}|" + ".".join(str(version) for version in versiones)
+
+def obtener_o_calcular(clave, etiquetas, funcion, timeout=None):
+    """
+    Retorna el valor cacheado para la clave o lo calcula y guarda
+
+    Args:
+        clave: clave base de la entrada
+        etiquetas: lista de etiquetas que invalidan la entrada
+        funcion: callable sin argumentos que calcula el valor
+        timeout: segundos de vida (None usa CACHE_DEFAULT_TIMEOUT)
+    """
+    clave_versionada = clave_con_etiquetas(clave, etiquetas)
+    valor = cache.get(clave_versionada)
+    if valor is None:
+        valor = funcion()
+        cache.set(clave_versionada, valor, timeout=timeout)
+    return valor
@@ -1,17 +1,83 @@
 import os
+import json
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def opciones_engine(uri):
+  """Opciones del pool de conexiones tomadas del entorno (SQLite no usa pool)"""
+  if not uri or uri.startswith("sqlite"):
+    return {}
+  opciones = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", 10)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),  # segundos, antes del corte del proveedor
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),  # segundos esperando una conexion libre
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() != "false",
+  }
+  # milisegundos, 0 sin limite (las migraciones y scripts masivos usan la misma configuracion)
+  statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT", 0))
+  if uri.startswith("postgres") and statement_timeout:
+    opciones["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+  return opciones
+
 class Config:
   SECRET_KEY = os.getenv("SECRET_KEY")
   CRON_API_TOKEN = os.getenv("CRON_API_TOKEN")
+  METRICAS_TOKEN = os.getenv("METRICAS_TOKEN")  # sin token /api/metrics responde 404
+  RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() != "false"  # desactivar solo en pruebas de carga
+  REPORTE_SNAPSHOT_MAX_EDAD = int(os.getenv("REPORTE_SNAPSHOT_MAX_EDAD", 60))  # segundos
+  # Horario de atencion por dia ("inicio-fin"), se divide en bloques de DURACION_BLOQUE_MINUTOS
+  HORARIOS_BLOQUES = json.loads(os.getenv("HORARIOS_BLOQUES", "null")) or {
+    "lunes": "07:00-18:00",
+    "martes": "07:00-18:00",
+    "miercoles": "07:00-18:00",
+    "jueves": "07:00-18:00",
+    "viernes": "07:00-18:00",
+    "sabado": "07:00-18:00",
+    "domingo": "07:00-12:00",  # Solo hasta mediodia
+  }
+  DURACION_BLOQUE_MINUTOS = int(os.getenv("DURACION_BLOQUE_MINUTOS", 60))
+  CAPACIDAD_BLOQUE = int(os.getenv("CAPACIDAD_BLOQUE", 5))
   SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
   SQLALCHEMY_TRACK_MODIFICATIONS = False
+  SQLALCHEMY_ENGINE_OPTIONS = opciones_engine(SQLALCHEMY_DATABASE_URI)
+  DB_POOL_PRECALENTAR = int(os.getenv("DB_POOL_PRECALENTAR", 2))  # conexiones abiertas al iniciar el worker
+  # Conteo y tiempo de sentencias SQL por request (header Server-Timing + log)
+  SQL_INSTRUMENTACION = os.getenv("SQL_INSTRUMENTACION", "false").lower() == "true"
+  SQL_UMBRAL_N_MAS_1 = int(os.getenv("SQL_UMBRAL_N_MAS_1", 10))  # repeticiones de una sentencia
   JWT_ACCESS_LIFESPAN = {"hours": 1}
   JWT_REFRESH_LIFESPAN = {"days": 7}
-  MAIL_SERVER = 'smtp.gmail.com'
-  MAIL_PORT = 587
-  MAIL_USE_TLS = True
+  # Hash de contraseñas en un pool de procesos por worker (0 = en el mismo proceso)
+  HASH_PROCESOS = int(os.getenv("HASH_PROCESOS", min(2, (os.cpu_count() or 1) - 1)))
+  HASH_ROUNDS = int(os.getenv("HASH_ROUNDS", 0)) or None  # None usa el costo por defecto de passlib
+  HASH_TIMEOUT = int(os.getenv("HASH_TIMEOUT", 30))  # segundos
+  USUARIO_CACHE_TTL = int(os.getenv("USUARIO_CACHE_TTL", 60))  # segundos
+  TOKEN_BLACKLIST_SINCRONIZACION = int(os.getenv("TOKEN_BLACKLIST_SINCRONIZACION", 5))  # segundos
+  TOKEN_BLACKLIST_PURGA = int(os.getenv("TOKEN_BLACKLIST_PURGA", 3600))  # segundos
+  TOKEN_BLACKLIST_MAX_CACHE = int(os.getenv("TOKEN_BLACKLIST_MAX_CACHE", 50000))
+  # Cache compartida entre workers: Redis si esta configurado, si no en disco
+  CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+  CACHE_TYPE = "RedisCache" if CACHE_REDIS_URL else "FileSystemCache"
+  CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "escuela-manejo-cache"))
+  CACHE_DEFAULT_TIMEOUT = 300
+  CACHE_THRESHOLD = int(os.getenv("CACHE_THRESHOLD", 2000))
+  # Busqueda de alumnos e instructores (ver busqueda_service.py)
+  BUSQUEDA_MIN_CARACTERES = int(os.getenv("BUSQUEDA_MIN_CARACTERES", 3))
+  BUSQUEDA_MAX_RESULTADOS = int(os.getenv("BUSQUEDA_MAX_RESULTADOS", 500))  # ids del indice en memoria (sin pg_trgm)
+  MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+  MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
+  MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() != "false"
+  MAIL_USE_SSL = os.getenv("MAIL_USE_SSL", "false").lower() == "true"
   MAIL_USERNAME = os.getenv("MAIL_USERNAME")
-  MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
\ No newline at end of file
+  MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+  MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER") or MAIL_USERNAME
+  # Bandeja de salida (correos_salientes)
+  MAIL_ENVIO_INMEDIATO = os.getenv("MAIL_ENVIO_INMEDIATO", "true").lower() != "false"  # false: solo el cron envia
+  MAIL_LOTE = int(os.getenv("MAIL_LOTE", 50))  # correos por conexion SMTP
+  MAIL_LIMITE_POR_MINUTO = int(os.getenv("MAIL_LIMITE_POR_MINUTO", 60))  # 0 sin limite
+  MAIL_MAX_INTENTOS = int(os.getenv("MAIL_MAX_INTENTOS", 5))
+  MAIL_REINTENTO_BASE = int(os.getenv("MAIL_REINTENTO_BASE", 60))  # segundos, se duplica en cada intento
+  MAIL_REINTENTO_MAX = int(os.getenv("MAIL_REINTENTO_MAX", 3600))  # segundos
+  MAIL_RESERVA = int(os.getenv("MAIL_RESERVA", 300))  # segundos que un worker retiene los correos reclamados
\ No newline at end of file
@@ -8,7 +8,6 @@ from flask_praetorian import Praetorian
 from dotenv import load_dotenv
 import os
 from flask_mail import Mail
-from app.datetime_utils import now_peru
 
 load_dotenv()
 
@@ -25,12 +24,8 @@ limiter = Limiter(
     storage_uri="memory://",
 )
 
-# Configuracion de caching
-cache = Cache(config={
-    "CACHE_TYPE": "simple",
-    "CACHE_DEFAULT_TIMEOUT": 300,
-    "CACHE_THRESHOLD": 50,  # max 50 items en cache
-})
+# Configuracion de caching (compartida entre workers, ver config.py)
+cache = Cache()
 
 # Configracion para los CORS
 allowed_origins = [
@@ -53,24 +48,7 @@ cors = CORS(
     }
 )
 
-# Configuracion para la autenticacion de usuarios 
-class TokenBlacklist:
-    def __init__(self):
-        self._blacklist = {}
-    
-    def add_token(self, token, exp):
-        jti = guard.extract_jwt_token(token)["jti"]
-        self._blacklist[jti] = exp
-    
-    def is_blacklisted(self, jti):
-        if jti in self._blacklist:
-            if now_peru().timestamp() > self._blacklist[jti]:
-                del self._blacklist[jti]
-                return False
-            return True
-        return False
-
-blacklist = TokenBlacklist()
+# Configuracion para la autenticacion de usuarios
 guard = Praetorian()
 # Inicializacion de correo
 mail = Mail()
\ No newline at end of file
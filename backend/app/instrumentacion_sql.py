@@ -0,0 +1,92 @@
+import json
+import logging
+import time
+from collections import Counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from app.extensions import db
+
+# Instrumentacion opcional (SQL_INSTRUMENTACION=true): cuenta las sentencias SQL de cada
+# request, su tiempo total y la mas lenta. Se reportan en el header Server-Timing y en una
+# linea de log JSON. Una misma sentencia repetida SQL_UMBRAL_N_MAS_1 veces o mas se marca
+# como posible N+1 (consultas lazy dentro de un bucle).
+
+# El inicio se guarda en el contexto de ejecucion de cada sentencia y no en la conexion:
+# si la sentencia falla, el contexto se descarta con ella y no queda un inicio huerfano
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and "sql_estadisticas" in g:
+        context.sql_inicio = time.perf_counter()
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and "sql_estadisticas" in g):
+        return
+    inicio = getattr(context, "sql_inicio", None)
+    if inicio is None:
+        return
+    duracion = (time.perf_counter() - inicio) * 1000
+
+    estadisticas = g.sql_estadisticas
+    estadisticas["consultas"] += 1
+    estadisticas["tiempo_ms"] += duracion
+    estadisticas["repeticiones"][statement] += 1
+    if duracion > estadisticas["mas_lenta_ms"]:
+        estadisticas["mas_lenta_ms"] = duracion
+        estadisticas["mas_lenta"] = statement
+
+def registrar_instrumentacion_sql(app):
+    umbral_n_mas_1 = app.config["SQL_UMBRAL_N_MAS_1"]
+    if app.logger.getEffectiveLevel() > logging.INFO:
+        app.logger.setLevel(logging.INFO)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+            event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+
+    @app.before_request
+    def iniciar_estadisticas_sql():
+        g.sql_inicio_request = time.perf_counter()
+        g.sql_estadisticas = {
+            "consultas": 0,
+            "tiempo_ms": 0.0,
+            "mas_lenta_ms": 0.0,
+            "mas_lenta": None,
+            "repeticiones": Counter(),
+        }
+
+    @app.after_request
+    def reportar_estadisticas_sql(response):
+        estadisticas = g.pop("sql_estadisticas", None)
+        if estadisticas is None:
+            return response
+        total_ms = (time.perf_counter() - g.sql_inicio_request) * 1000
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={estadisticas["tiempo_ms"]:.1f};desc="{estadisticas["consultas"]} consultas", '
+            f'db-lenta;dur={estadisticas["mas_lenta_ms"]:.1f}, app;dur={total_ms:.1f}'
+        )
+
+        repetida, veces = (estadisticas["repeticiones"].most_common(1) or [(None, 0)])[0]
+        posible_n_mas_1 = veces >= umbral_n_mas_1
+        registro = {
+            "metodo": request.method,
+            "ruta": request.path,
+            "endpoint": request.endpoint,
+            "estado": response.status_code,
+            "duracion_ms": round(total_ms, 1),
+            "consultas": estadisticas["consultas"],
+            "db_ms": round(estadisticas["tiempo_ms"], 1),
+            "mas_lenta_ms": round(estadisticas["mas_lenta_ms"], 1),
+            "mas_lenta": (estadisticas["mas_lenta"] or "")[:300],
+            "posible_n_mas_1": posible_n_mas_1,
+        }
+        if posible_n_mas_1:
+            registro["sentencia_repetida"] = repetida[:300]
+            registro["repeticiones"] = veces
+            app.logger.warning(json.dumps(registro, ensure_ascii=False))
+        else:
+            app.logger.info(json.dumps(registro, ensure_ascii=False))
+
+        return response
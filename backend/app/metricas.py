@@ -0,0 +1,115 @@
+import os
+import time
+from flask import g, request
+from sqlalchemy import event
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+)
+from prometheus_client import multiprocess
+from app.extensions import db, cache
+
+# Metricas en formato Prometheus expuestas en /api/metrics.
+# Con gunicorn se define PROMETHEUS_MULTIPROC_DIR (ver gunicorn.conf.py): cada worker escribe
+# sus valores en archivos de ese directorio y la exposicion los agrega entre todos los workers.
+
+DURACION_REQUEST = Histogram(
+    "http_request_duracion_segundos", "Latencia de las requests",
+    ["blueprint", "endpoint", "metodo"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total", "Requests atendidas por codigo de estado",
+    ["endpoint", "metodo", "estado"],
+)
+RECHAZOS_LIMITER = Counter(
+    "limiter_rechazos_total", "Requests rechazadas por el limitador (429)", ["endpoint"],
+)
+CACHE_OPERACIONES = Counter(
+    "cache_operaciones_total", "Lecturas de cache por resultado", ["clave", "resultado"],
+)
+ESPERA_CHECKOUT = Histogram(
+    "db_pool_espera_checkout_segundos", "Tiempo para obtener una conexion del pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+POOL_TAMANO = Gauge("db_pool_tamano", "Conexiones abiertas en el pool", multiprocess_mode="livesum")
+POOL_EN_USO = Gauge("db_pool_en_uso", "Conexiones prestadas por el pool", multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Conexiones por encima del tamaño del pool", multiprocess_mode="livesum")
+# Se lee de la bandeja de salida (compartida), no se suma entre workers
+COLA_CORREOS = Gauge("correos_cola", "Correos pendientes de envio", multiprocess_mode="mostrecent")
+
+def _tipo_clave(clave):
+    # "usuario:15" -> "usuario", "estadisticas_matriculas|1.2" -> "estadisticas_matriculas"
+    return str(clave).split("|")[0].split(":")[0]
+
+class _CacheInstrumentada:
+    """Envuelve el backend de la cache para contar aciertos y fallos"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, nombre):
+        return getattr(self._backend, nombre)
+
+    def get(self, clave):
+        valor = self._backend.get(clave)
+        CACHE_OPERACIONES.labels(_tipo_clave(clave), "acierto" if valor is not None else "fallo").inc()
+        return valor
+
+    def get_many(self, *claves):
+        valores = self._backend.get_many(*claves)
+        for clave, valor in zip(claves, valores):
+            CACHE_OPERACIONES.labels(_tipo_clave(clave), "acierto" if valor is not None else "fallo").inc()
+        return valores
+
+def _actualizar_pool(pool):
+    POOL_TAMANO.set(pool.size() if hasattr(pool, "size") else 0)
+    POOL_EN_USO.set(pool.checkedout() if hasattr(pool, "checkedout") else 0)
+    POOL_OVERFLOW.set(max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0)
+
+def _instrumentar_pool(engine):
+    # Se envuelve el engine y no el pool, que se reemplaza en engine.dispose()
+    raw_connection_original = engine.raw_connection
+
+    def raw_connection_cronometrado():
+        inicio = time.perf_counter()
+        conexion = raw_connection_original()
+        ESPERA_CHECKOUT.observe(time.perf_counter() - inicio)
+        return conexion
+
+    engine.raw_connection = raw_connection_cronometrado
+    event.listen(engine, "checkout", lambda *args: _actualizar_pool(engine.pool))
+    event.listen(engine, "checkin", lambda *args: _actualizar_pool(engine.pool))
+
+def actualizar_cola_correos(cantidad):
+    COLA_CORREOS.set(cantidad)
+
+def registrar_metricas(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            _instrumentar_pool(engine)
+    app.extensions["cache"][cache] = _CacheInstrumentada(app.extensions["cache"][cache])
+
+    @app.before_request
+    def iniciar_metricas():
+        g.metricas_inicio = time.perf_counter()
+
+    @app.after_request
+    def registrar_request(response):
+        # El limitador rechaza en su propio before_request, antes de iniciar_metricas
+        inicio = g.pop("metricas_inicio", None)
+        endpoint = request.endpoint or "desconocido"
+        if inicio is not None:
+            DURACION_REQUEST.labels(request.blueprint or "", endpoint, request.method).observe(time.perf_counter() - inicio)
+        REQUESTS_TOTAL.labels(endpoint, request.method, str(response.status_code)).inc()
+        if response.status_code == 429:
+            RECHAZOS_LIMITER.labels(endpoint).inc()
+        return response
+
+def exponer_metricas():
+    """Retorna el cuerpo y content type de la exposicion en formato texto"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
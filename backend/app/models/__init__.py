@@ -10,4 +10,7 @@ from .reserva import Reserva
 from .asistencia import Asistencia
 from .ticket import Ticket
 from .auto import Auto
-from .tipo_auto import TipoAuto
\ No newline at end of file
+from .tipo_auto import TipoAuto
+from .reporte_snapshot import ReporteSnapshot
+from .token_revocado import TokenRevocado
+from .correo_saliente import CorreoSaliente
\ No newline at end of file
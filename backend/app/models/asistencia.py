@@ -6,6 +6,6 @@ class Asistencia(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     id_reserva = db.Column(db.Integer, db.ForeignKey("reservas.id"), unique=True)
     asistio = db.Column(db.Boolean)
-    fecha_asistencia = db.Column(db.DateTime)
+    fecha_asistencia = db.Column(db.DateTime, index=True)
 
     reserva = db.relationship("Reserva", backref=db.backref("asistencia", uselist=False))
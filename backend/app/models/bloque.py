@@ -9,3 +9,8 @@ class Bloque(db.Model):
     hora_fin = db.Column(db.Time)
     capacidad_max = db.Column(db.Integer, default=5)
     reservas_actuales = db.Column(db.Integer, default=0)
+
+    __table_args__ = (
+        # Su indice (fecha, hora_inicio, hora_fin) tambien atiende las consultas por semana y por dia
+        db.UniqueConstraint("fecha", "hora_inicio", "hora_fin", name="uq_bloques_fecha_horario"),
+    )
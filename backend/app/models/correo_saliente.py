@@ -0,0 +1,24 @@
+from app.extensions import db
+
+class CorreoSaliente(db.Model):
+    __tablename__ = "correos_salientes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    destinatario = db.Column(db.String(120), nullable=False)
+    asunto = db.Column(db.String(200), nullable=False)
+    cuerpo = db.Column(db.Text, nullable=False)  # Texto plano
+    cuerpo_html = db.Column(db.Text)  # Parte HTML opcional
+    lote = db.Column(db.String(36), index=True)  # Agrupa los correos de un mismo envio masivo
+
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')  # 'pendiente', 'enviando', 'enviado', 'fallido'
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    # Pendiente: no enviar antes de esta fecha (reintentos). Enviando: vence la reserva del worker
+    proximo_intento = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
+    ultimo_error = db.Column(db.Text)
+    fecha_creado = db.Column(db.DateTime(timezone=True), server_default=db.func.now())
+    fecha_enviado = db.Column(db.DateTime(timezone=True), index=True)
+
+    __table_args__ = (
+        # Cola de trabajo: se reclaman los correos listos por fecha
+        db.Index("ix_correos_salientes_estado_proximo_intento", "estado", "proximo_intento"),
+    )
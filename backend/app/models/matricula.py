@@ -1,5 +1,9 @@
 from app.extensions import db
 
+def _saldo_inicial(contexto):
+    # Al crear la matricula aun no hay pagos: el saldo es el costo total
+    return contexto.get_current_parameters().get("costo_total") or 0.0
+
 class Matricula(db.Model):
     __tablename__ = "matriculas"
 
@@ -13,6 +17,9 @@ class Matricula(db.Model):
     tarifa_por_hora = db.Column(db.Float)  # Solo para contrataciones por hora
     
     costo_total = db.Column(db.Float)  # Se calcula según paquete o (horas * tarifa)
+    # Desnormalizados: se actualizan en la misma transaccion que inserta el Pago (ver crear_pago)
+    total_pagado = db.Column(db.Float, nullable=False, default=0.0, server_default="0")
+    saldo_pendiente = db.Column(db.Float, nullable=False, default=_saldo_inicial, server_default="0")
 
     fecha_matricula = db.Column(db.DateTime(timezone=True), server_default=db.func.now())
     fecha_actualizado = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now())
@@ -24,3 +31,13 @@ class Matricula(db.Model):
 
     alumno = db.relationship("Alumno", backref="matriculas")
     paquete = db.relationship("Paquete", backref="matriculas")
+
+    __table_args__ = (
+        db.Index("ix_matriculas_id_alumno_estado_clases", "id_alumno", "estado_clases"),
+        # Indice parcial: solo matriculas activas (dashboard, recordatorios, alertas)
+        db.Index(
+            "ix_matriculas_activas_fecha_limite", "fecha_limite",
+            postgresql_where=db.text("estado_clases IN ('pendiente', 'en_progreso')"),
+            sqlite_where=db.text("estado_clases IN ('pendiente', 'en_progreso')"),
+        ),
+    )
@@ -0,0 +1,12 @@
+from app.extensions import db
+
+class ReporteSnapshot(db.Model):
+    __tablename__ = "reportes_snapshot"
+
+    id = db.Column(db.Integer, primary_key=True)
+    clave = db.Column(db.String(50), unique=True, nullable=False)  # 'admin_dashboard'
+    datos = db.Column(db.JSON, nullable=False)
+    vigente = db.Column(db.Boolean, default=True, nullable=False)  # False cuando hubo escrituras posteriores
+    generacion = db.Column(db.Integer, default=1, server_default="1", nullable=False)  # +1 en cada invalidacion
+    generacion_datos = db.Column(db.Integer, default=0, server_default="0", nullable=False)  # generacion con la que se calcularon los datos
+    fecha_generado = db.Column(db.DateTime(timezone=True), nullable=False)
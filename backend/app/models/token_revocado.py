@@ -0,0 +1,9 @@
+from app.extensions import db
+
+class TokenRevocado(db.Model):
+    __tablename__ = "tokens_revocados"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    expira = db.Column(db.BigInteger, nullable=False, index=True)  # claim 'exp' del JWT (timestamp)
+    fecha_creado = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), index=True)
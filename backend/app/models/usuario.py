@@ -1,4 +1,6 @@
-from app.extensions import db
+from flask import g, current_app
+from sqlalchemy.orm import make_transient_to_detached
+from app.extensions import db, cache
 
 class Usuario(db.Model):
     __tablename__ = "usuarios"
@@ -26,4 +28,34 @@ class Usuario(db.Model):
 
     @classmethod
     def identify(cls, id):
-        return cls.query.get(id)
\ No newline at end of file
+        # Cache por peticion: current_user() se llama varias veces en una misma ruta
+        identificados = g.setdefault("usuarios_identificados", {})
+        if id in identificados:
+            return identificados[id]
+
+        # Cache compartida de corta duracion, sin el hash de la contraseña
+        datos = cache.get(cls.clave_cache(id))
+        if datos:
+            usuario = cls(**datos)
+            make_transient_to_detached(usuario)
+            usuario = db.session.merge(usuario, load=False)
+        else:
+            usuario = db.session.get(cls, id)
+            if usuario:
+                cache.set(cls.clave_cache(id), {
+                    "id": usuario.id,
+                    "nombre_usuario": usuario.nombre_usuario,
+                    "rol": usuario.rol,
+                }, timeout=current_app.config["USUARIO_CACHE_TTL"])
+
+        identificados[id] = usuario
+        return usuario
+
+    @staticmethod
+    def clave_cache(id):
+        return f"usuario:{id}"
+
+    @classmethod
+    def invalidar_cache(cls, id):
+        if id is not None:
+            cache.delete(cls.clave_cache(id))
\ No newline at end of file
@@ -0,0 +1,120 @@
+import json
+import base64
+from datetime import date, datetime, time
+from sqlalchemy import tuple_, and_, or_
+from sqlalchemy.exc import DBAPIError
+from werkzeug.exceptions import BadRequest
+from app.extensions import db
+
+# Paginacion por cursor (keyset): en lugar de OFFSET, cada pagina continua despues de
+# los valores de orden de la ultima fila entregada. El costo no crece con la profundidad
+# y no requiere COUNT(*); el total es opcional (exacto o estimado por el planificador).
+
+def codificar_cursor(valores):
+    serializables = [v.isoformat() if isinstance(v, (date, datetime, time)) else v for v in valores]
+    return base64.urlsafe_b64encode(json.dumps(serializables).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor, columnas):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise ValueError
+        resultado = []
+        for columna, valor in zip(columnas, valores):
+            tipo = columna.type.python_type
+            if valor is not None and tipo in (date, datetime, time):
+                valor = tipo.fromisoformat(valor)
+            resultado.append(valor)
+        return resultado
+    except (ValueError, TypeError, NotImplementedError):
+        raise BadRequest("Cursor de paginación inválido")
+
+def _condicion_keyset(claves, valores):
+    columnas = [columna for columna, _ in claves]
+    descendentes = {descendente for _, descendente in claves}
+    if len(descendentes) == 1:
+        # Todas en la misma direccion: comparacion de filas, aprovecha el indice compuesto
+        if descendentes.pop():
+            return tuple_(*columnas) < tuple_(*valores)
+        return tuple_(*columnas) > tuple_(*valores)
+
+    condiciones = []
+    for i, (columna, descendente) in enumerate(claves):
+        anteriores = [c == v for (c, _), v in zip(claves[:i], valores[:i])]
+        comparacion = columna < valores[i] if descendente else columna > valores[i]
+        condiciones.append(and_(*anteriores, comparacion))
+    return or_(*condiciones)
+
+def estimar_total(query):
+    """Filas estimadas por el planificador de Postgres, sin ejecutar la consulta"""
+    if db.engine.dialect.name != "postgresql":
+        return None
+    # render_postcompile expande los IN (...) que de otro modo quedan como marcadores
+    compilada = query.order_by(None).statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    try:
+        with db.session.begin_nested():
+            plan = db.session.connection().exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compilada}", compilada.params
+            ).scalar()
+    except DBAPIError:
+        # El planificador no pudo explicar la consulta: se usa el conteo exacto
+        return query.order_by(None).count()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+class PaginaCursor:
+    def __init__(self, items, per_page, next_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.total = total
+
+def paginar_por_cursor(query, claves, obtener_claves, cursor=None, per_page=20, total=None):
+    """
+    Pagina una consulta por cursor
+
+    Args:
+        query: consulta filtrada, sin ORDER BY (se ordena por las claves)
+        claves: lista de (columna, descendente) que identifica una fila de forma unica
+        obtener_claves: funcion que recibe una fila y retorna los valores de las claves
+        cursor: token recibido en next_cursor, vacio o None para la primera pagina
+        total: None, "exacto" o "estimado"
+    """
+    columnas = [columna for columna, _ in claves]
+    conteo = None
+    if total == "exacto":
+        conteo = query.order_by(None).count()
+    elif total == "estimado":
+        conteo = estimar_total(query)
+
+    if cursor:
+        query = query.filter(_condicion_keyset(claves, decodificar_cursor(cursor, columnas)))
+    orden = [columna.desc() if descendente else columna.asc() for columna, descendente in claves]
+    filas = query.order_by(None).order_by(*orden).limit(per_page + 1).all()
+
+    siguiente = None
+    if len(filas) > per_page:
+        filas = filas[:per_page]
+        siguiente = codificar_cursor(obtener_claves(filas[-1]))
+    return PaginaCursor(filas, per_page, siguiente, conteo)
+
+def datos_paginacion(resultado):
+    """Bloque "pagination" de la respuesta para ambos modos de paginacion"""
+    if isinstance(resultado, PaginaCursor):
+        return {
+            "per_page": resultado.per_page,
+            "next_cursor": resultado.next_cursor,
+            "has_next": resultado.has_next,
+            "total": resultado.total,
+        }
+    return {
+        "page": resultado.page,
+        "per_page": resultado.per_page,
+        "total": resultado.total,
+        "pages": resultado.pages,
+        "has_next": resultado.has_next,
+        "has_prev": resultado.has_prev
+    }
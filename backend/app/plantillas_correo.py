@@ -0,0 +1,62 @@
+import os
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+# Plantillas de correo en app/templates/correos: cada una tiene una parte de texto (.txt)
+# y otra HTML (.html). Se compilan una sola vez al crear la app y la salida se guarda en
+# una cache LRU por (plantilla, contexto), asi los mensajes identicos no se vuelven a renderizar.
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(__file__), "templates", "correos")
+
+ASUNTOS = {
+    "bienvenida": "¡Bienvenido a la Escuela de Manejo Jesús Nazareno!",
+    "recordatorio_reserva": "Recordatorio: Tienes una clase programada",
+    "pago_pendiente": "Recordatorio: Pago pendiente",
+    "final_clases": "¡Gracias por completar tus clases en nuestra escuela!",
+    "matricula_creada": "Matrícula confirmada en la Escuela de Manejo Jesús Nazareno",
+}
+
+entorno = Environment(
+    loader=FileSystemLoader(DIRECTORIO_PLANTILLAS),
+    autoescape=select_autoescape(["html"]),
+    undefined=StrictUndefined,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,  # no revisa el archivo en cada uso
+    cache_size=-1,
+)
+entorno.filters["fecha"] = lambda valor: valor.strftime("%d/%m/%Y")
+entorno.filters["hora"] = lambda valor: valor.strftime("%H:%M")
+entorno.filters["soles"] = lambda valor: f"{valor:.2f}"
+
+_compiladas = {}
+
+def precompilar_plantillas():
+    """Compila todas las plantillas; un error de sintaxis falla al iniciar y no al enviar"""
+    for plantilla in ASUNTOS:
+        for extension in ("txt", "html"):
+            archivo = f"{plantilla}.{extension}"
+            _compiladas[archivo] = entorno.get_template(archivo)
+    _renderizar.cache_clear()
+
+def _plantilla(archivo):
+    if archivo not in _compiladas:
+        _compiladas[archivo] = entorno.get_template(archivo)
+    return _compiladas[archivo]
+
+@lru_cache(maxsize=2048)
+def _renderizar(plantilla, contexto):
+    datos = dict(contexto)
+    return (
+        ASUNTOS[plantilla],
+        _plantilla(f"{plantilla}.txt").render(datos),
+        _plantilla(f"{plantilla}.html").render(datos),
+    )
+
+def renderizar(plantilla, **contexto):
+    """Retorna (asunto, texto, html) de la plantilla con el contexto dado"""
+    return _renderizar(plantilla, tuple(sorted(contexto.items())))
+
+def renderizar_lote(plantilla, contextos):
+    """Renderiza una lista de contextos; los repetidos salen de la cache"""
+    return [renderizar(plantilla, **contexto) for contexto in contextos]
@@ -1,6 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.services.admin_tareas_service import generar_bloques, limpiar_bloques_vacios, verificar_pagos_pendiente, verificar_clases_reservadas
+from werkzeug.exceptions import BadRequest
+from app.services.admin_tareas_service import (
+    generar_bloques, limpiar_bloques_vacios, verificar_pagos_pendiente, verificar_clases_reservadas,
+    auditar_saldos_matriculas, reconciliar_reservas_actuales
+)
 from app.services.email_service import email_service
+from app.services.reporte_service import refrescar_reporte_admin
+from app.services.bandeja_salida_service import procesar_correos, estado_lote
 from app.extensions import limiter, db
 admin_tareas_bp = Blueprint("admin_tareas", __name__)
 
@@ -17,6 +23,13 @@ def verificar_token_cron():
             return True, "Token cron válido"
     return False, "Token inválido"
 
+# Parametro entero del cuerpo JSON, acotado para que la tarea siga siendo corta
+def leer_entero(data, campo, defecto, minimo, maximo):
+    valor = data.get(campo, defecto)
+    if isinstance(valor, bool) or not isinstance(valor, int) or not minimo <= valor <= maximo:
+        raise BadRequest(f"{campo} debe ser un entero entre {minimo} y {maximo}")
+    return valor
+
 @admin_tareas_bp.route("/generar-bloques", methods=["POST"])
 @limiter.limit("10 per hour") 
 def generar_bloques_ruta():
@@ -55,14 +68,28 @@ def limpiar_bloques_ruta():
                 "error": mensaje
             }), 403
             
-        eliminados = limpiar_bloques_vacios()
+        data = request.get_json(silent=True) or {}
+        dry_run = bool(data.get("dry_run", False))
+        resultado = limpiar_bloques_vacios(
+            dry_run=dry_run,
+            dias_por_lote=leer_entero(data, "dias_por_lote", 30, 1, 366),
+            max_lotes=leer_entero(data, "max_lotes", 12, 1, 100)
+        )
         
         return jsonify({
             "status": "ok",
-            "mensaje": f"Limpieza completada: {eliminados} bloques eliminados",
-            "bloques_eliminados": eliminados
+            "mensaje": f"Limpieza {'simulada' if dry_run else 'completada'}: {resultado['total']} bloques {'a eliminar' if dry_run else 'eliminados'}",
+            "bloques_eliminados": 0 if dry_run else resultado["total"],
+            "dry_run": dry_run,
+            "lotes": resultado["lotes"],
+            "quedan_pendientes": resultado["quedan_pendientes"]
         }), 200
-        
+
+    except BadRequest as e:
+        return jsonify({
+            "status": "error",
+            "error": e.description
+        }), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -80,13 +107,13 @@ def enviar_pagos_pendientes_ruta():
                 "error": mensaje
             }), 403
         
-        matriculas = verificar_pagos_pendiente()
-        for matricula in matriculas:
-            email_service.enviar_pago_pendiente(matricula)
+        lote, encolados = email_service.enviar_pagos_pendientes(verificar_pagos_pendiente())
         
         return jsonify({
             "status": "ok",
-            "mensaje": f"Recordatorios de pago procesados correctamente para {len(matriculas)} matrículas",
+            "mensaje": f"Recordatorios de pago encolados para {encolados} matrículas",
+            "lote": lote,
+            "encolados": encolados
         }), 200
         
     except Exception as e:
@@ -106,13 +133,13 @@ def enviar_recordatorio_reserva_ruta():
                 "error": mensaje
             }), 403
             
-        reservas = verificar_clases_reservadas()
-        for reserva in reservas:
-            email_service.enviar_recordatorio_reserva(reserva)
+        lote, encolados = email_service.enviar_recordatorios_reserva(verificar_clases_reservadas())
         
         return jsonify({
             "status": "ok",
-            "mensaje": f"Recordatorios de clase procesados correctamente para {len(reservas)} reservas",
+            "mensaje": f"Recordatorios de clase encolados para {encolados} reservas",
+            "lote": lote,
+            "encolados": encolados
         }), 200
         
     except Exception as e:
@@ -121,6 +148,151 @@ def enviar_recordatorio_reserva_ruta():
             "error": f"Error interno al enviar recordatorios de clase: {str(e)}"
         }), 500
     
+@admin_tareas_bp.route("/procesar-correos", methods=["POST"])
+@limiter.limit("120 per hour")
+def procesar_correos_ruta():
+    try:
+        valido, mensaje = verificar_token_cron()
+        if not valido:
+            return jsonify({
+                "status": "error",
+                "error": mensaje
+            }), 403
+
+        data = request.get_json(silent=True) or {}
+        resumen = procesar_correos(max_lotes=data.get("max_lotes", 10))
+
+        return jsonify({
+            "status": "ok",
+            "mensaje": f"Bandeja de salida procesada: {resumen['enviados']} correos enviados",
+            **resumen
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Error interno al procesar correos: {str(e)}"
+        }), 500
+
+@admin_tareas_bp.route("/correos/<string:lote>", methods=["GET"])
+@limiter.limit("120 per hour")
+def estado_lote_ruta(lote):
+    try:
+        valido, mensaje = verificar_token_cron()
+        if not valido:
+            return jsonify({
+                "status": "error",
+                "error": mensaje
+            }), 403
+
+        resumen = estado_lote(lote)
+        if not resumen["total"]:
+            return jsonify({
+                "status": "error",
+                "error": "Lote no encontrado"
+            }), 404
+
+        return jsonify({
+            "status": "ok",
+            "lote": lote,
+            **resumen
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Error interno al consultar el lote: {str(e)}"
+        }), 500
+
+@admin_tareas_bp.route("/auditar-saldos", methods=["POST"])
+@limiter.limit("30 per hour")
+def auditar_saldos_ruta():
+    try:
+        valido, mensaje = verificar_token_cron()
+        if not valido:
+            return jsonify({
+                "status": "error",
+                "error": mensaje
+            }), 403
+
+        data = request.get_json(silent=True) or {}
+        corregir = bool(data.get("corregir", False))
+        resultado = auditar_saldos_matriculas(corregir=corregir, limite=data.get("limite", 100))
+
+        return jsonify({
+            "status": "ok",
+            "mensaje": f"{resultado['total']} matrículas con saldo desfasado" + (f", {resultado['corregidas']} corregidas" if corregir else ""),
+            **resultado
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Error interno al auditar saldos: {str(e)}"
+        }), 500
+
+@admin_tareas_bp.route("/reconciliar-reservas", methods=["POST"])
+@limiter.limit("120 per hour")
+def reconciliar_reservas_ruta():
+    try:
+        valido, mensaje = verificar_token_cron()
+        if not valido:
+            return jsonify({
+                "status": "error",
+                "error": mensaje
+            }), 403
+
+        data = request.get_json(silent=True) or {}
+        dry_run = bool(data.get("dry_run", False))
+        resultado = reconciliar_reservas_actuales(
+            dias=leer_entero(data, "dias", 7, 0, 366),
+            dry_run=dry_run,
+            limite=leer_entero(data, "limite", 100, 0, 1000)
+        )
+
+        return jsonify({
+            "status": "ok",
+            "mensaje": f"{resultado['total']} bloques con contador desfasado de {resultado['revisados']} revisados" + ("" if dry_run else f", {resultado['corregidos']} corregidos"),
+            **resultado
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({
+            "status": "error",
+            "error": e.description
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Error interno al reconciliar reservas: {str(e)}"
+        }), 500
+
+@admin_tareas_bp.route("/refrescar-reporte", methods=["POST"])
+@limiter.limit("60 per hour")
+def refrescar_reporte_ruta():
+    try:
+        valido, mensaje = verificar_token_cron()
+        if not valido:
+            return jsonify({
+                "status": "error",
+                "error": mensaje
+            }), 403
+
+        resultado = refrescar_reporte_admin()
+
+        return jsonify({
+            "status": "ok",
+            "mensaje": "Reporte de administrador regenerado" if resultado["vigente"] else "Reporte calculado, descartado por escrituras concurrentes",
+            "generado": resultado["generado"].isoformat(),
+            "vigente": resultado["vigente"]
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Error interno al regenerar el reporte: {str(e)}"
+        }), 500
+
 @admin_tareas_bp.route("/despertar-bd", methods=["POST"])
 @limiter.limit("30 per hour")
 def despertar_bd_ruta():
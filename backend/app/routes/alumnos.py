@@ -1,10 +1,13 @@
 from flask import Blueprint, jsonify, request
 from app.schemas.alumno import CrearAlumnoSchema, AlumnoSchema, ActualizarAlumnoSchema
-from app.services.alumno_service import crear_alumno, listar_alumnos, obtener_estadisticas_alumnos, actualizar_alumno, eliminar_alumno
+from app.services.alumno_service import crear_alumno, importar_alumnos, listar_alumnos, obtener_estadisticas_alumnos, actualizar_alumno, eliminar_alumno
 import flask_praetorian
+from werkzeug.exceptions import BadRequest
 from app.models.alumno import Alumno
 from app.models.matricula import Matricula
 from app.services.email_service import email_service
+from app.cache_utils import obtener_o_calcular
+from app.paginacion import datos_paginacion
 
 alumnos_bp = Blueprint('alumnos', __name__)
 
@@ -25,6 +28,27 @@ def registrar_alumno():
 
     return ver_schema.dump(alumno), 201
 
+@alumnos_bp.route("/importar", methods=["POST"])
+@flask_praetorian.roles_required("admin")
+def importar_alumnos_route():
+    # CSV como archivo multipart (campo "archivo") o como cuerpo text/csv
+    if "archivo" in request.files:
+        stream = request.files["archivo"].stream
+    elif request.mimetype == "text/csv":
+        stream = request.stream
+    else:
+        raise BadRequest("Debe enviar un archivo CSV")
+
+    resultado = importar_alumnos(stream)
+    email_service.enviar_bienvenidas(resultado["alumnos"])
+
+    return jsonify({
+        "procesadas": resultado["procesadas"],
+        "creados": resultado["creados"],
+        "errores": resultado["errores"],
+        "alumnos": ver_schema.dump(resultado["alumnos"], many=True),
+    }), 200
+
 @alumnos_bp.route("/", methods=["GET"])
 @flask_praetorian.roles_required("admin")
 def obtener_alumnos():
@@ -34,6 +58,9 @@ def obtener_alumnos():
     busqueda = request.args.get("busqueda", None)
     estado = request.args.get("estado", None)
     tiene_matricula = request.args.get("tiene_matricula", None)
+    # Con "cursor" (vacio para la primera pagina) se pagina por cursor en lugar de page
+    cursor = request.args.get("cursor", None)
+    total = request.args.get("total", None)
 
     if estado == "activo":
         estado = True
@@ -42,31 +69,26 @@ def obtener_alumnos():
     else:
         estado = None
 
-    per_page = min(per_page, 100) # 100 maximo por pagina
+    per_page = min(max(per_page, 1), 100) # entre 1 y 100 por pagina
     resultado = listar_alumnos(
         page=page,
         per_page=per_page,
         busqueda=busqueda,
         estado=estado,
         tiene_matricula=tiene_matricula,
+        cursor=cursor,
+        total=total,
     )
 
     return jsonify({
         "alumnos": ver_schema.dump(resultado.items, many=True),
-        "pagination": {
-            "page": resultado.page,
-            "per_page": resultado.per_page,
-            "total": resultado.total,
-            "pages": resultado.pages,
-            "has_next": resultado.has_next,
-            "has_prev": resultado.has_prev
-        }
+        "pagination": datos_paginacion(resultado)
     }), 200
 
 @alumnos_bp.route("/estadisticas", methods=["GET"])
 @flask_praetorian.roles_required("admin")
 def obtener_estadisticas_alumnos_route():
-    estadisticas = obtener_estadisticas_alumnos()
+    estadisticas = obtener_o_calcular("estadisticas_alumnos", ["alumnos"], obtener_estadisticas_alumnos)
     return jsonify(estadisticas), 200
 
 @alumnos_bp.route("/<int:alumno_id>", methods=["GET"])
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 import flask_praetorian
-from app.extensions import guard, blacklist
+from app.extensions import guard
+from app.token_blacklist import blacklist
+from app.services.hash_service import autenticar, verificar_contrasena, hashear_contrasena
 from app.schemas.login import LoginSchema, CambioContrasenaSchema
-from app.models import Alumno, Instructor, Administrador
+from app.models import Alumno, Instructor, Administrador, Usuario
 from werkzeug.exceptions import BadRequest
 from app.extensions import db, limiter
 
@@ -43,7 +45,7 @@ def login():
     if errors:
         return jsonify(errors), 400
 
-    usuario = guard.authenticate(data["nombre_usuario"], data["contrasena"])
+    usuario = autenticar(data["nombre_usuario"], data["contrasena"])
     token = guard.encode_jwt_token(usuario)
     
     user_data = get_user_data(usuario)
@@ -89,12 +91,13 @@ def cambio_contrasena():
         current_user = flask_praetorian.current_user()
         
         # Verificar la contraseña actual
-        if not guard._verify_password(data["contrasena_actual"], current_user.contraseña_hash):
+        if not verificar_contrasena(data["contrasena_actual"], current_user.contraseña_hash):
             raise BadRequest("Contraseña actual incorrecta")
         
         # Cambiar la contraseña
-        current_user.contraseña_hash = guard.hash_password(data["contrasena_nueva"])
+        current_user.contraseña_hash = hashear_contrasena(data["contrasena_nueva"])
         db.session.commit()
+        Usuario.invalidar_cache(current_user.id)
         
         return jsonify({"mensaje": "Contraseña actualizada exitosamente"}), 200
         
@@ -1,8 +1,8 @@
 from flask import Blueprint, jsonify, request
 import flask_praetorian
 from app.schemas.bloque import BloqueSchema
-from app.services.bloque_service import obtener_bloques_semanal
-from app.extensions import cache
+from app.services.bloque_service import calcular_lunes_semana, listar_bloques_semana, obtener_fecha_limite_alumno
+from app.cache_utils import obtener_o_calcular, etiqueta_semana_bloques
 
 bloques_bp = Blueprint("bloques", __name__)
 ver_schema = BloqueSchema()
@@ -15,7 +15,24 @@ def obtener_bloques():
     id_alumno = request.args.get("id_alumno", type=int, default=None)  # Solo necesario si es admin
     semana_offset = request.args.get("semana", type=int, default=0)  # -1, 0, 1
 
-    # cache basado en parametros
-    bloques = obtener_bloques_semanal(id_alumno=id_alumno, por_admin=es_admin, semana_offset=semana_offset)
+    # La grilla de la semana se comparte entre alumnos y se invalida al cambiar las reservas
+    lunes = calcular_lunes_semana(semana_offset, por_admin=es_admin)
+    bloques = obtener_o_calcular(
+        f"bloques_semana:{lunes.isoformat()}",
+        [etiqueta_semana_bloques(lunes)],
+        lambda: ver_schema.dump(listar_bloques_semana(lunes), many=True)
+    )
 
-    return jsonify(ver_schema.dump(bloques, many=True)), 200
+    # Filtrar bloques que no excedan la fecha limite de la matrícula
+    if id_alumno:
+        fecha_limite = obtener_fecha_limite_alumno(id_alumno)
+        if not fecha_limite:
+            bloques = []
+        else:
+            limite = fecha_limite.isoformat()
+            bloques = [bloque for bloque in bloques if bloque["fecha"] <= limite]
+
+    response = jsonify(bloques)
+    response.add_etag()
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
@@ -1,9 +1,19 @@
-from flask import Blueprint, jsonify
-from app.extensions import db
+import hmac
+from flask import Blueprint, jsonify, Response, request, current_app, abort
+from app.extensions import db, limiter
+from app.metricas import exponer_metricas
 from app.datetime_utils import now_peru
 
 health_bp = Blueprint("health", __name__)
 
+def estadisticas_pool():
+    pool = db.engine.pool
+    estadisticas = {"tipo": type(pool).__name__, "estado": pool.status()}
+    for nombre in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, nombre):
+            estadisticas[nombre] = getattr(pool, nombre)()
+    return estadisticas
+
 @health_bp.route("/", methods=["GET"])
 def health_check():
     return jsonify({
@@ -22,7 +32,8 @@ def database_health():
             "status": "ok",
             "message": "Base de datos conectada",
             "timestamp": now_peru().isoformat(),
-            "ping": result.ping if result else None
+            "ping": result.ping if result else None,
+            "pool": estadisticas_pool()
         }), 200
         
     except Exception as e:
@@ -31,4 +42,18 @@ def database_health():
             "message": "Error de conexión a base de datos",
             "error": str(e),
             "timestamp": now_peru().isoformat()
-        }), 500
\ No newline at end of file
+        }), 500
+
+@health_bp.route("/metrics", methods=["GET"])
+@limiter.limit("20 per minute")  # un scrape cada 15s deja margen
+def metricas():
+    # Expone rutas, latencias y el estado del pool: solo con METRICAS_TOKEN
+    token = current_app.config["METRICAS_TOKEN"]
+    if not token:
+        abort(404)
+    recibido = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(recibido.encode(), token.encode()):
+        return jsonify({"error": "Token inválido"}), 403
+
+    cuerpo, content_type = exponer_metricas()
+    return Response(cuerpo, content_type=content_type)
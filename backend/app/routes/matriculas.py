@@ -1,8 +1,14 @@
 from flask import Blueprint, request, jsonify
 from app.schemas.matricula import CrearMatriculaSchema, MatriculaSchema, MatriculaResumenSchema
-from app.services.matricula_service import crear_matricula, listar_matriculas, eliminar_matricula, obtener_estadisticas_matriculas
+from app.services.matricula_service import (
+    crear_matricula, listar_matriculas, eliminar_matricula, obtener_estadisticas_matriculas,
+    consulta_matriculas, COLUMNAS_EXPORTACION
+)
+from app.services.exportacion_service import respuesta_exportacion
+from app.paginacion import datos_paginacion
 import flask_praetorian
 from app.services.email_service import email_service
+from app.cache_utils import obtener_o_calcular
 
 matriculas_bp = Blueprint("matriculas", __name__)
 crear_schema = CrearMatriculaSchema()
@@ -36,8 +42,11 @@ def obtener_matricula():
     estado_clases = request.args.get("estado_clases", None)
     estado_pago = request.args.get("estado_pago", None)
     tipo_contratacion = request.args.get("tipo_contratacion", None)
+    # Con "cursor" (vacio para la primera pagina) se pagina por cursor en lugar de page
+    cursor = request.args.get("cursor", None)
+    total = request.args.get("total", None)
 
-    per_page = min(per_page, 100)
+    per_page = min(max(per_page, 1), 100)
 
     resultado = listar_matriculas(
         page=page,
@@ -47,27 +56,33 @@ def obtener_matricula():
         estado_pago=estado_pago,
         tipo_contratacion=tipo_contratacion,
         id_matricula=id_matricula,
-        id_alumno=id_alumno
+        id_alumno=id_alumno,
+        cursor=cursor,
+        total=total
     )
 
     if id_matricula or id_alumno:
         return jsonify(lista_schema.dump(resultado)), 200
     return jsonify({
         "matriculas": lista_schema.dump(resultado.items, many=True),
-        "pagination": {
-            "page": resultado.page,
-            "per_page": resultado.per_page,
-            "total": resultado.total,
-            "pages": resultado.pages,
-            "has_next": resultado.has_next,
-            "has_prev": resultado.has_prev
-        }
+        "pagination": datos_paginacion(resultado)
     }), 200
 
+@matriculas_bp.route("/exportar", methods=["GET"])
+@flask_praetorian.roles_required("admin")
+def exportar_matriculas():
+    query = consulta_matriculas(
+        busqueda=request.args.get("busqueda", None),
+        estado_clases=request.args.get("estado_clases", None),
+        estado_pago=request.args.get("estado_pago", None),
+        tipo_contratacion=request.args.get("tipo_contratacion", None),
+    )
+    return respuesta_exportacion(query, COLUMNAS_EXPORTACION, "matriculas", request.args.get("formato", "csv"))
+
 @matriculas_bp.route("/estadisticas", methods=["GET"])
 @flask_praetorian.roles_required("admin")
 def obtener_estadisticas_matriculas_route():
-    estadisticas = obtener_estadisticas_matriculas()
+    estadisticas = obtener_o_calcular("estadisticas_matriculas", ["matriculas"], obtener_estadisticas_matriculas)
     return jsonify(estadisticas), 200
 
 """ @matriculas_bp.route("/<int:id>", methods=["DELETE"])
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from app.schemas.pago import CrearPagoSchema, PagoSchema
-from app.services.pago_service import crear_pago, listar_pagos, obtener_pago
+from app.services.pago_service import crear_pago, listar_pagos, obtener_pago, consulta_pagos, COLUMNAS_EXPORTACION
+from app.services.exportacion_service import respuesta_exportacion
 import flask_praetorian
+from datetime import datetime
 
 pagos_bp = Blueprint("pagos", __name__)
 crear_schema = CrearPagoSchema()
@@ -24,6 +26,16 @@ def obtener_pagos():
     pagos = listar_pagos()
     return jsonify(ver_schema.dump(pagos, many=True)), 200
 
+@pagos_bp.route("/exportar", methods=["GET"])
+@flask_praetorian.roles_required("admin")
+def exportar_pagos():
+    id_matricula = request.args.get("id_matricula", type=int, default=None)
+    fecha_inicio = request.args.get("fecha_inicio", type=lambda f: datetime.strptime(f, "%Y-%m-%d").date(), default=None)
+    fecha_fin = request.args.get("fecha_fin", type=lambda f: datetime.strptime(f, "%Y-%m-%d").date(), default=None)
+
+    query = consulta_pagos(id_matricula, fecha_inicio, fecha_fin)
+    return respuesta_exportacion(query, COLUMNAS_EXPORTACION, "pagos", request.args.get("formato", "csv"))
+
 @pagos_bp.route("/<int:id>", methods=["GET"])
 @flask_praetorian.roles_required("admin")
 def obtener_pago_id(id):
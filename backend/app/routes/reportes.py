@@ -1,14 +1,12 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app
 import flask_praetorian
-from app.services.reporte_service import obtener_reporte_admin
-from app.extensions import cache
+from app.services.reporte_service import obtener_reporte_admin_snapshot
 
 
 reportes_bp = Blueprint("reportes", __name__)
 
 @reportes_bp.route("/admin-dashboard", methods=["GET"])
 @flask_praetorian.roles_required("admin")
-@cache.cached(timeout=60, key_prefix="admin_dashboard")
 def ver_reporte_admin():
-    data = obtener_reporte_admin()
+    data = obtener_reporte_admin_snapshot(current_app.config["REPORTE_SNAPSHOT_MAX_EDAD"])
     return jsonify(data), 200
\ No newline at end of file
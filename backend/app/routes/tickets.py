@@ -1,28 +1,26 @@
 from flask import Blueprint, request, jsonify
-from app.services.ticket_service import listar_tickets_admin, listar_tickets_instructor, obtener_estadisticas_tickets
+from app.services.ticket_service import (
+    listar_tickets_admin, listar_tickets_instructor, obtener_estadisticas_tickets,
+    consulta_tickets_admin, COLUMNAS_EXPORTACION
+)
+from app.services.exportacion_service import respuesta_exportacion
+from app.paginacion import datos_paginacion
 from app.schemas.ticket import TicketSchema
 import flask_praetorian
 from datetime import datetime
 from werkzeug.exceptions import BadRequest
+from app.cache_utils import obtener_o_calcular
+from app.datetime_utils import today_peru
 
 tickets_bp = Blueprint("tickets", __name__)
 ver_schema = TicketSchema()
 
-@tickets_bp.route("/", methods=["GET"])
-@flask_praetorian.roles_accepted("admin", "instructor")
-def listar_tickets():
-    current_usuario = flask_praetorian.current_user()
-    
-    # Parámetros de filtrado y paginación
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
+def leer_filtros():
     busqueda = request.args.get("busqueda", None)
     fecha_inicio = request.args.get("fecha_inicio", None)
     fecha_fin = request.args.get("fecha_fin", None)
     id_instructor = request.args.get("id_instructor", type=int, default=None)
 
-    per_page = min(per_page, 100)
-
     # Convertir fechas si vienen como string
     if fecha_inicio:
         try:
@@ -36,6 +34,23 @@ def listar_tickets():
         except ValueError:
             fecha_fin = None
 
+    return busqueda, fecha_inicio, fecha_fin, id_instructor
+
+@tickets_bp.route("/", methods=["GET"])
+@flask_praetorian.roles_accepted("admin", "instructor")
+def listar_tickets():
+    current_usuario = flask_praetorian.current_user()
+    
+    # Parámetros de filtrado y paginación
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 20, type=int)
+    busqueda, fecha_inicio, fecha_fin, id_instructor = leer_filtros()
+    # Con "cursor" (vacio para la primera pagina) se pagina por cursor en lugar de page
+    cursor = request.args.get("cursor", None)
+    total = request.args.get("total", None)
+
+    per_page = min(max(per_page, 1), 100)
+
     if current_usuario.rol == "admin":
         resultado = listar_tickets_admin(
             page=page,
@@ -43,7 +58,9 @@ def listar_tickets():
             busqueda=busqueda,
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
-            id_instructor=id_instructor
+            id_instructor=id_instructor,
+            cursor=cursor,
+            total=total
         )
     elif id_instructor:
         resultado = listar_tickets_instructor(
@@ -52,7 +69,9 @@ def listar_tickets():
             per_page=per_page,
             busqueda=busqueda,
             fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin
+            fecha_fin=fecha_fin,
+            cursor=cursor,
+            total=total
         )
     else:
         return jsonify({"error": "No autorizado"}), 403
@@ -73,16 +92,15 @@ def listar_tickets():
 
     return jsonify({
         "tickets": [serializar_ticket(t) for t in resultado.items],
-        "pagination": {
-            "page": resultado.page,
-            "per_page": resultado.per_page,
-            "total": resultado.total,
-            "pages": resultado.pages,
-            "has_next": resultado.has_next,
-            "has_prev": resultado.has_prev
-        }
+        "pagination": datos_paginacion(resultado)
     }), 200
 
+@tickets_bp.route("/exportar", methods=["GET"])
+@flask_praetorian.roles_required("admin")
+def exportar_tickets():
+    busqueda, fecha_inicio, fecha_fin, id_instructor = leer_filtros()
+    query = consulta_tickets_admin(busqueda, fecha_inicio, fecha_fin, id_instructor)
+    return respuesta_exportacion(query, COLUMNAS_EXPORTACION, "tickets", request.args.get("formato", "csv"))
 
 @tickets_bp.route("/estadisticas", methods=["GET"])
 @flask_praetorian.roles_accepted("admin", "instructor")
@@ -95,5 +113,11 @@ def obtener_estadisticas():
     if current_usuario.rol == "instructor" and not id_instructor:
         raise BadRequest("El ID del instructor es requerido para obtener estadísticas")
     
-    estadisticas = obtener_estadisticas_tickets(id_instructor)
+    # "hoy" y "semana" dependen de la fecha, por eso se incluye en la clave
+    estadisticas = obtener_o_calcular(
+        f"estadisticas_tickets:{id_instructor}:{today_peru()}",
+        ["tickets"],
+        lambda: obtener_estadisticas_tickets(id_instructor),
+        timeout=60
+    )
     return jsonify(estadisticas), 200
\ No newline at end of file
@@ -93,7 +93,7 @@ class MatriculaResumenSchema(Schema):
     estado_clases = fields.Str()
     estado_pago = fields.Str()
     horas_completadas = fields.Int()
-    pagos_realizados = fields.Float()
+    pagos_realizados = fields.Float(attribute="total_pagado")
     saldo_pendiente = fields.Float()
     costo_total = fields.Float()
     reservas_pendientes = fields.Int()
@@ -1,104 +1,340 @@
 import os
 import sys
-from datetime import time, timedelta
+import unicodedata
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, delete, exists, and_, or_, func, select, update, case
+from sqlalchemy.dialects import postgresql
 from app.datetime_utils import today_peru
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app.models import Bloque, Matricula
+from app.models import Bloque, Matricula, Reserva, Pago, Alumno
 from app.extensions import db
-from app.services import reserva_service
+from app.cache_utils import invalidar_etiquetas, etiqueta_semana_bloques
+from app.services.reporte_service import invalidar_reporte_admin
+
+# Diferencia tolerada entre columnas Float y la suma de pagos
+TOLERANCIA_SALDO = 0.005
+
+DIAS_SEMANA = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+
+def obtener_horarios_bloques():
+    """
+    Construye los horarios de cada dia a partir de HORARIOS_BLOQUES
+
+    Returns:
+        dict {weekday: [(hora_inicio, hora_fin), ...]} con 0 = lunes
+    """
+    duracion = timedelta(minutes=current_app.config["DURACION_BLOQUE_MINUTOS"])
+    horarios = {}
+
+    for dia, rango in current_app.config["HORARIOS_BLOQUES"].items():
+        inicio, fin = (datetime.strptime(hora.strip(), "%H:%M") for hora in rango.split("-"))
+        bloques_dia = []
+        while inicio + duracion <= fin:
+            bloques_dia.append((inicio.time(), (inicio + duracion).time()))
+            inicio += duracion
+        horarios[_numero_dia(dia)] = bloques_dia
+    return horarios
+
+def _numero_dia(dia):
+    # Acepta "miércoles"/"Sábado": se comparan sin tildes ni mayusculas
+    normalizado = "".join(
+        caracter for caracter in unicodedata.normalize("NFKD", dia.strip().lower())
+        if not unicodedata.combining(caracter)
+    )
+    if normalizado not in DIAS_SEMANA:
+        raise ValueError(f"HORARIOS_BLOQUES: dia '{dia}' no valido, use {', '.join(DIAS_SEMANA)}")
+    return DIAS_SEMANA.index(normalizado)
 
 def generar_bloques(semanas_futuro=2):
     hoy = today_peru()
     fecha_final = hoy + timedelta(days=7 * semanas_futuro)
-    
-    # Definir horarios
-    HORARIOS_LUNES_SABADO = [
-        (time(7, 0), time(8, 0)),  # 7am - 8am
-        (time(8, 0), time(9, 0)), 
-        (time(9, 0), time(10, 0)),
-        (time(10, 0), time(11, 0)),
-        (time(11, 0), time(12, 0)),
-        (time(12, 0), time(13, 0)),
-        (time(13, 0), time(14, 0)),
-        (time(14, 0), time(15, 0)),
-        (time(15, 0), time(16, 0)),
-        (time(16, 0), time(17, 0)),
-        (time(17, 0), time(18, 0)),
-    ]
-    
-    HORARIOS_DOMINGO = HORARIOS_LUNES_SABADO[:5]  # Solo hasta mediodia
-    
-    bloques_creados = 0
+    horarios = obtener_horarios_bloques()
+    capacidad = current_app.config["CAPACIDAD_BLOQUE"]
+
+    # Bloques ya existentes en el rango, en una sola consulta
+    existentes = {
+        tuple(fila) for fila in db.session.query(
+            Bloque.fecha, Bloque.hora_inicio, Bloque.hora_fin
+        ).filter(Bloque.fecha.between(hoy, fecha_final)).all()
+    }
+
+    nuevos = []
     fecha_actual = hoy
-    
     while fecha_actual <= fecha_final:
-        # Determinar qué horarios usar según el día de la semana
-        es_domingo = fecha_actual.weekday() == 6
-        horarios = HORARIOS_DOMINGO if es_domingo else HORARIOS_LUNES_SABADO
-        
-        for hora_inicio, hora_fin in horarios:
-            # Verificar si ya existe un bloque para esta fecha y hora
-            bloque_existente = Bloque.query.filter_by(
-                fecha=fecha_actual,
-                hora_inicio=hora_inicio,
-                hora_fin=hora_fin
-            ).first()
-            
-            if not bloque_existente:
-                # Crear nuevo bloque
-                bloque = Bloque(
-                    fecha=fecha_actual,
-                    hora_inicio=hora_inicio,
-                    hora_fin=hora_fin,
-                    capacidad_max=5,
-                    reservas_actuales=0
-                )
-                db.session.add(bloque)
-                bloques_creados += 1
-        
+        for hora_inicio, hora_fin in horarios.get(fecha_actual.weekday(), []):
+            if (fecha_actual, hora_inicio, hora_fin) not in existentes:
+                nuevos.append({
+                    "fecha": fecha_actual,
+                    "hora_inicio": hora_inicio,
+                    "hora_fin": hora_fin,
+                    "capacidad_max": capacidad,
+                    "reservas_actuales": 0,
+                })
         fecha_actual += timedelta(days=1)
-    
-    if bloques_creados > 0:
+
+    bloques_creados = 0
+    if nuevos:
+        if db.engine.dialect.name == "postgresql":
+            # Si otra ejecucion los creo primero, la restriccion unica los descarta
+            stmt = postgresql.insert(Bloque).on_conflict_do_nothing(
+                constraint="uq_bloques_fecha_horario"
+            ).returning(Bloque.id)
+            bloques_creados = len(db.session.execute(stmt, nuevos).all())
+        else:
+            db.session.execute(insert(Bloque), nuevos)
+            bloques_creados = len(nuevos)
         db.session.commit()
+        invalidar_etiquetas(*{etiqueta_semana_bloques(bloque["fecha"]) for bloque in nuevos})
+
+    if bloques_creados > 0:
         print(f"Se crearon {bloques_creados} bloques nuevos")
     else:
         print("No se requirió crear bloques nuevos")
     return bloques_creados
 
-def limpiar_bloques_vacios():
+def limpiar_bloques_vacios(dry_run=False, dias_por_lote=30, max_lotes=12):
+    """
+    Elimina los bloques pasados sin reservas con un DELETE por rango de fechas
+
+    Args:
+        dry_run: si es True solo cuenta lo que se eliminaria
+        dias_por_lote: dias que abarca cada DELETE
+        max_lotes: maximo de lotes por ejecucion, el resto queda para la siguiente
+
+    Returns:
+        dict con el total, el detalle por lote y si quedaron bloques pendientes
+    """
     ayer = today_peru() - timedelta(days=1)
-    
-    # Encontrar bloques pasados sin reservas
-    bloques_para_eliminar = Bloque.query.filter(
-        Bloque.fecha < ayer,
-        Bloque.reservas_actuales == 0
-    ).all()
-    
-    cantidad = len(bloques_para_eliminar)
-    
-    if cantidad > 0:
-        for bloque in bloques_para_eliminar:
-            db.session.delete(bloque)
-        
-        db.session.commit()
-        print(f"Se eliminaron {cantidad} bloques vacíos")        
+
+    # Bloques pasados sin reservas (se verifica la tabla, no solo el contador)
+    vacio = and_(
+        Bloque.reservas_actuales == 0,
+        ~exists().where(Reserva.id_bloque == Bloque.id)
+    )
+
+    desde = db.session.query(func.min(Bloque.fecha)).filter(
+        Bloque.fecha < ayer, vacio
+    ).scalar()
+
+    lotes = []
+    total = 0
+    while desde and desde < ayer and len(lotes) < max_lotes:
+        hasta = min(desde + timedelta(days=dias_por_lote), ayer)
+        filtro = (Bloque.fecha >= desde, Bloque.fecha < hasta, vacio)
+
+        if dry_run:
+            cantidad = db.session.query(func.count(Bloque.id)).filter(*filtro).scalar() or 0
+        else:
+            cantidad = db.session.execute(
+                delete(Bloque).where(*filtro).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if cantidad > 0:
+                invalidar_etiquetas(*{
+                    etiqueta_semana_bloques(desde + timedelta(days=dias))
+                    for dias in range((hasta - desde).days)
+                })
+
+        lotes.append({
+            "desde": desde.isoformat(),
+            "hasta": (hasta - timedelta(days=1)).isoformat(),
+            "bloques": cantidad
+        })
+        total += cantidad
+        desde = hasta
+
+    if total > 0:
+        print(f"{'Se eliminarían' if dry_run else 'Se eliminaron'} {total} bloques vacíos en {len(lotes)} lotes")
     else:
         print("No hay bloques vacíos para eliminar")
-    return cantidad
+
+    return {
+        "total": total,
+        "dry_run": dry_run,
+        "lotes": lotes,
+        "quedan_pendientes": bool(desde) and db.session.query(
+            exists().where(Bloque.fecha >= desde, Bloque.fecha < ayer, vacio)
+        ).scalar()
+    }
+
+def reconciliar_reservas_actuales(dias=7, dry_run=False, limite=100):
+    """
+    Recalcula Bloque.reservas_actuales a partir de la tabla reservas
+
+    Args:
+        dias: dias pasados que se revisan; los bloques futuros se revisan siempre
+        dry_run: si es True solo reporta las diferencias
+        limite: cantidad maxima de diferencias detalladas en el resultado
+
+    Returns:
+        dict con bloques revisados, diferencias encontradas y corregidas
+    """
+    desde = today_peru() - timedelta(days=dias)
+    conteo_real = select(func.count(Reserva.id))\
+        .where(Reserva.id_bloque == Bloque.id)\
+        .correlate(Bloque).scalar_subquery()
+
+    def consultar_diferencias(ids=None):
+        query = db.session.query(
+            Bloque.id, Bloque.fecha, Bloque.hora_inicio, Bloque.reservas_actuales, conteo_real.label("real")
+        ).filter(Bloque.fecha >= desde, Bloque.reservas_actuales != conteo_real)
+        if ids is not None:
+            query = query.filter(Bloque.id.in_(ids))
+        return query.order_by(Bloque.fecha, Bloque.hora_inicio).all()
+
+    revisados = db.session.query(func.count(Bloque.id)).filter(Bloque.fecha >= desde).scalar() or 0
+    diferencias = consultar_diferencias()
+
+    corregidos = 0
+    if diferencias and not dry_run:
+        ids = [fila.id for fila in diferencias]
+        # Bloquear primero los bloques: una reserva en curso termina antes del recalculo y
+        # la siguiente sentencia cuenta con una vista nueva que ya incluye sus filas
+        db.session.query(Bloque.id).filter(Bloque.id.in_(ids)).with_for_update().all()
+        diferencias = consultar_diferencias(ids)
+        if diferencias:
+            corregidos = db.session.execute(
+                update(Bloque)
+                .where(Bloque.id.in_([fila.id for fila in diferencias]))
+                .values(reservas_actuales=conteo_real)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.session.commit()
+        if corregidos:
+            invalidar_etiquetas(*{etiqueta_semana_bloques(fila.fecha) for fila in diferencias})
+            current_app.logger.warning(f"Contador reservas_actuales corregido en {corregidos} bloques")
+    else:
+        db.session.rollback()
+
+    return {
+        "revisados": revisados,
+        "total": len(diferencias),
+        "corregidos": corregidos,
+        "dry_run": dry_run,
+        "diferencias": [
+            {
+                "id_bloque": fila.id,
+                "fecha": fila.fecha.isoformat(),
+                "hora_inicio": fila.hora_inicio.strftime("%H:%M"),
+                "reservas_actuales": fila.reservas_actuales,
+                "reservas_reales": fila.real,
+            }
+            for fila in diferencias[:limite]
+        ],
+    }
 
 def verificar_pagos_pendiente():
-    matriculas = Matricula.query.filter(
-        Matricula.horas_completadas == 3,
-        Matricula.estado_pago == "pendiente",
-    ).all()
+    """
+    Datos del recordatorio de pago de cada matricula con saldo, en una sola consulta
+
+    Returns:
+        filas con id_matricula, categoria, monto_pendiente, nombre y email del alumno
+    """
+    return db.session.query(
+        Matricula.id.label("id_matricula"),
+        Matricula.categoria,
+        Matricula.saldo_pendiente.label("monto_pendiente"),
+        Alumno.nombre,
+        Alumno.email,
+    ).join(Alumno, Matricula.id_alumno == Alumno.id)\
+        .filter(
+            Matricula.horas_completadas == 3,
+            Matricula.estado_pago == "pendiente",
+            Alumno.email.isnot(None),
+        ).order_by(Matricula.id).all()
+
+def auditar_saldos_matriculas(corregir=False, limite=100):
+    """
+    Compara total_pagado y saldo_pendiente de cada matricula con la suma real de sus pagos
+
+    Args:
+        corregir: recalcula las columnas de las matriculas con diferencias
+        limite: cantidad maxima de diferencias detalladas en el resultado
 
-    return matriculas
+    Returns:
+        dict con total de matriculas con diferencias, detalle y corregidas
+    """
+    pagos_subq = db.session.query(
+        Pago.id_matricula,
+        func.sum(Pago.monto).label("pagado")
+    ).group_by(Pago.id_matricula).subquery()
+    pagado_real = func.coalesce(pagos_subq.c.pagado, 0.0)
+    saldo_real = func.coalesce(Matricula.costo_total, 0.0) - pagado_real
+
+    consulta = db.session.query(
+        Matricula.id,
+        Matricula.total_pagado,
+        pagado_real.label("pagado_real"),
+        Matricula.saldo_pendiente,
+        saldo_real.label("saldo_real"),
+    ).outerjoin(pagos_subq, pagos_subq.c.id_matricula == Matricula.id)\
+        .filter(or_(
+            func.abs(Matricula.total_pagado - pagado_real) > TOLERANCIA_SALDO,
+            func.abs(Matricula.saldo_pendiente - saldo_real) > TOLERANCIA_SALDO,
+        )).order_by(Matricula.id)
+
+    diferencias = consulta.all()
+    corregidas = 0
+    if corregir and diferencias:
+        pagado = select(func.coalesce(func.sum(Pago.monto), 0.0))\
+            .where(Pago.id_matricula == Matricula.id).scalar_subquery()
+        saldo = func.coalesce(Matricula.costo_total, 0.0) - pagado
+        # Ids en Python: MySQL no permite filtrar el UPDATE con una subconsulta de la misma tabla
+        corregidas = db.session.execute(
+            update(Matricula)
+            .where(Matricula.id.in_([fila.id for fila in diferencias]))
+            .values(
+                total_pagado=pagado,
+                saldo_pendiente=saldo,
+                estado_pago=case((saldo <= 0, "completo"), else_="pendiente"),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        invalidar_reporte_admin()
+        db.session.commit()
+        invalidar_etiquetas("matriculas")
+        current_app.logger.warning(f"Saldos de matriculas corregidos: {corregidas}")
+
+    return {
+        "total": len(diferencias),
+        "corregidas": corregidas,
+        "diferencias": [
+            {
+                "id_matricula": fila.id,
+                "total_pagado": fila.total_pagado,
+                "pagado_real": float(fila.pagado_real),
+                "saldo_pendiente": fila.saldo_pendiente,
+                "saldo_real": float(fila.saldo_real),
+            }
+            for fila in diferencias[:limite]
+        ],
+    }
 
 def verificar_clases_reservadas():
-    reservas = reserva_service.listar_reservas_hoy()
-    return reservas
+    """
+    Datos del recordatorio de cada reserva de hoy, en una sola consulta
+
+    Returns:
+        filas con id_reserva, fecha, hora_inicio, hora_fin, duracion_horas, nombre y email del alumno
+    """
+    return db.session.query(
+        Reserva.id.label("id_reserva"),
+        Bloque.fecha,
+        Bloque.hora_inicio,
+        Bloque.hora_fin,
+        Reserva.duracion_horas,
+        Alumno.nombre,
+        Alumno.email,
+    ).join(Bloque, Reserva.id_bloque == Bloque.id)\
+        .join(Matricula, Reserva.id_matricula == Matricula.id)\
+        .join(Alumno, Matricula.id_alumno == Alumno.id)\
+        .filter(
+            Bloque.fecha == today_peru(),
+            Alumno.email.isnot(None),
+        ).order_by(Bloque.hora_inicio, Reserva.id).all()
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "limpiar":
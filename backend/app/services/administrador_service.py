@@ -1,6 +1,7 @@
 from app.models.usuario import Usuario
 from app.models.administrador import Administrador
-from app.extensions import db, guard
+from app.extensions import db
+from app.services.hash_service import hashear_contrasena
 from werkzeug.exceptions import BadRequest
 
 def crear_administrador(data):
@@ -11,7 +12,7 @@ def crear_administrador(data):
     # Crear usuario
     usuario = Usuario(
         nombre_usuario=dni,
-        contraseña_hash=guard.hash_password(dni),
+        contraseña_hash=hashear_contrasena(dni),
         rol="admin"
     )
     db.session.add(usuario)
@@ -38,9 +39,11 @@ def actualizar_administrador(administrador_id, data):
             setattr(administrador, campo, data[campo])
     
     db.session.commit()
+    Usuario.invalidar_cache(administrador.id_usuario)
     return administrador
 
 def eliminar_administrador(administrador_id):
     administrador = Administrador.query.get_or_404(administrador_id)
     administrador.activo = False
-    db.session.commit()
\ No newline at end of file
+    db.session.commit()
+    Usuario.invalidar_cache(administrador.id_usuario)
\ No newline at end of file
@@ -1,9 +1,19 @@
+import csv
+import codecs
+from itertools import chain, islice
 from app.models.usuario import Usuario
 from app.models.alumno import Alumno
-from app.extensions import db, guard
+from app.extensions import db
+from app.services.hash_service import hashear_contrasena, hashear_contrasenas
 from app.models.matricula import Matricula
+from app.schemas.alumno import CrearAlumnoSchema
 from werkzeug.exceptions import BadRequest
-from sqlalchemy import or_, desc
+from sqlalchemy import desc
+from sqlalchemy.exc import IntegrityError
+from app.cache_utils import invalidar_etiquetas
+from app.paginacion import paginar_por_cursor
+from app.services.busqueda_service import filtro_alumnos
+from app.services.reporte_service import invalidar_reporte_admin
 
 def crear_alumno(data):
     dni = data["dni"]
@@ -13,7 +23,7 @@ def crear_alumno(data):
     # Crear usuario
     usuario = Usuario(
         nombre_usuario=dni,
-        contraseña_hash=guard.hash_password(dni),
+        contraseña_hash=hashear_contrasena(dni),
         rol="alumno"
     )
     db.session.add(usuario)
@@ -29,28 +39,159 @@ def crear_alumno(data):
         email=data["email"],
     )
     db.session.add(alumno)
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("alumnos")
     return alumno
 
+COLUMNAS_IMPORTACION = ("nombre", "apellidos", "dni", "telefono", "email")
+crear_schema = CrearAlumnoSchema()
+
+CARACTER_INVALIDO = "\ufffd"
+
+def _decodificar_lineas(stream):
+    # UTF-8 (con o sin BOM) o cp1252, el "CSV (delimitado por comas)" de Excel en español.
+    # Se decide por linea; los bytes que no son validos en ninguna quedan como CARACTER_INVALIDO
+    for numero, linea in enumerate(stream, start=1):
+        if numero == 1 and linea.startswith(codecs.BOM_UTF8):
+            linea = linea[len(codecs.BOM_UTF8):]
+        try:
+            yield linea.decode("utf-8")
+        except UnicodeDecodeError:
+            yield linea.decode("cp1252", errors="replace")
+
+def _leer_csv(stream):
+    texto = _decodificar_lineas(stream)
+    encabezado = next(texto, "")
+    if CARACTER_INVALIDO in encabezado:
+        raise BadRequest("Fila 1: el archivo no está en UTF-8 ni en ANSI (cp1252)")
+    # Excel en español exporta con ";" como separador
+    delimitador = ";" if encabezado.count(";") > encabezado.count(",") else ","
+    lector = csv.DictReader(chain([encabezado], texto), delimiter=delimitador)
+    if not lector.fieldnames:
+        raise BadRequest("El archivo está vacío")
+    lector.fieldnames = [columna.strip().lower() for columna in lector.fieldnames]
+    faltantes = [c for c in COLUMNAS_IMPORTACION if c != "email" and c not in lector.fieldnames]
+    if faltantes:
+        raise BadRequest(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+    return lector
+
+def _guardar_alumnos(validas, hashes):
+    usuarios = [
+        Usuario(nombre_usuario=datos["dni"], contraseña_hash=contraseña_hash, rol="alumno")
+        for (_, datos), contraseña_hash in zip(validas, hashes)
+    ]
+    db.session.add_all(usuarios)
+    db.session.flush()
+    alumnos = [
+        Alumno(id_usuario=usuario.id, **datos)
+        for usuario, (_, datos) in zip(usuarios, validas)
+    ]
+    db.session.add_all(alumnos)
+    db.session.flush()
+    return [{"id": alumno.id, **datos} for alumno, (_, datos) in zip(alumnos, validas)]
+
+def importar_alumnos(stream, tamano_lote=500):
+    """
+    Importa alumnos desde un CSV leido fila por fila
+
+    Cada lote valida sus filas, verifica los DNI existentes en una sola consulta,
+    hashea las contraseñas en paralelo y se guarda en su propia transaccion.
+
+    Returns:
+        dict con procesadas, creados, errores por fila y los alumnos nuevos
+    """
+    lector = _leer_csv(stream)
+    filas = enumerate(lector, start=2)  # la fila 1 es el encabezado
+    procesadas = 0
+    errores = []
+    nuevos = []
+    dnis_archivo = set()
+
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        procesadas += len(lote)
+
+        validas = []
+        for numero, fila in lote:
+            datos = {c: (fila.get(c) or "").strip() for c in COLUMNAS_IMPORTACION}
+            if any(CARACTER_INVALIDO in valor for valor in datos.values()):
+                errores.append({"fila": numero, "dni": datos["dni"], "error": "Caracteres no válidos para UTF-8 ni ANSI (cp1252)"})
+                continue
+            if not datos["email"]:
+                datos.pop("email")
+            try:
+                crear_schema.validate(datos)
+            except BadRequest as e:
+                errores.append({"fila": numero, "dni": datos["dni"], "error": e.description})
+                continue
+            if datos["dni"] in dnis_archivo:
+                errores.append({"fila": numero, "dni": datos["dni"], "error": "DNI repetido en el archivo"})
+                continue
+            dnis_archivo.add(datos["dni"])
+            validas.append((numero, datos))
+
+        if not validas:
+            continue
+
+        dnis = [datos["dni"] for _, datos in validas]
+        existentes = {
+            dni for (dni,) in db.session.query(Usuario.nombre_usuario).filter(Usuario.nombre_usuario.in_(dnis)).union(
+                db.session.query(Alumno.dni).filter(Alumno.dni.in_(dnis))
+            )
+        }
+        for numero, datos in validas:
+            if datos["dni"] in existentes:
+                errores.append({"fila": numero, "dni": datos["dni"], "error": "Ya existe un usuario con este DNI"})
+        validas = [(numero, datos) for numero, datos in validas if datos["dni"] not in existentes]
+        if not validas:
+            continue
+
+        hashes = hashear_contrasenas([datos["dni"] for _, datos in validas])
+        try:
+            creados = _guardar_alumnos(validas, hashes)
+            db.session.commit()
+            nuevos.extend(creados)
+        except IntegrityError:
+            # Otro proceso registro alguno de los DNI entre la consulta y la insercion:
+            # se reintenta el lote fila por fila para aislar las que fallan
+            db.session.rollback()
+            for fila, contraseña_hash in zip(validas, hashes):
+                try:
+                    with db.session.begin_nested():
+                        creados = _guardar_alumnos([fila], [contraseña_hash])
+                    nuevos.extend(creados)
+                except IntegrityError:
+                    errores.append({"fila": fila[0], "dni": fila[1]["dni"], "error": "Ya existe un usuario con este DNI"})
+            db.session.commit()
+
+    if nuevos:
+        invalidar_reporte_admin()
+        db.session.commit()
+        invalidar_etiquetas("alumnos")
+
+    return {
+        "procesadas": procesadas,
+        "creados": len(nuevos),
+        "errores": errores,
+        "alumnos": nuevos,
+    }
+
 def listar_alumnos(
     page=1, 
     per_page=20, 
     busqueda=None, 
     estado=None,
-    tiene_matricula=None
+    tiene_matricula=None,
+    cursor=None,
+    total=None
 ):
     query = Alumno.query
     # Filtro por busqueda
     if busqueda:
-        busqueda_like = f"%{busqueda.lower()}%"
-        query = query.filter(
-            or_(
-                Alumno.nombre.ilike(busqueda_like),
-                Alumno.apellidos.ilike(busqueda_like),
-                Alumno.dni.ilike(busqueda_like),
-                Alumno.email.ilike(busqueda_like)
-            )
-        )
+        query = query.filter(filtro_alumnos(busqueda))
     
     # Filtro por estado
     if estado is not None:
@@ -62,6 +203,10 @@ def listar_alumnos(
     elif tiene_matricula == "no":
         query = query.outerjoin(Matricula).filter(Matricula.id.is_(None))
     
+    # Paginación por cursor (si se pide) o por página
+    if cursor is not None:
+        return paginar_por_cursor(query, [(Alumno.id, True)], lambda a: (a.id,), cursor, per_page, total)
+
     # Ordenación
     query = query.order_by(desc(Alumno.id))
     
@@ -94,10 +239,16 @@ def actualizar_alumno(alumno_id, data):
         if campo in data:
             setattr(alumno, campo, data[campo])
     
+    invalidar_reporte_admin()
     db.session.commit()
+    Usuario.invalidar_cache(alumno.id_usuario)
+    invalidar_etiquetas("alumnos")
     return alumno
 
 def eliminar_alumno(alumno_id):
     alumno = Alumno.query.get_or_404(alumno_id)
     alumno.activo = False
+    invalidar_reporte_admin()
     db.session.commit()
+    Usuario.invalidar_cache(alumno.id_usuario)
+    invalidar_etiquetas("alumnos")
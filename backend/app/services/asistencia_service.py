@@ -4,6 +4,8 @@ from app.extensions import db
 from sqlalchemy import func, and_
 from werkzeug.exceptions import BadRequest
 from app.datetime_utils import now_peru, combine_peru
+from app.services.reporte_service import invalidar_reporte_admin
+from app.cache_utils import invalidar_etiquetas
 
 def registrar_asistencia(data):
     reserva = Reserva.query.get_or_404(data["id_reserva"])
@@ -103,7 +105,9 @@ def registrar_asistencia(data):
         if nuevo_numero_clase >= total_clases:
             matricula.estado_clases = "completado"
 
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("matriculas", "tickets")
     return asistencia, ticket
 
 def listar_asistencias(id_usuario=None):
@@ -2,6 +2,7 @@ from app.models.auto import Auto
 from app.models.tipo_auto import TipoAuto
 from app.extensions import db
 from werkzeug.exceptions import BadRequest
+from app.services.reporte_service import invalidar_reporte_admin
 
 def crear_auto(data):
     placa = data["placa"]
@@ -23,6 +24,7 @@ def crear_auto(data):
     )
     
     db.session.add(auto)
+    invalidar_reporte_admin()
     db.session.commit()
     return auto
 
@@ -42,10 +44,12 @@ def actualizar_auto(auto_id, data):
         if campo in data:
             setattr(auto, campo, data[campo])
     
+    invalidar_reporte_admin()
     db.session.commit()
     return auto
 
 def eliminar_auto(auto_id):
     auto = Auto.query.get_or_404(auto_id)
     auto.activo = False
+    invalidar_reporte_admin()
     db.session.commit()
\ No newline at end of file
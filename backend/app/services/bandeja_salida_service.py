@@ -0,0 +1,227 @@
+import random
+import smtplib
+from datetime import timedelta
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import insert, update, func, or_, and_
+from app.extensions import db, mail
+from app.models import CorreoSaliente
+from app.datetime_utils import now_peru
+from app.metricas import actualizar_cola_correos
+
+# Bandeja de salida persistente: los correos se guardan en correos_salientes y un worker
+# los envia por lotes reutilizando una conexion SMTP. Un correo reclamado queda en estado
+# 'enviando' con una reserva (proximo_intento); si el worker muere, la reserva vence y
+# otro worker lo vuelve a tomar. Los fallos de un destinatario se reintentan con espera
+# exponencial; una caida del servidor SMTP (conexion o autenticacion) no cuenta como intento.
+
+# Errores de un destinatario: el resto del lote sigue usando la misma conexion
+ERRORES_DESTINATARIO = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+    smtplib.SMTPNotSupportedError,
+    UnicodeError,
+)
+
+def encolar(mensajes, lote=None):
+    """
+    Guarda correos en la bandeja de salida
+
+    Args:
+        mensajes: lista de dicts con destinatario, asunto, cuerpo y opcionalmente cuerpo_html
+        lote: identificador comun para un envio masivo
+
+    Returns:
+        cantidad de correos encolados (se omiten los que no tienen destinatario)
+    """
+    ahora = now_peru()
+    filas = [
+        {
+            "destinatario": mensaje["destinatario"],
+            "asunto": mensaje["asunto"],
+            "cuerpo": mensaje["cuerpo"],
+            "cuerpo_html": mensaje.get("cuerpo_html"),
+            "lote": lote,
+            "estado": "pendiente",
+            "intentos": 0,
+            "proximo_intento": ahora,
+        }
+        for mensaje in mensajes if mensaje.get("destinatario")
+    ]
+    if filas:
+        db.session.execute(insert(CorreoSaliente), filas)
+        db.session.commit()
+        actualizar_cola_correos(contar_pendientes())
+    return len(filas)
+
+def contar_pendientes():
+    return db.session.query(func.count(CorreoSaliente.id)).filter(
+        CorreoSaliente.estado.in_(["pendiente", "enviando"])
+    ).scalar() or 0
+
+def estado_lote(lote):
+    """Cantidad de correos del lote por estado y los ultimos errores"""
+    conteos = dict(db.session.query(
+        CorreoSaliente.estado, func.count(CorreoSaliente.id)
+    ).filter(CorreoSaliente.lote == lote).group_by(CorreoSaliente.estado).all())
+
+    errores = db.session.query(
+        CorreoSaliente.destinatario, CorreoSaliente.intentos, CorreoSaliente.ultimo_error
+    ).filter(
+        CorreoSaliente.lote == lote,
+        CorreoSaliente.ultimo_error.isnot(None),
+    ).order_by(CorreoSaliente.id).limit(20).all()
+
+    return {
+        "total": sum(conteos.values()),
+        "estados": {estado: conteos.get(estado, 0) for estado in ("pendiente", "enviando", "enviado", "fallido")},
+        "errores": [
+            {"destinatario": destinatario, "intentos": intentos, "error": error}
+            for destinatario, intentos, error in errores
+        ],
+    }
+
+def _cupo_disponible(ahora):
+    """Correos que aun se pueden enviar en el minuto actual segun el limite del proveedor"""
+    limite = current_app.config["MAIL_LIMITE_POR_MINUTO"]
+    if not limite:
+        return current_app.config["MAIL_LOTE"]
+    usados = db.session.query(func.count(CorreoSaliente.id)).filter(
+        or_(
+            CorreoSaliente.fecha_enviado >= ahora - timedelta(minutes=1),
+            # Reclamados por otro worker y aun sin resultado
+            and_(CorreoSaliente.estado == "enviando", CorreoSaliente.proximo_intento > ahora),
+        )
+    ).scalar() or 0
+    return max(limite - usados, 0)
+
+def _reclamar(cantidad):
+    """Toma hasta `cantidad` correos listos; SKIP LOCKED evita que dos workers tomen el mismo"""
+    ahora = now_peru()
+    correos = CorreoSaliente.query.filter(
+        CorreoSaliente.estado.in_(["pendiente", "enviando"]),
+        CorreoSaliente.proximo_intento <= ahora,
+    ).order_by(CorreoSaliente.proximo_intento)\
+        .limit(cantidad)\
+        .with_for_update(skip_locked=True)\
+        .all()
+
+    reserva = ahora + timedelta(seconds=current_app.config["MAIL_RESERVA"])
+    datos = []
+    for correo in correos:
+        correo.estado = "enviando"
+        correo.intentos += 1
+        correo.proximo_intento = reserva
+        datos.append({
+            "id": correo.id,
+            "destinatario": correo.destinatario,
+            "asunto": correo.asunto,
+            "cuerpo": correo.cuerpo,
+            "cuerpo_html": correo.cuerpo_html,
+            "intentos": correo.intentos,
+        })
+    db.session.commit()
+    return datos
+
+def _espera_reintento(intentos):
+    base = current_app.config["MAIL_REINTENTO_BASE"]
+    espera = min(base * 2 ** (intentos - 1), current_app.config["MAIL_REINTENTO_MAX"])
+    # Variacion aleatoria para no reintentar todo el lote en el mismo segundo
+    return timedelta(seconds=espera + random.uniform(0, base))
+
+def _enviar(correos):
+    """
+    Envia los correos por una sola conexion
+
+    Returns:
+        (ids enviados, {id: error del destinatario}, error de conexion o None)
+    """
+    enviados, errores, error_conexion = [], {}, None
+    remitente = current_app.config["MAIL_DEFAULT_SENDER"]
+    try:
+        with mail.connect() as conexion:
+            for correo in correos:
+                msg = Message(correo["asunto"], sender=remitente, recipients=[correo["destinatario"]])
+                msg.body = correo["cuerpo"]
+                msg.html = correo["cuerpo_html"]
+                try:
+                    conexion.send(msg)
+                    enviados.append(correo["id"])
+                except ERRORES_DESTINATARIO as e:
+                    current_app.logger.warning(f"Error enviando email a {correo['destinatario']}: {e}")
+                    errores[correo["id"]] = str(e)
+    except (smtplib.SMTPException, OSError) as e:
+        # Conexion o autenticacion fallida: los no enviados vuelven a la cola
+        current_app.logger.error(f"Error SMTP ({len(enviados)}/{len(correos)} enviados): {e}")
+        error_conexion = str(e)
+    return enviados, errores, error_conexion
+
+def _registrar_resultados(correos, enviados, errores, error_conexion=None):
+    ahora = now_peru()
+    max_intentos = current_app.config["MAIL_MAX_INTENTOS"]
+    cambios = [
+        {"id": id, "estado": "enviado", "fecha_enviado": ahora, "ultimo_error": None}
+        for id in enviados
+    ]
+    enviados = set(enviados)
+    fallidos = 0
+    for correo in correos:
+        if correo["id"] in enviados:
+            continue
+        error = errores.get(correo["id"])
+        if error is None:
+            # No se llego a intentar por la caida del servidor: se devuelve el intento
+            cambios.append({
+                "id": correo["id"],
+                "estado": "pendiente",
+                "intentos": correo["intentos"] - 1,
+                "proximo_intento": ahora + _espera_reintento(1),
+                "ultimo_error": (error_conexion or "")[:1000],
+            })
+            continue
+        agotado = correo["intentos"] >= max_intentos
+        fallidos += agotado
+        cambios.append({
+            "id": correo["id"],
+            "estado": "fallido" if agotado else "pendiente",
+            "proximo_intento": ahora + _espera_reintento(correo["intentos"]),
+            "ultimo_error": error[:1000],
+        })
+    if cambios:
+        db.session.execute(update(CorreoSaliente), cambios)
+        db.session.commit()
+    return fallidos
+
+def procesar_correos(max_lotes=None):
+    """
+    Envia los correos pendientes respetando MAIL_LOTE y MAIL_LIMITE_POR_MINUTO
+
+    Returns:
+        dict con enviados, reintentos, fallidos y pendientes
+    """
+    resumen = {"enviados": 0, "reintentos": 0, "fallidos": 0, "lotes": 0}
+    if not current_app.config["MAIL_DEFAULT_SENDER"]:
+        current_app.logger.error("MAIL_DEFAULT_SENDER/MAIL_USERNAME no configurado, no se envian correos")
+        max_lotes = 0
+    while max_lotes is None or resumen["lotes"] < max_lotes:
+        cupo = min(_cupo_disponible(now_peru()), current_app.config["MAIL_LOTE"])
+        if not cupo:
+            break
+        correos = _reclamar(cupo)
+        if not correos:
+            break
+
+        enviados, errores, error_conexion = _enviar(correos)
+        fallidos = _registrar_resultados(correos, enviados, errores, error_conexion)
+        resumen["lotes"] += 1
+        resumen["enviados"] += len(enviados)
+        resumen["fallidos"] += fallidos
+        resumen["reintentos"] += len(correos) - len(enviados) - fallidos
+        if error_conexion or (errores and not enviados):
+            # El servidor no acepta correos; se reintenta en la siguiente ejecucion
+            break
+
+    resumen["pendientes"] = contar_pendientes()
+    actualizar_cola_correos(resumen["pendientes"])
+    return resumen
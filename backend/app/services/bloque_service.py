@@ -3,53 +3,41 @@ from app.models import Bloque, Matricula
 from werkzeug.exceptions import BadRequest
 from app.datetime_utils import now_peru
 
-def obtener_bloques_semanal(id_alumno=None, por_admin=False, semana_offset=0):
+def calcular_lunes_semana(semana_offset=0, por_admin=False):
     # semana_offset: -1 (anterior), 0 (actual), 1 (siguiente)
     
     # Restricción de semanas según tipo de usuario
     if not por_admin and semana_offset not in [-1, 0, 1]:
         raise BadRequest("Los alumnos solo pueden ver la semana actual o las adyacentes (anterior o siguiente).")
 
-    ahora = now_peru()
-    hoy = ahora.date() 
+    hoy = now_peru().date()
     
     # Calcular el lunes de la semana objetivo
     dias_desde_lunes = hoy.weekday()  # 0 = lunes, 6 = domingo
     lunes_semana_actual = hoy - timedelta(days=dias_desde_lunes)
-    lunes_semana_objetivo = lunes_semana_actual + timedelta(weeks=semana_offset)
-    
+    return lunes_semana_actual + timedelta(weeks=semana_offset)
+
+def listar_bloques_semana(lunes):
     # Rango de la semana (lunes a domingo)
-    fecha_inicio = lunes_semana_objetivo
-    fecha_fin = lunes_semana_objetivo + timedelta(days=6)
+    fecha_inicio = lunes
+    fecha_fin = lunes + timedelta(days=6)
     
-    # Obtener todos los bloques de la semana
-    bloques = Bloque.query.filter(
+    return Bloque.query.filter(
         Bloque.fecha >= fecha_inicio,
         Bloque.fecha <= fecha_fin
     ).order_by(Bloque.fecha, Bloque.hora_inicio).all()
-    
-    # Verificar matrícula activa para alumnos
-    if id_alumno:
-        matricula = Matricula.query.filter(
-            Matricula.id_alumno == id_alumno,
-            Matricula.fecha_limite >= ahora,
-        ).order_by(Matricula.fecha_matricula.desc()).first()
-        
-        if not matricula:
-            return []
 
-        # Obtener la fecha limite de la matrícula 
-        fecha_limite = matricula.fecha_limite
-        if isinstance(fecha_limite, datetime):
-            fecha_limite = fecha_limite.date()
-
-        # Filtrar bloques que no excedan la fecha limite de la matrícula
-        bloques_filtrados = []
-        for bloque in bloques:
-            fecha_bloque = bloque.fecha
-            if fecha_bloque <= fecha_limite:
-                bloques_filtrados.append(bloque)
-        
-        return bloques_filtrados
+def obtener_fecha_limite_alumno(id_alumno):
+    # Fecha limite de la matricula activa mas reciente, None si no tiene
+    matricula = Matricula.query.filter(
+        Matricula.id_alumno == id_alumno,
+        Matricula.fecha_limite >= now_peru(),
+    ).order_by(Matricula.fecha_matricula.desc()).first()
+    
+    if not matricula:
+        return None
 
-    return bloques
\ No newline at end of file
+    fecha_limite = matricula.fecha_limite
+    if isinstance(fecha_limite, datetime):
+        fecha_limite = fecha_limite.date()
+    return fecha_limite
@@ -0,0 +1,172 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from itertools import islice
+from flask import current_app
+from sqlalchemy import and_, or_, false, true, func, literal_column
+from app.extensions import db
+from app.models.alumno import Alumno
+from app.models.instructor import Instructor
+from app.cache_utils import versiones_etiquetas
+
+# Busqueda de alumnos e instructores sin distinguir mayusculas ni tildes ("jose" encuentra
+# "José"). Cada palabra del termino debe aparecer en nombre, apellidos, DNI o email.
+#
+# En Postgres se usa la funcion inmutable busqueda_normalizada (unaccent + lower) con un
+# indice GIN pg_trgm que resuelve LIKE '%termino%' (ver migracion a4c8e1f0b9d2). Si la base
+# no tiene esas extensiones, o con otros motores, se usa un indice de trigramas en memoria
+# por proceso, que se reconstruye cuando cambia la version de la etiqueta de cache.
+# Sin indice que sirva se compara columna por columna con LIKE: cuando ninguna palabra llega a
+# BUSQUEDA_MIN_CARACTERES (apellidos como "Li", sin trigramas que los acoten) se busca como
+# inicio de palabra, y cuando el indice en memoria encuentra mas de BUSQUEDA_MAX_RESULTADOS
+# filas se busca como subcadena, en vez de pasar una lista IN enorme a la consulta.
+
+FUNCION_NORMALIZAR = "busqueda_normalizada"
+TAMANO_NGRAMA = 3
+TILDES, SIN_TILDES = "áàäâéèëêíìïîóòöôúùüûñç", "aaaaeeeeiiiioooouuuunc"
+
+def normalizar(texto):
+    """Minusculas, sin tildes y con espacios simples: "  José  PÉREZ" -> "jose perez" """
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sin_tildes).strip().lower()
+
+def es_dni(termino):
+    return bool(re.fullmatch(r"\d{8}", termino.strip()))
+
+def _ngramas(texto):
+    return {texto[i:i + TAMANO_NGRAMA] for i in range(len(texto) - TAMANO_NGRAMA + 1)}
+
+class IndiceNgramas:
+    """Indice invertido de trigramas sobre el texto normalizado de cada fila"""
+
+    def __init__(self):
+        self.version = None
+        self.textos = {}
+        self.ngramas = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def actualizar(self, version, cargar_filas):
+        if self.version == version:
+            return
+        with self._lock:
+            if self.version == version:
+                return
+            textos, ngramas = {}, defaultdict(set)
+            for id, *campos in cargar_filas():
+                texto = normalizar(" ".join(c for c in campos if c))
+                textos[id] = texto
+                for ngrama in _ngramas(texto):
+                    ngramas[ngrama].add(id)
+            self.textos, self.ngramas, self.version = textos, ngramas, version
+
+    def buscar(self, palabras, limite):
+        textos, ngramas = self.textos, self.ngramas
+        candidatos = None
+        for palabra in palabras:
+            if len(palabra) < TAMANO_NGRAMA:
+                continue
+            for ngrama in _ngramas(palabra):
+                ids = ngramas.get(ngrama, set())
+                candidatos = set(ids) if candidatos is None else candidatos & ids
+                if not candidatos:
+                    return []
+        if candidatos is None:
+            candidatos = textos.keys()
+        # Los trigramas solo descartan; se confirma la subcadena completa
+        encontrados = (id for id in candidatos if all(palabra in textos[id] for palabra in palabras))
+        return list(islice(encontrados, limite))
+
+_indices = {
+    "alumnos": IndiceNgramas(),
+    "instructores": IndiceNgramas(),
+}
+
+def _campos(modelo):
+    campos = [modelo.nombre, modelo.apellidos, modelo.dni]
+    if modelo is Alumno:
+        campos.append(modelo.email)
+    return campos
+
+def _usa_trigramas():
+    # Se verifica una vez por proceso que la migracion pudo crear la funcion
+    estado = current_app.extensions.setdefault("busqueda_trigramas", {})
+    if "disponible" not in estado:
+        disponible = False
+        if db.engine.dialect.name == "postgresql":
+            with db.engine.connect() as conexion:
+                disponible = conexion.exec_driver_sql(
+                    f"SELECT 1 FROM pg_proc WHERE proname = '{FUNCION_NORMALIZAR}'"
+                ).first() is not None
+        estado["disponible"] = disponible
+    return estado["disponible"]
+
+def _texto_indexado(modelo):
+    # Debe coincidir con la expresion del indice GIN de la migracion
+    espacio = literal_column("' '")
+    texto = modelo.nombre.concat(espacio).concat(modelo.apellidos).concat(espacio).concat(modelo.dni)
+    if modelo is Alumno:
+        texto = texto.concat(espacio).concat(func.coalesce(modelo.email, literal_column("''")))
+    return func.busqueda_normalizada(texto)
+
+def _escapar_like(palabra):
+    return palabra.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _sin_tildes(columna):
+    texto = func.lower(func.coalesce(columna, literal_column("''")))
+    if db.engine.dialect.name == "postgresql":
+        return func.translate(texto, TILDES, SIN_TILDES)
+    return texto  # las colaciones *_ci de MySQL ya ignoran las tildes
+
+def _filtro_sin_indice(modelo, palabras, inicio_de_palabra=False):
+    condiciones = []
+    for palabra in palabras:
+        palabra = _escapar_like(palabra)
+        patrones = [f"{palabra}%", f"% {palabra}%"] if inicio_de_palabra else [f"%{palabra}%"]
+        condiciones.append(or_(*[
+            _sin_tildes(campo).like(patron, escape="\\")
+            for campo in _campos(modelo) for patron in patrones
+        ]))
+    return and_(*condiciones)
+
+def _filtro(modelo, etiqueta, busqueda):
+    palabras = normalizar(busqueda).split()
+    if not palabras:
+        return true()
+
+    # DNI completo: coincidencia exacta por el indice unico
+    if len(palabras) == 1 and es_dni(palabras[0]):
+        return modelo.dni == palabras[0]
+
+    # Palabras muy cortas: como subcadena coincidirian con casi todas las filas
+    if max(len(palabra) for palabra in palabras) < current_app.config["BUSQUEDA_MIN_CARACTERES"]:
+        return _filtro_sin_indice(modelo, palabras, inicio_de_palabra=True)
+
+    if _usa_trigramas():
+        texto = _texto_indexado(modelo)
+        return and_(*[texto.like(f"%{_escapar_like(palabra)}%", escape="\\") for palabra in palabras])
+
+    indice = _indices[etiqueta]
+    indice.actualizar(
+        versiones_etiquetas([etiqueta])[0],
+        lambda: db.session.query(modelo.id, *_campos(modelo)).all()
+    )
+    maximo = current_app.config["BUSQUEDA_MAX_RESULTADOS"]
+    ids = indice.buscar(palabras, maximo + 1)
+    if len(ids) > maximo:
+        return _filtro_sin_indice(modelo, palabras)
+    return modelo.id.in_(ids) if ids else false()
+
+def filtro_alumnos(busqueda):
+    """Condicion sobre Alumno para el parametro busqueda"""
+    return _filtro(Alumno, "alumnos", busqueda)
+
+def filtro_instructores(busqueda):
+    """Condicion sobre Instructor para el parametro busqueda"""
+    return _filtro(Instructor, "instructores", busqueda)
+
+def filtro_id(columna, busqueda):
+    """Coincidencia exacta por id cuando el termino es un numero (ej. numero de ticket)"""
+    termino = busqueda.strip()
+    return columna == int(termino) if termino.isdigit() and len(termino) < 10 else false()
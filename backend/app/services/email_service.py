@@ -1,163 +1,144 @@
-from flask_mail import Message
 from flask import current_app
 from concurrent.futures import ThreadPoolExecutor
-import smtplib
+import threading
+import uuid
+from app.extensions import db
+from app.services import bandeja_salida_service
+from app.plantillas_correo import renderizar, renderizar_lote
 
-# 3 hilos
-email_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="email-")
+# Un hilo por worker que vacia la bandeja de salida apenas se encolan correos;
+# lo que no se alcance a enviar (reinicio, reintentos) lo procesa el cron procesar-correos
+email_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-")
 
 class EmailService:
     def __init__(self):
         self.executor = email_executor
-    
-    def enviar_async(self, destinatario, asunto, cuerpo):
+        self._lock = threading.Lock()
+        self._siguiente = None
+
+    def enviar_async(self, destinatario, asunto, cuerpo, cuerpo_html=None):
+        self.enviar_lote_async([(destinatario, asunto, cuerpo, cuerpo_html)])
+
+    def enviar_lote_async(self, mensajes, lote=None):
+        """Encola varios correos (destinatario, asunto, cuerpo, cuerpo_html) y despierta al worker de envio"""
+        encolados = bandeja_salida_service.encolar([
+            {"destinatario": destinatario, "asunto": asunto, "cuerpo": cuerpo, "cuerpo_html": cuerpo_html}
+            for destinatario, asunto, cuerpo, cuerpo_html in mensajes
+        ], lote=lote)
+        if encolados:
+            self.despachar()
+        return encolados
+
+    def _enviar_plantilla(self, destinatario, plantilla, **contexto):
+        asunto, cuerpo, cuerpo_html = renderizar(plantilla, **contexto)
+        self.enviar_async(destinatario, asunto, cuerpo, cuerpo_html)
+
+    def _enviar_plantilla_lote(self, plantilla, destinatarios, contextos):
+        """Renderiza y encola un lote; retorna (id del lote, cantidad encolada)"""
+        lote = str(uuid.uuid4())
+        mensajes = [
+            (destinatario, asunto, cuerpo, cuerpo_html)
+            for destinatario, (asunto, cuerpo, cuerpo_html) in zip(destinatarios, renderizar_lote(plantilla, contextos))
+        ]
+        return lote, self.enviar_lote_async(mensajes, lote=lote)
+
+    def despachar(self):
+        if not current_app.config["MAIL_ENVIO_INMEDIATO"]:
+            return
         app = current_app._get_current_object()
-        self.executor.submit(self._enviar_sync, app, destinatario, asunto, cuerpo)
-    
-    def _enviar_sync(self, app, destinatario, asunto, cuerpo):
-        with app.app_context():
-          try:
-              mail = current_app.extensions.get("mail")
-              if not mail:
-                  print("Flask-Mail no inicializado")
-                  return False
-                  
-              msg = Message(
-                  asunto,
-                  sender=current_app.config["MAIL_USERNAME"],
-                  recipients=[destinatario]
-              )
-              msg.body = cuerpo
-              
-              # Usar contexto de aplicación para threads
-              with current_app.app_context():
-                  mail.send(msg)
-                  return True
-                  
-          except smtplib.SMTPAuthenticationError as e:
-              print(f"Error SMTP autenticación: {str(e)}")
-              return False
-          except Exception as e:
-              print(f"Error enviando email a {destinatario}: {str(e)}")
-              return False
-    
-    def enviar_bienvenida(self, alumno):
-        asunto = "¡Bienvenido a la Escuela de Manejo Jesús Nazareno!"
-        cuerpo = f"""
-                Hola {alumno.nombre},
-
-                ¡Te damos la más cordial bienvenida a nuestra escuela de manejo!
-
-                Tu registro ha sido exitosamente completado. A partir de ahora formas parte de una comunidad comprometida con la educación vial segura y responsable.
-
-                Datos de tu cuenta:
-                - Nombre: {alumno.nombre} {alumno.apellidos}
-                - DNI: {alumno.dni}
-                - Email: {alumno.email}
-
-                Para iniciar sesión usa tu DNI como usuario y contraseña.
-
-                Si tienes alguna duda o necesitas ayuda, no dudes en contactarnos.
-                Número: 908914487
-
-                🚗¡Nos vemos en clase!
-
-                Atentamente,
-                Escuela de Manejo Jesús Nazareno
-                """
-        self.enviar_async(alumno.email, asunto, cuerpo)
-
-    def enviar_recordatorio_reserva(self, reserva):
-        alumno = reserva.matricula.alumno
-        asunto = "Recordatorio: Tienes una clase programada"
-        cuerpo = f"""
-                Hola {alumno.nombre},
-
-                Te recordamos que tienes una clase programada:
-
-                📅 Fecha: {reserva.bloque.fecha}
-                🕐 Hora: {reserva.bloque.hora_inicio} - {reserva.bloque.hora_fin}
-                ⏱️ Duración: {reserva.duracion_horas} horas
+        with self._lock:
+            # Si ya hay una tarea esperando, esa tomara tambien los correos nuevos
+            if self._siguiente is None or self._siguiente.running() or self._siguiente.done():
+                self._siguiente = self.executor.submit(self._procesar, app)
 
-                ¡No faltes!
-
-                Atentamente,  
-                Escuela de Manejo Jesús Nazareno
-                """
-        self.enviar_async(alumno.email, asunto, cuerpo)
-    
-    def enviar_pago_pendiente(self, matricula):
-        alumno = matricula.alumno
-        asunto = "Recordatorio: Pago pendiente"
-        cuerpo = f"""
-              Hola {alumno.nombre},
-
-              Te recordamos que tienes un pago pendiente:
-
-              💰 Monto: S/ {matricula.monto_pendiente}
-              📋 Categoría: {matricula.categoria}
-
-              Por favor, acércate a la escuela para regularizar tu situación.
+    def _procesar(self, app):
+        with app.app_context():
+            try:
+                return bandeja_salida_service.procesar_correos()
+            except Exception:
+                app.logger.exception("Error procesando la bandeja de salida de correos")
+            finally:
+                db.session.remove()
 
-              Atentamente,  
-              Escuela de Manejo Jesús Nazareno
-              """
-        self.enviar_async(alumno.email, asunto, cuerpo)
+    def enviar_bienvenida(self, alumno):
+        self._enviar_plantilla(
+            alumno.email, "bienvenida",
+            nombre=alumno.nombre, apellidos=alumno.apellidos, dni=alumno.dni, email=alumno.email
+        )
+
+    def enviar_bienvenidas(self, alumnos):
+        """Bienvenida a varios alumnos (dicts con nombre, apellidos, dni y email) en un solo lote"""
+        alumnos = [alumno for alumno in alumnos if alumno.get("email")]
+        return self._enviar_plantilla_lote(
+            "bienvenida",
+            [alumno["email"] for alumno in alumnos],
+            [
+                {"nombre": alumno["nombre"], "apellidos": alumno["apellidos"], "dni": alumno["dni"], "email": alumno["email"]}
+                for alumno in alumnos
+            ]
+        )
+
+    def enviar_recordatorios_reserva(self, filas):
+        """
+        Encola los recordatorios de clase como un solo lote
+
+        Args:
+            filas: resultado de verificar_clases_reservadas (datos ya cargados, sin lazy loads)
+
+        Returns:
+            (id del lote, cantidad de correos encolados)
+        """
+        return self._enviar_plantilla_lote(
+            "recordatorio_reserva",
+            [fila.email for fila in filas],
+            [
+                {
+                    "nombre": fila.nombre, "fecha": fila.fecha, "hora_inicio": fila.hora_inicio,
+                    "hora_fin": fila.hora_fin, "duracion_horas": fila.duracion_horas
+                }
+                for fila in filas
+            ]
+        )
+
+    def enviar_pagos_pendientes(self, filas):
+        """
+        Encola los recordatorios de pago como un solo lote
+
+        Args:
+            filas: resultado de verificar_pagos_pendiente
+
+        Returns:
+            (id del lote, cantidad de correos encolados)
+        """
+        return self._enviar_plantilla_lote(
+            "pago_pendiente",
+            [fila.email for fila in filas],
+            [
+                {"nombre": fila.nombre, "monto_pendiente": fila.monto_pendiente, "categoria": fila.categoria}
+                for fila in filas
+            ]
+        )
 
     def enviar_final_clases(self, matricula):
-        alumno = matricula.alumno
-        tipo = matricula.tipo_contratacion
-        asunto = "¡Gracias por completar tus clases en nuestra escuela!"
-        cuerpo = f"""
-            Hola {alumno.nombre},
-
-            Queremos agradecerte por haber completado todas tus clases de manejo. ¡Felicidades por este logro!
-
-            { "Como contrataste un paquete, tu plan ha finalizado con éxito." if tipo == "paquete" else "Has completado todas las horas contratadas." }
-
-            Si deseas seguir practicando o perfeccionar tus habilidades, puedes inscribirte nuevamente eligiendo la modalidad por horas.
-
-            Para más información, contáctanos o visita nuestras oficinas.
-
-            ¡Gracias por confiar en nosotros!
-            
-            Atentamente,  
-            Escuela de Manejo Jesús Nazareno
-            """
-        self.enviar_async(alumno.email, asunto, cuerpo)
+        self._enviar_plantilla(
+            matricula.alumno.email, "final_clases",
+            nombre=matricula.alumno.nombre, tipo_contratacion=matricula.tipo_contratacion
+        )
 
     def enviar_matricula_creada(self, matricula):
-        alumno = matricula.alumno
-        asunto = "Matrícula confirmada en la Escuela de Manejo Jesús Nazareno"
-        cuerpo = f"""
-            Hola {alumno.nombre},
-
-            ¡Tu matrícula ha sido registrada con éxito!
-
-            📝 Detalles de la matrícula:
-            - Categoría: {matricula.categoria}
-            - Tipo de contratación: {"Paquete" if matricula.tipo_contratacion == "paquete" else  "Por hora"}
-            """
-        if matricula.tipo_contratacion == "por_hora":
-            cuerpo += f"""- Horas contratadas: {matricula.horas_contratadas}
-                    - Tarifa por hora: S/. {matricula.tarifa_por_hora:.2f}
-                    """
-        elif matricula.tipo_contratacion == "paquete" and matricula.paquete:
-            cuerpo += f"""- Paquete: {matricula.paquete.nombre} ({matricula.paquete.horas_total} horas)
-                    - Costo del paquete: S/. {matricula.paquete.costo_total:.2f}
-                    """
-
-        cuerpo += f"""
-            - Fecha de matrícula: {matricula.fecha_matricula.strftime('%d/%m/%Y')}
-            - Costo total: S/. {matricula.costo_total:.2f}
-
-            💬 Recuerda que pronto podrás ver tus horarios y reservar tus clases prácticas desde tu cuenta.
-
-            Gracias por elegirnos 🚗
-
-            Atentamente,  
-            Escuela de Manejo Jesús Nazareno
-            """
-        self.enviar_async(alumno.email, asunto, cuerpo)
+        paquete = matricula.paquete if matricula.tipo_contratacion == "paquete" else None
+        self._enviar_plantilla(
+            matricula.alumno.email, "matricula_creada",
+            nombre=matricula.alumno.nombre,
+            categoria=matricula.categoria,
+            tipo_contratacion=matricula.tipo_contratacion,
+            horas_contratadas=matricula.horas_contratadas,
+            tarifa_por_hora=matricula.tarifa_por_hora,
+            paquete_nombre=paquete.nombre if paquete else None,
+            paquete_horas=paquete.horas_total if paquete else None,
+            paquete_costo=paquete.costo_total if paquete else None,
+            fecha_matricula=matricula.fecha_matricula,
+            costo_total=matricula.costo_total
+        )
 
 email_service = EmailService()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import io
+import csv
+import json
+from datetime import date, datetime, time
+from flask import Response, stream_with_context
+from werkzeug.exceptions import BadRequest
+from app.datetime_utils import today_peru
+
+# Exportaciones en streaming: la consulta se recorre con yield_per (cursor del lado
+# del servidor en Postgres) y cada lote se escribe a la respuesta apenas se lee, por lo
+# que la memoria usada no depende de la cantidad de filas exportadas.
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+def _valor_json(valor):
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    return valor
+
+def _filas_csv(query, columnas, tamano_lote):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")  # BOM para que Excel reconozca UTF-8
+    escritor.writerow([nombre for nombre, _ in columnas])
+
+    for i, fila in enumerate(query.yield_per(tamano_lote), start=1):
+        escritor.writerow([obtener(fila) for _, obtener in columnas])
+        if i % tamano_lote == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _filas_jsonl(query, columnas, tamano_lote):
+    lote = []
+    for fila in query.yield_per(tamano_lote):
+        registro = {nombre: _valor_json(obtener(fila)) for nombre, obtener in columnas}
+        lote.append(json.dumps(registro, ensure_ascii=False))
+        if len(lote) == tamano_lote:
+            yield "\n".join(lote) + "\n"
+            lote = []
+    if lote:
+        yield "\n".join(lote) + "\n"
+
+def respuesta_exportacion(query, columnas, nombre, formato="csv", tamano_lote=1000):
+    """
+    Genera una respuesta en streaming con las filas de la consulta
+
+    Args:
+        query: consulta ORM ya filtrada y ordenada
+        columnas: lista de (encabezado, funcion que recibe la fila y retorna el valor)
+        nombre: prefijo del archivo descargado
+        formato: "csv" o "jsonl"
+    """
+    if formato not in FORMATOS:
+        raise BadRequest(f"Formato no soportado, use: {', '.join(FORMATOS)}")
+
+    generador = _filas_csv if formato == "csv" else _filas_jsonl
+    return Response(
+        stream_with_context(generador(query, columnas, tamano_lote)),
+        content_type=FORMATOS[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{nombre}_{today_peru():%Y%m%d}.{formato}"',
+            "Cache-Control": "no-store",
+        },
+    )
@@ -0,0 +1,98 @@
+import os
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from flask_praetorian.exceptions import AuthenticationError
+from app.extensions import guard, db
+from app.models.usuario import Usuario
+
+# El hash de contraseñas (pbkdf2) consume CPU durante decenas de milisegundos.
+# Se ejecuta en un pool acotado de procesos para no ocupar el worker que atiende
+# la request; con HASH_PROCESOS=0 se calcula en el mismo proceso.
+
+_configuracion = {"contexto": None, "procesos": 0, "timeout": 30}
+_executor = None
+_executor_pid = None
+
+# Contexto de passlib dentro de cada proceso del pool
+_contexto_proceso = None
+
+def _iniciar_proceso(contexto):
+    global _contexto_proceso
+    # Mismo contexto que praetorian: todos los esquemas permitidos y sus costos
+    _contexto_proceso = CryptContext(**contexto)
+
+def _hashear(contrasena):
+    return _contexto_proceso.hash(contrasena)
+
+def _verificar(contrasena, contrasena_hash):
+    return _contexto_proceso.verify(contrasena, contrasena_hash)
+
+def configurar_hash(app):
+    """Aplica el costo configurado al contexto de praetorian y prepara el pool"""
+    esquema = guard.pwd_ctx.default_scheme()
+    rounds = app.config["HASH_ROUNDS"]
+    if rounds:
+        guard.pwd_ctx.update(**{f"{esquema}__default_rounds": rounds})
+    _configuracion.update(
+        contexto=guard.pwd_ctx.to_dict(),
+        procesos=app.config["HASH_PROCESOS"],
+        timeout=app.config["HASH_TIMEOUT"],
+    )
+
+def _obtener_executor():
+    global _executor, _executor_pid
+    # Cada worker de gunicorn crea su propio pool (no se hereda tras un fork)
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(
+            max_workers=_configuracion["procesos"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_proceso,
+            initargs=(_configuracion["contexto"],),
+        )
+        _executor_pid = os.getpid()
+    return _executor
+
+def _cerrar_executor():
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+atexit.register(_cerrar_executor)
+
+def hashear_contrasena(contrasena):
+    if not _configuracion["procesos"]:
+        return guard.hash_password(contrasena)
+    return _obtener_executor().submit(_hashear, contrasena).result(timeout=_configuracion["timeout"])
+
+def hashear_contrasenas(contrasenas):
+    """Hashea varias contraseñas en paralelo, conservando el orden"""
+    contrasenas = list(contrasenas)
+    if not _configuracion["procesos"]:
+        return [guard.hash_password(contrasena) for contrasena in contrasenas]
+    chunksize = max(1, len(contrasenas) // (_configuracion["procesos"] * 4))
+    return list(_obtener_executor().map(
+        _hashear, contrasenas, chunksize=chunksize, timeout=_configuracion["timeout"] * chunksize
+    ))
+
+def verificar_contrasena(contrasena, contrasena_hash):
+    if not _configuracion["procesos"]:
+        return guard._verify_password(contrasena, contrasena_hash)
+    return _obtener_executor().submit(
+        _verificar, contrasena, contrasena_hash
+    ).result(timeout=_configuracion["timeout"])
+
+def autenticar(nombre_usuario, contrasena):
+    """Equivalente a guard.authenticate con la verificacion fuera del worker"""
+    usuario = Usuario.lookup(nombre_usuario)
+    AuthenticationError.require_condition(
+        usuario is not None and verificar_contrasena(contrasena, usuario.password),
+        "The username and/or password are incorrect",
+    )
+
+    # Como PRAETORIAN_HASH_AUTOUPDATE: un hash con esquema o costo desactualizado se
+    # reemplaza ahora que se conoce la contraseña
+    if guard.pwd_ctx.needs_update(usuario.password):
+        usuario.contraseña_hash = hashear_contrasena(contrasena)
+        db.session.commit()
+    return usuario
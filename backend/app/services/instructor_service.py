@@ -1,6 +1,9 @@
 from app.models.usuario import Usuario
 from app.models.instructor import Instructor
-from app.extensions import db, guard
+from app.extensions import db
+from app.cache_utils import invalidar_etiquetas
+from app.services.hash_service import hashear_contrasena
+from app.services.reporte_service import invalidar_reporte_admin
 from werkzeug.exceptions import BadRequest
 
 def crear_instructor(data):
@@ -11,7 +14,7 @@ def crear_instructor(data):
     # Crear usuario
     usuario = Usuario(
         nombre_usuario=dni,
-        contraseña_hash=guard.hash_password(dni),
+        contraseña_hash=hashear_contrasena(dni),
         rol="instructor"
     )
     db.session.add(usuario)
@@ -27,7 +30,9 @@ def crear_instructor(data):
         email=data["email"],
     )
     db.session.add(instructor)
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("instructores")
     return instructor
 
 def listar_instructores():
@@ -40,10 +45,16 @@ def actualizar_instructor(instructor_id, data):
         if campo in data:
             setattr(instructor, campo, data[campo])
 
+    invalidar_reporte_admin()
     db.session.commit()
+    Usuario.invalidar_cache(instructor.id_usuario)
+    invalidar_etiquetas("instructores")
     return instructor
 
 def eliminar_instructor(instructor_id):
     instructor = Instructor.query.get_or_404(instructor_id)
     instructor.activo = False
-    db.session.commit()
\ No newline at end of file
+    invalidar_reporte_admin()
+    db.session.commit()
+    Usuario.invalidar_cache(instructor.id_usuario)
+    invalidar_etiquetas("instructores")
\ No newline at end of file
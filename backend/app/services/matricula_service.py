@@ -1,4 +1,5 @@
 from datetime import timedelta
+from collections import Counter
 from app.models.bloque import Bloque
 from app.models.reserva import Reserva
 from app.models.asistencia import Asistencia
@@ -7,9 +8,14 @@ from app.models.alumno import Alumno
 from app.models.paquete import Paquete
 from app.models.pago import Pago
 from app.extensions import db
-from sqlalchemy import func, desc, or_
+from sqlalchemy import func, desc, case
+from sqlalchemy.orm import contains_eager
 from werkzeug.exceptions import BadRequest
-from app.datetime_utils import now_peru
+from app.datetime_utils import now_peru, today_peru
+from app.services.reporte_service import invalidar_reporte_admin
+from app.cache_utils import invalidar_etiquetas, etiqueta_semana_bloques
+from app.paginacion import paginar_por_cursor
+from app.services.busqueda_service import filtro_alumnos
 
 def crear_matricula(data):
     alumno = Alumno.query.get_or_404(data["id_alumno"])
@@ -71,9 +77,61 @@ def crear_matricula(data):
         raise BadRequest("Tipo de contratación no válido")
 
     db.session.add(matricula)
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("matriculas", "alumnos")
     return matricula
 
+def consulta_matriculas(
+    busqueda=None,
+    estado_clases=None,
+    estado_pago=None,
+    tipo_contratacion=None
+):
+    """Consulta filtrada de matriculas usada por el listado y la exportacion"""
+    query = Matricula.query.join(Alumno).outerjoin(Paquete)\
+     .options(
+        contains_eager(Matricula.alumno),
+        contains_eager(Matricula.paquete).joinedload(Paquete.tipo_auto)
+     )
+
+    # Filtro por busqueda
+    if busqueda:
+        query = query.filter(filtro_alumnos(busqueda))
+    
+    # Filtro por estado de clases
+    if estado_clases:
+        query = query.filter(Matricula.estado_clases == estado_clases)
+    
+    # Filtro por estado de pago
+    if estado_pago:
+        query = query.filter(Matricula.estado_pago == estado_pago)
+    
+    # Filtro por tipo de contratacion
+    if tipo_contratacion:
+        query = query.filter(Matricula.tipo_contratacion == tipo_contratacion)
+    
+    # Ordenación
+    return query.order_by(desc(Matricula.fecha_matricula), desc(Matricula.id))
+
+# Columnas de la exportacion de matriculas
+COLUMNAS_EXPORTACION = [
+    ("id", lambda m: m.id),
+    ("dni_alumno", lambda m: m.alumno.dni),
+    ("nombre_alumno", lambda m: f"{m.alumno.nombre} {m.alumno.apellidos}"),
+    ("categoria", lambda m: m.categoria),
+    ("tipo_contratacion", lambda m: m.tipo_contratacion),
+    ("paquete", lambda m: m.paquete.nombre if m.paquete else None),
+    ("fecha_matricula", lambda m: m.fecha_matricula),
+    ("fecha_limite", lambda m: m.fecha_limite),
+    ("estado_clases", lambda m: m.estado_clases),
+    ("horas_completadas", lambda m: m.horas_completadas),
+    ("estado_pago", lambda m: m.estado_pago),
+    ("costo_total", lambda m: m.costo_total),
+    ("pagos_realizados", lambda m: m.total_pagado),
+    ("saldo_pendiente", lambda m: m.saldo_pendiente),
+]
+
 def listar_matriculas(
     page=1,
     per_page=20,
@@ -82,7 +140,9 @@ def listar_matriculas(
     estado_pago=None,
     tipo_contratacion=None,
     id_matricula=None,
-    id_alumno=None
+    id_alumno=None,
+    cursor=None,
+    total=None
 ):
     if id_matricula or id_alumno:
         if id_matricula:
@@ -94,9 +154,6 @@ def listar_matriculas(
             # Validar que el alumno tenga una matrícula
             matricula = Matricula.query.filter_by(id_alumno=alumno.id).first_or_404()
         
-        # Calcular pagos realizados
-        pagos_realizados = db.session.query(func.sum(Pago.monto)).filter_by(id_matricula=matricula.id).scalar() or 0.0
-
         # Calcular reservas pendientes (futuras sin asistencia)
         ahora = now_peru()
         reservas_pendientes = db.session.query(func.count(Reserva.id)).join(Bloque).filter(
@@ -121,108 +178,80 @@ def listar_matriculas(
         horas_disponibles_reserva = horas_contratadas - matricula.horas_completadas - reservas_pendientes
         
         # atributos temporales
-        matricula.pagos_realizados = float(pagos_realizados)
-        matricula.saldo_pendiente = float(matricula.costo_total - pagos_realizados)
         matricula.reservas_pendientes = reservas_pendientes
         matricula.horas_disponibles_reserva = horas_disponibles_reserva
         
         return matricula
 
     else:  
-        query = db.session.query(Matricula).join(Alumno).outerjoin(Paquete)
-
-        # Filtro por busqueda
-        if busqueda:
-            busqueda_like = f"%{busqueda.lower()}%"
-            query = query.filter(
-                or_(
-                    Alumno.nombre.ilike(busqueda_like),
-                    Alumno.apellidos.ilike(busqueda_like),
-                    Alumno.dni.ilike(busqueda_like),
-                )
-            )
-        
-        # Filtro por estado de clases
-        if estado_clases:
-            query = query.filter(Matricula.estado_clases == estado_clases)
-        
-        # Filtro por estado de pago
-        if estado_pago:
-            query = query.filter(Matricula.estado_pago == estado_pago)
-        
-        # Filtro por tipo de contratacion
-        if tipo_contratacion:
-            query = query.filter(Matricula.tipo_contratacion == tipo_contratacion)
-        
-        # Ordenación
-        query = query.order_by(desc(Matricula.fecha_matricula), desc(Matricula.id))
+        query = consulta_matriculas(busqueda, estado_clases, estado_pago, tipo_contratacion)
         
-        # Paginación
-        resultado = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-        
-        for matricula in resultado.items:
-            # Calcular pagos realizados
-            pagos_realizados = db.session.query(func.sum(Pago.monto)).filter_by(id_matricula=matricula.id).scalar() or 0.0
-            
-            #  atributos temporales
-            matricula.pagos_realizados = float(pagos_realizados)
-            matricula.saldo_pendiente = float(matricula.costo_total - pagos_realizados)
+        # Paginación por cursor (si se pide) o por página
+        if cursor is not None:
+            resultado = paginar_por_cursor(
+                query,
+                [(Matricula.fecha_matricula, True), (Matricula.id, True)],
+                lambda matricula: (matricula.fecha_matricula, matricula.id),
+                cursor, per_page, total
+            )
+        else:
+            resultado = query.paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False
+            )
         
         return resultado
 
 def obtener_estadisticas_matriculas():
-    try:
-        total_matriculas = db.session.query(func.count(Matricula.id)).scalar() or 0
+    activa = Matricula.estado_clases.in_(['pendiente', 'en_progreso'])
 
-        # Estadisticas por estado de clases
-        en_progreso = db.session.query(func.count(Matricula.id)).filter(
-            Matricula.estado_clases == 'en_progreso'
-        ).scalar() or 0
-        
-        completadas = db.session.query(func.count(Matricula.id)).filter(
-            Matricula.estado_clases == 'completado'
-        ).scalar() or 0
+    # Ingresos de todos los pagos, incluidos los que no tienen matricula
+    ingresos_subq = db.session.query(
+        func.coalesce(func.sum(Pago.monto), 0.0)
+    ).scalar_subquery()
 
-        # Estadisticas financieras basica
-        ingresos_totales = db.session.query(func.sum(Pago.monto)).scalar() or 0.0
-        
-        # Saldo total pendiente
-        saldo_pendiente_total = 0.0
-        matriculas_activas = db.session.query(Matricula).filter(
-            Matricula.estado_clases.in_(['pendiente', 'en_progreso'])
-        ).all()
-        
-        for matricula in matriculas_activas:
-            pagos_matricula = db.session.query(func.sum(Pago.monto)).filter(
-                Pago.id_matricula == matricula.id
-            ).scalar() or 0.0
-            saldo_pendiente_total += matricula.costo_total - pagos_matricula
-        
-        
-        return {
-            "total": total_matriculas,
-            "en_progreso": en_progreso,
-            "completadas": completadas,
-            "ingresos_totales": float(ingresos_totales),
-            "saldo_pendiente_total": float(saldo_pendiente_total),
-        }
-        
-    except Exception as e:
-        return {
-            "total": 0,
-            "en_progreso": 0,
-            "completadas": 0,
-            "ingresos_totales": 0.0,
-            "saldo_pendiente_total": 0.0,
-        }
+    # Una sola pasada sobre matriculas con conteos condicionales
+    total, en_progreso, completadas, saldo_pendiente_total, ingresos_totales = db.session.query(
+        func.count(Matricula.id),
+        func.count(case((Matricula.estado_clases == 'en_progreso', 1))),
+        func.count(case((Matricula.estado_clases == 'completado', 1))),
+        func.sum(case(
+            (activa, Matricula.saldo_pendiente),
+            else_=0.0
+        )),
+        ingresos_subq
+    ).one()
+
+    return {
+        "total": total or 0,
+        "en_progreso": en_progreso or 0,
+        "completadas": completadas or 0,
+        "ingresos_totales": float(ingresos_totales or 0.0),
+        "saldo_pendiente_total": float(saldo_pendiente_total or 0.0),
+    }
 
 
 def eliminar_matricula(matricula_id):
     matricula = Matricula.query.get_or_404(matricula_id)
+
+    # Liberar los cupos de las reservas futuras sin asistencia
+    reservas = Reserva.query.join(Bloque).outerjoin(Asistencia).filter(
+        Reserva.id_matricula == matricula.id,
+        Bloque.fecha >= today_peru(),
+        Asistencia.id.is_(None)
+    ).options(contains_eager(Reserva.bloque)).all()
+
+    por_bloque = Counter(reserva.bloque for reserva in reservas)
+    for bloque, cantidad in por_bloque.items():
+        # Decremento en SQL para no perder actualizaciones concurrentes
+        bloque.reservas_actuales = Bloque.reservas_actuales - cantidad
+    for reserva in reservas:
+        db.session.delete(reserva)
+    semanas = {etiqueta_semana_bloques(bloque.fecha) for bloque in por_bloque}
+
     db.session.delete(matricula)# TODO: Analizar si se debe eliminar o desactivar
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("matriculas", "alumnos", *semanas)
     return matricula
\ No newline at end of file
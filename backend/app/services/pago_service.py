@@ -1,34 +1,71 @@
 from app.models.pago import Pago
 from app.models.matricula import Matricula
 from app.extensions import db
-from sqlalchemy import func
+from datetime import timedelta
+from sqlalchemy import desc, update, case
+from sqlalchemy.orm import contains_eager
+from app.models.alumno import Alumno
 from werkzeug.exceptions import BadRequest
+from app.services.reporte_service import invalidar_reporte_admin
+from app.cache_utils import invalidar_etiquetas
 
 def crear_pago(data):
     matricula = Matricula.query.get_or_404(data["id_matricula"])
     monto = data["monto"]
 
-    # Verificar si el monto excede el saldo pendiente
-    total_pagado = db.session.query(func.sum(Pago.monto)).filter_by(id_matricula=matricula.id).scalar() or 0
-    pendiente = matricula.costo_total - total_pagado
-    
-    if monto > pendiente:
-        raise BadRequest(f"El monto excede el saldo pendiente ({pendiente})")
+    # Descuenta el saldo solo si alcanza; el UPDATE condicional bloquea la fila, por lo que
+    # dos pagos simultaneos no pueden superar el saldo ni perder una actualizacion
+    resultado = db.session.execute(
+        update(Matricula)
+        .where(Matricula.id == matricula.id, Matricula.saldo_pendiente >= monto)
+        # MySQL asigna el SET de izquierda a derecha con los valores ya modificados: el estado
+        # va primero para que compare contra el saldo anterior (en Postgres el orden no importa)
+        .ordered_values(
+            # Actualizar estado de pago si se completó el total
+            (Matricula.estado_pago, case((Matricula.saldo_pendiente - monto <= 0, "completo"), else_=Matricula.estado_pago)),
+            (Matricula.total_pagado, Matricula.total_pagado + monto),
+            (Matricula.saldo_pendiente, Matricula.saldo_pendiente - monto),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if resultado.rowcount == 0:
+        db.session.rollback()
+        db.session.refresh(matricula)
+        raise BadRequest(f"El monto excede el saldo pendiente ({matricula.saldo_pendiente})")
     
     pago = Pago(
         id_matricula=matricula.id,
         monto=monto,
     )
 
-    # Actualizar estado de pago si se completó el total
-    nuevo_total = total_pagado + monto
-    if nuevo_total >= matricula.costo_total:
-        matricula.estado_pago = "completo"
-
     db.session.add(pago)
+    invalidar_reporte_admin()
     db.session.commit()
+    invalidar_etiquetas("matriculas")
     return pago
 
+def consulta_pagos(id_matricula=None, fecha_inicio=None, fecha_fin=None):
+    query = Pago.query.join(Matricula).join(Alumno).options(
+        contains_eager(Pago.matricula).contains_eager(Matricula.alumno)
+    )
+    if id_matricula:
+        query = query.filter(Pago.id_matricula == id_matricula)
+    if fecha_inicio:
+        query = query.filter(Pago.fecha_pago >= fecha_inicio)
+    if fecha_fin:
+        query = query.filter(Pago.fecha_pago < fecha_fin + timedelta(days=1))
+    return query.order_by(desc(Pago.fecha_pago), desc(Pago.id))
+
+# Columnas de la exportacion de pagos
+COLUMNAS_EXPORTACION = [
+    ("id", lambda p: p.id),
+    ("id_matricula", lambda p: p.id_matricula),
+    ("dni_alumno", lambda p: p.matricula.alumno.dni),
+    ("nombre_alumno", lambda p: f"{p.matricula.alumno.nombre} {p.matricula.alumno.apellidos}"),
+    ("monto", lambda p: p.monto),
+    ("fecha_pago", lambda p: p.fecha_pago),
+]
+
 def listar_pagos():
     return Pago.query.all() # TODO: agregar filtros y paginación
 
@@ -1,11 +1,15 @@
 from datetime import timedelta, date
-from sqlalchemy import func, and_
+from flask import current_app
+from sqlalchemy import func, and_, update, event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
 from app.models import (
     Alumno, Matricula, Reserva, Pago, Bloque, Asistencia,
-    Instructor, Auto
+    Instructor, Auto, ReporteSnapshot
 )
-from app.datetime_utils import now_peru, today_peru, combine_peru
+from app.datetime_utils import now_peru, today_peru, combine_peru, to_peru_timezone
+
+CLAVE_REPORTE_ADMIN = "admin_dashboard"
 
 def get_year_month_expr(column):
     dialect = db.engine.dialect.name
@@ -166,23 +170,18 @@ def obtener_reporte_admin():
         Matricula.categoria,
         Alumno.nombre,
         Alumno.apellidos,
-        func.coalesce(func.sum(Pago.monto), 0).label('total_pagado')
+        Matricula.total_pagado,
+        Matricula.saldo_pendiente
     ).join(Alumno, Matricula.id_alumno == Alumno.id)\
-     .outerjoin(Pago, Pago.id_matricula == Matricula.id)\
      .filter(
          and_(
              Matricula.estado_pago == 'pendiente',
              Matricula.fecha_limite >= ahora,
+             Matricula.saldo_pendiente > 0,
          )
-     ).group_by(
-         Matricula.id, Matricula.costo_total, Matricula.categoria,
-         Alumno.nombre, Alumno.apellidos
-     ).having(
-         func.coalesce(func.sum(Pago.monto), 0) < Matricula.costo_total
      ).limit(10).all()  
     
-    for id_mat, costo_total, categoria, nombre, apellidos, total_pagado in matriculas_con_saldo:
-        saldo = costo_total - total_pagado
+    for id_mat, costo_total, categoria, nombre, apellidos, total_pagado, saldo in matriculas_con_saldo:
         if saldo > 0:
             pagos_pendientes.append({
                 "matricula_id": id_mat,
@@ -222,4 +221,105 @@ def obtener_reporte_admin():
             ],
             "pagos_pendientes": pagos_pendientes[:5]
         }
-    }
\ No newline at end of file
+    }
+
+def _reclamar_generacion():
+    # Marca vigente la generacion actual sin esperar al calculo: cualquier escritura que
+    # confirme despues la incrementa y la publicacion de este refresco se descarta
+    snapshot = ReporteSnapshot.query.filter_by(clave=CLAVE_REPORTE_ADMIN).first()
+    if snapshot is None:
+        try:
+            db.session.add(ReporteSnapshot(
+                clave=CLAVE_REPORTE_ADMIN, datos={}, vigente=False,
+                generacion=1, generacion_datos=0, fecha_generado=now_peru()
+            ))
+            db.session.commit()
+        except IntegrityError:
+            # Otro worker creo la fila al mismo tiempo
+            db.session.rollback()
+        snapshot = ReporteSnapshot.query.filter_by(clave=CLAVE_REPORTE_ADMIN).one()
+
+    generacion = snapshot.generacion
+    db.session.execute(
+        update(ReporteSnapshot).where(
+            ReporteSnapshot.clave == CLAVE_REPORTE_ADMIN,
+            ReporteSnapshot.generacion == generacion
+        ).values(vigente=True)
+    )
+    db.session.commit()
+    return generacion
+
+def _snapshot_actual(snapshot, max_edad_segundos):
+    return (
+        snapshot is not None
+        and snapshot.vigente
+        and snapshot.generacion_datos == snapshot.generacion
+        and (now_peru() - snapshot.fecha_generado).total_seconds() <= max_edad_segundos
+    )
+
+def refrescar_reporte_admin():
+    # Sin bloqueos: el calculo corre fuera de cualquier transaccion de escritura y solo se
+    # publica si ninguna escritura cambio la generacion mientras tanto
+    generacion = _reclamar_generacion()
+    datos = obtener_reporte_admin()
+    generado = now_peru()
+
+    publicado = db.session.execute(
+        update(ReporteSnapshot).where(
+            ReporteSnapshot.clave == CLAVE_REPORTE_ADMIN,
+            ReporteSnapshot.generacion == generacion
+        ).values(datos=datos, generacion_datos=generacion, fecha_generado=generado)
+    ).rowcount == 1
+    db.session.commit()
+
+    # Si no se publico, los datos son igual de recientes pero pueden no incluir esa escritura
+    return {"datos": datos, "generado": generado, "vigente": publicado}
+
+def invalidar_reporte_admin():
+    # Solo marca la sesion: el snapshot se invalida despues del commit del llamador
+    # (pagos, matriculas, reservas, alumnos...), asi la escritura no bloquea la fila
+    db.session.info[CLAVE_REPORTE_ADMIN] = True
+
+@event.listens_for(db.session, "after_commit")
+def _invalidar_despues_del_commit(session):
+    if not session.info.pop(CLAVE_REPORTE_ADMIN, False):
+        return
+    # La sesion ya no puede ejecutar SQL aqui: se usa una transaccion corta aparte.
+    # Con "vigente" solo la primera escritura tras cada refresco toca la fila
+    try:
+        with db.engine.begin() as conexion:
+            conexion.execute(
+                update(ReporteSnapshot).where(
+                    ReporteSnapshot.clave == CLAVE_REPORTE_ADMIN,
+                    ReporteSnapshot.vigente.is_(True)
+                ).values(vigente=False, generacion=ReporteSnapshot.generacion + 1)
+            )
+    except SQLAlchemyError as e:
+        # La escritura ya se confirmo; el snapshot caduca igual por antiguedad
+        current_app.logger.warning(f"No se pudo invalidar el reporte de administrador: {e}")
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _descartar_invalidacion(session, transaccion_anterior):
+    # Solo al deshacer la transaccion completa, no un savepoint
+    if not session.in_transaction():
+        session.info.pop(CLAVE_REPORTE_ADMIN, None)
+
+def obtener_reporte_admin_snapshot(max_edad_segundos=60):
+    snapshot = ReporteSnapshot.query.filter_by(clave=CLAVE_REPORTE_ADMIN).first()
+
+    # Regenerar si no existe, hubo escrituras o contiene actividad de hace mucho
+    if _snapshot_actual(snapshot, max_edad_segundos):
+        datos, generado, vigente = snapshot.datos, to_peru_timezone(snapshot.fecha_generado), True
+    else:
+        resultado = refrescar_reporte_admin()
+        datos, generado, vigente = resultado["datos"], resultado["generado"], resultado["vigente"]
+
+    antiguedad = (now_peru() - generado).total_seconds()
+    return {
+        **datos,
+        "snapshot": {
+            "generado": generado.isoformat(),
+            "antiguedad_segundos": int(antiguedad),
+            "vigente": vigente
+        }
+    }
@@ -1,13 +1,18 @@
+from collections import Counter
 from datetime import datetime, timedelta
 from app.models import Bloque, Reserva, Matricula, Asistencia
 from app.extensions import db
 from werkzeug.exceptions import BadRequest
+from flask import abort
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from sqlalchemy import func, update
 from app.datetime_utils import now_peru, today_peru
+from app.cache_utils import invalidar_etiquetas, etiqueta_semana_bloques
+from app.services.reporte_service import invalidar_reporte_admin
 
 def crear_reservas(data, por_admin=False):
-    matricula = Matricula.query.get_or_404(data["id_matricula"])
+    # Bloquear la matricula para que dos solicitudes del mismo alumno no excedan sus horas
+    matricula = Matricula.query.filter_by(id=data["id_matricula"]).with_for_update().first_or_404()
     id_alumno = data.get("id_alumno", None)
     if matricula.id_alumno != id_alumno and not por_admin:
         raise BadRequest("No puedes crear reservas que no te pertenecen")
@@ -49,37 +54,72 @@ def crear_reservas(data, por_admin=False):
     if nuevas_horas > horas_disponibles_reserva:
         raise BadRequest(f"No puedes reservar más horas ya que excede tus horas contratadas")
 
-    # Procesar todas las reservas
-    reservas_creadas = []
-    for item in data["reservas"]:
-        bloque = Bloque.query.get_or_404(item["id_bloque"])
-        
-        if bloque.reservas_actuales >= bloque.capacidad_max:
-            raise BadRequest(f"El bloque {bloque.fecha}: {bloque.hora_inicio} - {bloque.hora_fin} está lleno")
+    ids_bloques = [item["id_bloque"] for item in data["reservas"]]
+    if len(set(ids_bloques)) != len(ids_bloques):
+        raise BadRequest("No puedes reservar el mismo bloque más de una vez")
+
+    # Cargar todos los bloques solicitados en una sola consulta
+    bloques = {bloque.id: bloque for bloque in Bloque.query.filter(Bloque.id.in_(ids_bloques)).all()}
+    if len(bloques) != len(ids_bloques):
+        abort(404)
 
-         # Validar que la fecha del bloque no exceda la fecha límite de la matrícula
-        fecha_bloque = bloque.fecha
-            
-        if fecha_bloque > fecha_limite:
+    for bloque in bloques.values():
+        # Validar que la fecha del bloque no exceda la fecha límite de la matrícula
+        if bloque.fecha > fecha_limite:
             raise BadRequest(f"No puedes reservar porque un bloque excede tu fecha límite de matrícula")
         
         # Solo aplicar restricción de anticipación si no es admin
         if not por_admin and matricula.categoria == "A-II":
             if bloque.fecha <= hoy:
                 raise BadRequest("Alumnos A-II deben reservar con 1 día de anticipación")
-            
-        reserva = Reserva(
-            id_bloque=bloque.id,
-            id_matricula=matricula.id
-        )
-        
-        bloque.reservas_actuales += 1
-        db.session.add(reserva)
-        reservas_creadas.append(reserva)
-    
+
+    # Ocupar los cupos de todos los bloques en una sola sentencia condicional
+    reclamados = _reclamar_cupos(ids_bloques)
+    if reclamados != set(ids_bloques):
+        db.session.rollback()
+        bloque = bloques[next(id_bloque for id_bloque in ids_bloques if id_bloque not in reclamados)]
+        raise BadRequest(f"El bloque {bloque.fecha}: {bloque.hora_inicio} - {bloque.hora_fin} está lleno")
+
+    reservas_creadas = [
+        Reserva(id_bloque=id_bloque, id_matricula=matricula.id)
+        for id_bloque in ids_bloques
+    ]
+    semanas = {etiqueta_semana_bloques(bloque.fecha) for bloque in bloques.values()}
+    db.session.add_all(reservas_creadas)
+    if any(_en_reporte(bloque) for bloque in bloques.values()):
+        invalidar_reporte_admin()
     db.session.commit()
+
+    invalidar_etiquetas(*semanas)
     return reservas_creadas
 
+def _en_reporte(bloque):
+    # El reporte de administracion solo lista las reservas de hoy y mañana
+    return bloque.fecha <= today_peru() + timedelta(days=1)
+
+def _reclamar_cupos(ids_bloques):
+    # UPDATE condicional: solo incrementa los bloques que aun tienen cupo.
+    # La fila queda bloqueada hasta el commit, por lo que no hay sobreventa.
+    stmt = update(Bloque).where(
+        Bloque.id.in_(ids_bloques),
+        Bloque.reservas_actuales < Bloque.capacidad_max
+    ).values(
+        reservas_actuales=Bloque.reservas_actuales + 1
+    ).execution_options(synchronize_session=False)
+
+    if db.engine.dialect.update_returning:
+        return set(db.session.execute(stmt.returning(Bloque.id)).scalars())
+
+    # MySQL no soporta RETURNING: si no se actualizaron todas las filas se ubica el bloque lleno
+    resultado = db.session.execute(stmt)
+    if resultado.rowcount == len(ids_bloques):
+        return set(ids_bloques)
+    llenos = db.session.query(Bloque.id).filter(
+        Bloque.id.in_(ids_bloques),
+        Bloque.reservas_actuales >= Bloque.capacidad_max
+    ).all()
+    return set(ids_bloques) - {id_bloque for id_bloque, in llenos}
+
 def eliminar_reservas(data, por_admin=False):
     matricula = Matricula.query.get_or_404(data["id_matricula"])
     id_alumno = data.get("id_alumno", None)
@@ -98,15 +138,23 @@ def eliminar_reservas(data, por_admin=False):
             minutos_restantes = int((tiempo_restante % 3600) // 60)
             raise BadRequest(f"Solo puedes modificar reservas cada 24 horas. Tiempo restante: {horas_restantes} horas y {minutos_restantes} minutos.")
 
+    # Se agrupa por bloque: varias reservas pueden apuntar al mismo bloque (mismo objeto en la sesion)
+    por_bloque = Counter(reserva.bloque for reserva in reservas)
+    for bloque, cantidad in por_bloque.items():
+        # Decremento en SQL para no perder actualizaciones concurrentes
+        bloque.reservas_actuales = Bloque.reservas_actuales - cantidad
     for reserva in reservas:
-        bloque = reserva.bloque
-        bloque.reservas_actuales -= 1
         db.session.delete(reserva)
+    semanas = {etiqueta_semana_bloques(bloque.fecha) for bloque in por_bloque}
 
     # Solo actualizar timestamp si no es admin
     if not por_admin:
         matricula.ultima_modificacion_reserva = now_peru()
+    if any(_en_reporte(bloque) for bloque in por_bloque):
+        invalidar_reporte_admin()
     db.session.commit()
+
+    invalidar_etiquetas(*semanas)
     return reservas
 
 def listar_reservas(id_alumno=None, por_admin=False, semana_offset=None): 
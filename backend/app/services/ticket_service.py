@@ -3,10 +3,16 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy import func, or_, desc
 from datetime import timedelta
 from app.datetime_utils import now_peru
+from app.paginacion import paginar_por_cursor
+from app.services.busqueda_service import filtro_alumnos, filtro_instructores, filtro_id
 
-def listar_tickets_admin(
-    page=1,
-    per_page=20,
+# Orden de los listados, tambien usado como clave del cursor
+CLAVES_ORDEN = [(Asistencia.fecha_asistencia, True), (Ticket.id, True)]
+
+def claves_ticket(ticket):
+    return ticket.asistencia.fecha_asistencia, ticket.id
+
+def consulta_tickets_admin(
     busqueda=None,
     fecha_inicio=None,
     fecha_fin=None,
@@ -17,18 +23,15 @@ def listar_tickets_admin(
         .join(Instructor, Ticket.id_instructor == Instructor.id)\
         .options(
             joinedload(Ticket.asistencia).joinedload(Asistencia.reserva).joinedload(Reserva.matricula).joinedload(Matricula.alumno),
-            joinedload(Ticket.instructor)
+            joinedload(Ticket.instructor),
+            joinedload(Ticket.auto)
         )
     if busqueda:
-        busqueda_like = f"%{busqueda.lower()}%"
         query = query.filter(
             or_(
-                Alumno.nombre.ilike(busqueda_like),
-                Alumno.apellidos.ilike(busqueda_like),
-                Alumno.dni.ilike(busqueda_like),
-                Instructor.nombre.ilike(busqueda_like),
-                Instructor.apellidos.ilike(busqueda_like),
-                Ticket.id.ilike(busqueda_like)
+                filtro_alumnos(busqueda),
+                filtro_instructores(busqueda),
+                filtro_id(Ticket.id, busqueda)
             )
         )
     # Filtro por instructor
@@ -43,9 +46,23 @@ def listar_tickets_admin(
         query = query.filter(Asistencia.fecha_asistencia <= fecha_fin)
 
     # Ordenación
-    query = query.order_by(desc(Asistencia.fecha_asistencia), desc(Ticket.id))
+    return query.order_by(desc(Asistencia.fecha_asistencia), desc(Ticket.id))
+
+def listar_tickets_admin(
+    page=1,
+    per_page=20,
+    busqueda=None,
+    fecha_inicio=None,
+    fecha_fin=None,
+    id_instructor=None,
+    cursor=None,
+    total=None
+):
+    query = consulta_tickets_admin(busqueda, fecha_inicio, fecha_fin, id_instructor)
 
-    # Paginación
+    # Paginación por cursor (si se pide) o por página
+    if cursor is not None:
+        return paginar_por_cursor(query, CLAVES_ORDEN, claves_ticket, cursor, per_page, total)
     resultado = query.paginate(
         page=page,
         per_page=per_page,
@@ -54,11 +71,8 @@ def listar_tickets_admin(
     
     return resultado
 
-
-def listar_tickets_instructor(
+def consulta_tickets_instructor(
     instructor_id,
-    page=1,
-    per_page=20,
     busqueda=None,
     fecha_inicio=None,
     fecha_fin=None
@@ -67,18 +81,17 @@ def listar_tickets_instructor(
         .filter(Ticket.id_instructor == instructor_id)\
         .join(Asistencia).join(Reserva).join(Matricula).join(Alumno)\
         .options(
-            joinedload(Ticket.asistencia).joinedload(Asistencia.reserva).joinedload(Reserva.matricula).joinedload(Matricula.alumno)
+            joinedload(Ticket.asistencia).joinedload(Asistencia.reserva).joinedload(Reserva.matricula).joinedload(Matricula.alumno),
+            joinedload(Ticket.instructor),
+            joinedload(Ticket.auto)
         )
     
     # Filtro por búsqueda
     if busqueda:
-        busqueda_like = f"%{busqueda.lower()}%"
         query = query.filter(
             or_(
-                Alumno.nombre.ilike(busqueda_like),
-                Alumno.apellidos.ilike(busqueda_like),
-                Alumno.dni.ilike(busqueda_like),
-                Ticket.id.ilike(busqueda_like)
+                filtro_alumnos(busqueda),
+                filtro_id(Ticket.id, busqueda)
             )
         )
 
@@ -90,9 +103,23 @@ def listar_tickets_instructor(
         query = query.filter(Asistencia.fecha_asistencia <= fecha_fin)
     
     # Ordenación
-    query = query.order_by(desc(Asistencia.fecha_asistencia), desc(Ticket.id))
+    return query.order_by(desc(Asistencia.fecha_asistencia), desc(Ticket.id))
+
+def listar_tickets_instructor(
+    instructor_id,
+    page=1,
+    per_page=20,
+    busqueda=None,
+    fecha_inicio=None,
+    fecha_fin=None,
+    cursor=None,
+    total=None
+):
+    query = consulta_tickets_instructor(instructor_id, busqueda, fecha_inicio, fecha_fin)
     
-    # Paginación
+    # Paginación por cursor (si se pide) o por página
+    if cursor is not None:
+        return paginar_por_cursor(query, CLAVES_ORDEN, claves_ticket, cursor, per_page, total)
     resultado = query.paginate(
         page=page,
         per_page=per_page,
@@ -101,6 +128,19 @@ def listar_tickets_instructor(
 
     return resultado
 
+# Columnas de la exportacion de tickets
+COLUMNAS_EXPORTACION = [
+    ("id", lambda t: t.id),
+    ("numero_clase_alumno", lambda t: t.numero_clase_alumno),
+    ("fecha_asistencia", lambda t: t.asistencia.fecha_asistencia),
+    ("dni_alumno", lambda t: t.asistencia.reserva.matricula.alumno.dni),
+    ("nombre_alumno", lambda t: f"{t.asistencia.reserva.matricula.alumno.nombre} {t.asistencia.reserva.matricula.alumno.apellidos}"),
+    ("nombre_instructor", lambda t: f"{t.instructor.nombre} {t.instructor.apellidos}"),
+    ("placa_auto", lambda t: t.auto.placa if t.auto else None),
+    ("marca_auto", lambda t: t.auto.marca if t.auto else None),
+    ("modelo_auto", lambda t: t.auto.modelo if t.auto else None),
+]
+
 def obtener_estadisticas_tickets(id_instructor=None):
     try:
         query = Ticket.query.join(Asistencia)
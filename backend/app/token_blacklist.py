@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, guard
+from app.models.token_revocado import TokenRevocado
+from app.datetime_utils import now_peru
+
+class TokenBlacklist:
+    """
+    Lista de tokens revocados compartida entre workers.
+
+    La tabla tokens_revocados es la fuente de verdad. Cada worker mantiene una
+    copia en memoria de los jti vigentes que sincroniza de forma incremental cada
+    TOKEN_BLACKLIST_SINCRONIZACION segundos, asi is_blacklisted es una busqueda
+    en un dict. Los tokens expirados se descartan en memoria y se purgan de la
+    tabla cada TOKEN_BLACKLIST_PURGA segundos.
+    """
+
+    # Margen para leer filas cuya transaccion termino despues de la ultima sincronizacion
+    MARGEN_SINCRONIZACION = timedelta(seconds=60)
+
+    def __init__(self):
+        self._revocados = {}
+        self._completo = True
+        self._ultima_fecha = None
+        self._ultima_sincronizacion = 0
+        self._ultima_purga = 0
+        self._lock = threading.Lock()
+
+    def add_token(self, token, exp):
+        jti = guard.extract_jwt_token(token)["jti"]
+        try:
+            db.session.add(TokenRevocado(jti=jti, expira=int(exp)))
+            db.session.commit()
+        except IntegrityError:
+            # El token ya fue revocado por otra peticion
+            db.session.rollback()
+        self._revocados[jti] = int(exp)
+
+    def is_blacklisted(self, jti):
+        self._sincronizar()
+
+        exp = self._revocados.get(jti)
+        if exp is None:
+            # Si la copia local se lleno se consulta la tabla
+            return not self._completo and self._consultar(jti)
+        if now_peru().timestamp() > exp:
+            self._revocados.pop(jti, None)
+            return False
+        return True
+
+    def _consultar(self, jti):
+        with db.engine.connect() as conn:
+            exp = conn.execute(
+                select(TokenRevocado.expira).where(TokenRevocado.jti == jti)
+            ).scalar()
+        return exp is not None and now_peru().timestamp() <= exp
+
+    def _sincronizar(self):
+        config = current_app.config
+        if time.monotonic() - self._ultima_sincronizacion < config["TOKEN_BLACKLIST_SINCRONIZACION"]:
+            return
+
+        with self._lock:
+            ahora = time.monotonic()
+            if ahora - self._ultima_sincronizacion < config["TOKEN_BLACKLIST_SINCRONIZACION"]:
+                return
+
+            ahora_ts = int(now_peru().timestamp())
+            # Lectura completa la primera vez o si la copia local quedo recortada
+            completa = self._ultima_fecha is None or not self._completo
+
+            query = select(
+                TokenRevocado.jti, TokenRevocado.expira, TokenRevocado.fecha_creado
+            ).where(TokenRevocado.expira > ahora_ts)
+            if not completa:
+                query = query.where(TokenRevocado.fecha_creado >= self._ultima_fecha - self.MARGEN_SINCRONIZACION)
+
+            with db.engine.connect() as conn:
+                filas = conn.execute(query).all()
+
+            # Descartar los expirados antes de agregar los nuevos
+            revocados = {} if completa else {
+                jti: exp for jti, exp in self._revocados.items() if exp > ahora_ts
+            }
+            for jti, exp, fecha_creado in filas:
+                revocados[jti] = exp
+                if self._ultima_fecha is None or fecha_creado > self._ultima_fecha:
+                    self._ultima_fecha = fecha_creado
+
+            # Memoria acotada: se conservan los que expiran mas tarde
+            max_cache = config["TOKEN_BLACKLIST_MAX_CACHE"]
+            self._completo = len(revocados) <= max_cache
+            if not self._completo:
+                revocados = dict(sorted(revocados.items(), key=lambda item: item[1], reverse=True)[:max_cache])
+
+            self._revocados = revocados
+            self._ultima_sincronizacion = ahora
+
+            if ahora - self._ultima_purga >= config["TOKEN_BLACKLIST_PURGA"]:
+                self._ultima_purga = ahora
+                with db.engine.begin() as conn:
+                    conn.execute(delete(TokenRevocado).where(TokenRevocado.expira <= ahora_ts))
+
+blacklist = TokenBlacklist()
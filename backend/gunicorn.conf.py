@@ -0,0 +1,18 @@
+import os
+import glob
+from prometheus_client import multiprocess
+
+# Las metricas de /api/metrics se agregan entre workers a traves de archivos en
+# PROMETHEUS_MULTIPROC_DIR (debe definirse antes de iniciar gunicorn).
+
+def on_starting(server):
+    directorio = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        # Descartar valores de ejecuciones anteriores
+        for archivo in glob.glob(os.path.join(directorio, "*.db")):
+            os.remove(archivo)
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,29 @@
+"""generacion del snapshot de reportes
+
+Revision ID: 3b8e6f1c0d47
+Revises: 9d4f7b2e6a15
+Create Date: 2026-10-18 21:05:42.118304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e6f1c0d47'
+down_revision = '9d4f7b2e6a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # generacion != generacion_datos: el snapshot existente se recalcula en la primera lectura
+    with op.batch_alter_table('reportes_snapshot', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('generacion', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('generacion_datos', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('reportes_snapshot', schema=None) as batch_op:
+        batch_op.drop_column('generacion_datos')
+        batch_op.drop_column('generacion')
@@ -0,0 +1,27 @@
+"""quitar indice completo de fecha_limite
+
+Revision ID: 6f2a9d4c8b13
+Revises: 3b8e6f1c0d47
+Create Date: 2026-10-18 22:14:37.502916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f2a9d4c8b13'
+down_revision = '3b8e6f1c0d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Todas las consultas por fecha_limite filtran matriculas activas: basta el indice parcial
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_matriculas_fecha_limite'))
+
+
+def downgrade():
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_matriculas_fecha_limite'), ['fecha_limite'], unique=False)
@@ -0,0 +1,27 @@
+"""quitar indice redundante de bloques
+
+Revision ID: 9d4f7b2e6a15
+Revises: c6e0a5d94f31
+Create Date: 2026-10-18 19:41:08.227913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f7b2e6a15'
+down_revision = 'c6e0a5d94f31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # uq_bloques_fecha_horario (fecha, hora_inicio, hora_fin) ya cubre las busquedas por fecha
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.drop_index('ix_bloques_fecha_hora_inicio')
+
+
+def downgrade():
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.create_index('ix_bloques_fecha_hora_inicio', ['fecha', 'hora_inicio'], unique=False)
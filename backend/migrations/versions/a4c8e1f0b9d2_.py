@@ -0,0 +1,64 @@
+"""busqueda por trigramas
+
+Revision ID: a4c8e1f0b9d2
+Revises: f1b6d0a8c352
+Create Date: 2026-10-18 15:02:37.418265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e1f0b9d2'
+down_revision = 'f1b6d0a8c352'
+branch_labels = None
+depends_on = None
+
+
+# Deben coincidir con _texto_indexado en app/services/busqueda_service.py
+TEXTO_ALUMNOS = "(nombre || ' ' || apellidos || ' ' || dni || ' ' || coalesce(email, ''))"
+TEXTO_INSTRUCTORES = "(nombre || ' ' || apellidos || ' ' || dni)"
+
+
+def _extensiones_disponibles(bind):
+    if bind.dialect.name != 'postgresql':
+        return False
+    disponibles = bind.execute(sa.text(
+        "SELECT count(*) FROM pg_available_extensions WHERE name IN ('pg_trgm', 'unaccent')"
+    )).scalar()
+    return disponibles == 2
+
+
+def upgrade():
+    # Sin pg_trgm/unaccent la aplicacion usa el indice en memoria de busqueda_service
+    bind = op.get_bind()
+    if not _extensiones_disponibles(bind):
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() no es IMMUTABLE; se fija el diccionario para poder indexar la expresion
+    op.execute("""
+        CREATE OR REPLACE FUNCTION busqueda_normalizada(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_alumnos_busqueda_trgm ON alumnos "
+        f"USING gin (busqueda_normalizada{TEXTO_ALUMNOS} gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_instructores_busqueda_trgm ON instructores "
+        f"USING gin (busqueda_normalizada{TEXTO_INSTRUCTORES} gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_instructores_busqueda_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_alumnos_busqueda_trgm")
+    op.execute("DROP FUNCTION IF EXISTS busqueda_normalizada(text)")
@@ -0,0 +1,47 @@
+"""correos salientes
+
+Revision ID: b7d3f29c4e18
+Revises: a4c8e1f0b9d2
+Create Date: 2026-10-18 15:31:52.604718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3f29c4e18'
+down_revision = 'a4c8e1f0b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('correos_salientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('destinatario', sa.String(length=120), nullable=False),
+    sa.Column('asunto', sa.String(length=200), nullable=False),
+    sa.Column('cuerpo', sa.Text(), nullable=False),
+    sa.Column('cuerpo_html', sa.Text(), nullable=True),
+    sa.Column('lote', sa.String(length=36), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('fecha_creado', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('fecha_enviado', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('correos_salientes', schema=None) as batch_op:
+        batch_op.create_index('ix_correos_salientes_estado_proximo_intento', ['estado', 'proximo_intento'], unique=False)
+        batch_op.create_index(batch_op.f('ix_correos_salientes_fecha_enviado'), ['fecha_enviado'], unique=False)
+        batch_op.create_index(batch_op.f('ix_correos_salientes_lote'), ['lote'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('correos_salientes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_correos_salientes_lote'))
+        batch_op.drop_index(batch_op.f('ix_correos_salientes_fecha_enviado'))
+        batch_op.drop_index('ix_correos_salientes_estado_proximo_intento')
+
+    op.drop_table('correos_salientes')
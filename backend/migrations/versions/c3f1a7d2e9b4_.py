@@ -0,0 +1,66 @@
+"""indices para consultas frecuentes
+
+Revision ID: c3f1a7d2e9b4
+Revises: a9efc0ac07b4
+Create Date: 2026-10-18 09:12:41.503127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a7d2e9b4'
+down_revision = 'a9efc0ac07b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.create_index('ix_bloques_fecha_hora_inicio', ['fecha', 'hora_inicio'], unique=False)
+
+    with op.batch_alter_table('reservas', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reservas_id_bloque'), ['id_bloque'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reservas_id_matricula'), ['id_matricula'], unique=False)
+
+    with op.batch_alter_table('pagos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pagos_id_matricula'), ['id_matricula'], unique=False)
+
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.create_index('ix_matriculas_id_alumno_estado_clases', ['id_alumno', 'estado_clases'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matriculas_fecha_limite'), ['fecha_limite'], unique=False)
+        batch_op.create_index(
+            'ix_matriculas_activas_fecha_limite', ['fecha_limite'], unique=False,
+            postgresql_where=sa.text("estado_clases IN ('pendiente', 'en_progreso')"),
+            sqlite_where=sa.text("estado_clases IN ('pendiente', 'en_progreso')"),
+        )
+
+    with op.batch_alter_table('asistencias', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_asistencias_fecha_asistencia'), ['fecha_asistencia'], unique=False)
+
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tickets_id_instructor'), ['id_instructor'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tickets_id_instructor'))
+
+    with op.batch_alter_table('asistencias', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_asistencias_fecha_asistencia'))
+
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.drop_index('ix_matriculas_activas_fecha_limite')
+        batch_op.drop_index(batch_op.f('ix_matriculas_fecha_limite'))
+        batch_op.drop_index('ix_matriculas_id_alumno_estado_clases')
+
+    with op.batch_alter_table('pagos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pagos_id_matricula'))
+
+    with op.batch_alter_table('reservas', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reservas_id_matricula'))
+        batch_op.drop_index(batch_op.f('ix_reservas_id_bloque'))
+
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.drop_index('ix_bloques_fecha_hora_inicio')
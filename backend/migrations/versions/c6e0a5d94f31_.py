@@ -0,0 +1,36 @@
+"""saldos matriculas
+
+Revision ID: c6e0a5d94f31
+Revises: b7d3f29c4e18
+Create Date: 2026-10-18 16:12:08.381950
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e0a5d94f31'
+down_revision = 'b7d3f29c4e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_pagado', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('saldo_pendiente', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill con la suma de pagos de cada matricula
+    op.execute("""
+        UPDATE matriculas SET
+            total_pagado = COALESCE((SELECT SUM(pagos.monto) FROM pagos WHERE pagos.id_matricula = matriculas.id), 0),
+            saldo_pendiente = COALESCE(costo_total, 0)
+                - COALESCE((SELECT SUM(pagos.monto) FROM pagos WHERE pagos.id_matricula = matriculas.id), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('matriculas', schema=None) as batch_op:
+        batch_op.drop_column('saldo_pendiente')
+        batch_op.drop_column('total_pagado')
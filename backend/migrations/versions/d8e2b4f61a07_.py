@@ -0,0 +1,32 @@
+"""snapshot del dashboard de administrador
+
+Revision ID: d8e2b4f61a07
+Revises: c3f1a7d2e9b4
+Create Date: 2026-10-18 10:02:17.284915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e2b4f61a07'
+down_revision = 'c3f1a7d2e9b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reportes_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clave', sa.String(length=50), nullable=False),
+    sa.Column('datos', sa.JSON(), nullable=False),
+    sa.Column('vigente', sa.Boolean(), nullable=False),
+    sa.Column('fecha_generado', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('clave')
+    )
+
+
+def downgrade():
+    op.drop_table('reportes_snapshot')
@@ -0,0 +1,112 @@
+"""restriccion unica de horario en bloques
+
+Revision ID: e5a9c3b7f218
+Revises: d8e2b4f61a07
+Create Date: 2026-10-18 11:24:52.918340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3b7f218'
+down_revision = 'd8e2b4f61a07'
+branch_labels = None
+depends_on = None
+
+
+bloques = sa.table(
+    'bloques',
+    sa.column('id', sa.Integer),
+    sa.column('fecha', sa.Date),
+    sa.column('hora_inicio', sa.Time),
+    sa.column('hora_fin', sa.Time),
+    sa.column('capacidad_max', sa.Integer),
+    sa.column('reservas_actuales', sa.Integer),
+)
+reservas = sa.table(
+    'reservas',
+    sa.column('id', sa.Integer),
+    sa.column('id_bloque', sa.Integer),
+    sa.column('id_matricula', sa.Integer),
+)
+
+
+def _grupos_duplicados(bind):
+    # ids de cada horario repetido, el de menor id primero
+    horario = (bloques.c.fecha, bloques.c.hora_inicio, bloques.c.hora_fin)
+    repetidos = bind.execute(
+        sa.select(*horario).group_by(*horario).having(sa.func.count() > 1)
+    ).all()
+    for fecha, hora_inicio, hora_fin in repetidos:
+        yield bind.execute(
+            sa.select(bloques.c.id).where(
+                bloques.c.fecha == fecha,
+                bloques.c.hora_inicio == hora_inicio,
+                bloques.c.hora_fin == hora_fin,
+            ).order_by(bloques.c.id)
+        ).scalars().all()
+
+
+def _conflictos(bind, ids):
+    # Lo que la fusion haria mal: superar la capacidad del bloque conservado o dejar a una
+    # matricula con dos reservas en el mismo horario
+    conflictos = []
+    capacidad = bind.execute(sa.select(bloques.c.capacidad_max).where(bloques.c.id == ids[0])).scalar()
+    total = bind.execute(
+        sa.select(sa.func.count(reservas.c.id)).where(reservas.c.id_bloque.in_(ids))
+    ).scalar()
+    if total > capacidad:
+        conflictos.append(f"bloques {ids}: {total} reservas para capacidad {capacidad}")
+
+    matriculas_repetidas = bind.execute(
+        sa.select(reservas.c.id_matricula)
+        .where(reservas.c.id_bloque.in_(ids))
+        .group_by(reservas.c.id_matricula)
+        .having(sa.func.count(sa.func.distinct(reservas.c.id_bloque)) > 1)
+    ).scalars().all()
+    if matriculas_repetidas:
+        conflictos.append(f"bloques {ids}: matriculas {matriculas_repetidas} con reserva en mas de uno")
+    return conflictos
+
+
+def _fusionar_bloques_duplicados(bind):
+    # Conserva el bloque de menor id de cada horario repetido y le pasa las reservas de los demas
+    grupos = list(_grupos_duplicados(bind))
+
+    # Se revisan todos los grupos antes de mover nada: la migracion no sobrerreserva en silencio
+    conflictos = [conflicto for ids in grupos for conflicto in _conflictos(bind, ids)]
+    if conflictos:
+        raise RuntimeError(
+            "Bloques con el mismo horario que no se pueden fusionar; elimine o mueva esas "
+            "reservas y vuelva a ejecutar la migracion:\n" + "\n".join(conflictos)
+        )
+
+    for ids in grupos:
+        conservado, duplicados = ids[0], ids[1:]
+
+        bind.execute(
+            reservas.update().where(reservas.c.id_bloque.in_(duplicados)).values(id_bloque=conservado)
+        )
+        bind.execute(
+            bloques.update().where(bloques.c.id == conservado).values(
+                reservas_actuales=sa.select(sa.func.count(reservas.c.id))
+                .where(reservas.c.id_bloque == conservado)
+                .scalar_subquery()
+            )
+        )
+        bind.execute(bloques.delete().where(bloques.c.id.in_(duplicados)))
+
+
+def upgrade():
+    # generar_bloques podia crear el mismo horario dos veces si corrian dos ejecuciones a la vez
+    _fusionar_bloques_duplicados(op.get_bind())
+
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_bloques_fecha_horario', ['fecha', 'hora_inicio', 'hora_fin'])
+
+
+def downgrade():
+    with op.batch_alter_table('bloques', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_bloques_fecha_horario', type_='unique')
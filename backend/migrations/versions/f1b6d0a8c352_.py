@@ -0,0 +1,38 @@
+"""tokens revocados
+
+Revision ID: f1b6d0a8c352
+Revises: e5a9c3b7f218
+Create Date: 2026-10-18 12:41:09.775103
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6d0a8c352'
+down_revision = 'e5a9c3b7f218'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tokens_revocados',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=64), nullable=False),
+    sa.Column('expira', sa.BigInteger(), nullable=False),
+    sa.Column('fecha_creado', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('jti')
+    )
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tokens_revocados_expira'), ['expira'], unique=False)
+        batch_op.create_index(batch_op.f('ix_tokens_revocados_fecha_creado'), ['fecha_creado'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tokens_revocados_fecha_creado'))
+        batch_op.drop_index(batch_op.f('ix_tokens_revocados_expira'))
+
+    op.drop_table('tokens_revocados')
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, time as hora
+
+# Añadir la ruta del proyecto para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Micro-benchmark del renderizado de correos: costo por mensaje con las plantillas
+# precompiladas, con y sin la cache de salida, frente a compilar la plantilla en cada uso.
+#
+# Uso:
+#   python script_benchmark_correos.py --mensajes 5000 --distintos 0.3
+
+from app.plantillas_correo import (
+    entorno, precompilar_plantillas, renderizar_lote, _renderizar
+)
+
+def contextos_recordatorio(cantidad, distintos):
+    """Contextos de recordatorio de clase; `distintos` es la fraccion de nombres unicos"""
+    unicos = max(1, int(cantidad * distintos))
+    contextos = []
+    for _ in range(cantidad):
+        i = random.randrange(unicos)
+        contextos.append({
+            "nombre": f"Alumno{i}",
+            "fecha": date(2026, 10, 18),
+            "hora_inicio": hora(7 + i % 11),
+            "hora_fin": hora(8 + i % 11),
+            "duracion_horas": 1,
+        })
+    return contextos
+
+def medir(nombre, funcion, cantidad, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    mejor = min(tiempos)
+    print(f"{nombre:<38} {mejor * 1000:9.2f} ms  {mejor / cantidad * 1e6:8.2f} µs/mensaje")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del renderizado de plantillas de correo")
+    parser.add_argument("--mensajes", type=int, default=5000)
+    parser.add_argument("--distintos", type=float, default=0.3, help="fraccion de contextos unicos (0-1]")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(1)
+    contextos = contextos_recordatorio(args.mensajes, args.distintos)
+    precompilar_plantillas()
+
+    def sin_precompilar():
+        # Parsea y compila la plantilla en cada mensaje, como al armar el cuerpo en cada llamada
+        fuentes = {
+            extension: entorno.loader.get_source(entorno, f"recordatorio_reserva.{extension}")[0]
+            for extension in ("txt", "html")
+        }
+        for contexto in contextos:
+            for fuente in fuentes.values():
+                entorno.from_string(fuente).render(contexto)
+
+    def precompiladas_sin_cache():
+        for contexto in contextos:
+            _renderizar.__wrapped__("recordatorio_reserva", tuple(sorted(contexto.items())))
+
+    def precompiladas_con_cache():
+        _renderizar.cache_clear()
+        renderizar_lote("recordatorio_reserva", contextos)
+
+    print(f"{args.mensajes} mensajes, {args.distintos:.0%} contextos distintos (mejor de {args.repeticiones})")
+    medir("compilando en cada mensaje", sin_precompilar, args.mensajes, args.repeticiones)
+    medir("precompiladas, sin cache", precompiladas_sin_cache, args.mensajes, args.repeticiones)
+    medir("precompiladas, con cache LRU", precompiladas_con_cache, args.mensajes, args.repeticiones)
+    print(f"cache: {_renderizar.cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import statistics
+import urllib.request
+import urllib.error
+import urllib.parse
+from collections import defaultdict
+
+# Añadir la ruta del proyecto para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Reproduce mezclas de trafico realistas contra la API y reporta p50/p95/p99 por endpoint.
+#
+# Uso (servidor levantado con RATELIMIT_ENABLED=false):
+#   python script_carga.py --url http://localhost:5000/api --escenario mixto --duracion 60
+# Uso en proceso, sin servidor (util con SQLite):
+#   python script_carga.py --local --escenario reservas
+#
+# Los datos se generan antes con script_datos_prueba.py.
+
+APELLIDOS_BUSQUEDA = ["quispe", "pérez", "perez", "rojas", "huamán", "flores", "9000", "ibañez"]
+
+class Cliente:
+    """Cliente HTTP minimo; con app usa el test client de Flask en lugar de la red"""
+
+    def __init__(self, url=None, app=None):
+        self.url = url.rstrip("/") if url else None
+        self.test_client = app.test_client() if app else None
+
+    def solicitar(self, metodo, ruta, token=None, cuerpo=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        if self.test_client:
+            respuesta = self.test_client.open(f"/api{ruta}", method=metodo, headers=headers, json=cuerpo)
+            return respuesta.status_code, respuesta.get_json(silent=True)
+
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        solicitud = urllib.request.Request(f"{self.url}{ruta}", data=datos, headers=headers, method=metodo)
+        try:
+            with urllib.request.urlopen(solicitud, timeout=30) as respuesta:
+                return respuesta.status, json.loads(respuesta.read() or b"null")
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.estados = defaultdict(lambda: defaultdict(int))
+
+    def medir(self, nombre, cliente, metodo, ruta, token=None, cuerpo=None):
+        inicio = time.perf_counter()
+        estado, datos = cliente.solicitar(metodo, ruta, token, cuerpo)
+        duracion = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self.latencias[nombre].append(duracion)
+            self.estados[nombre][estado] += 1
+        return estado, datos
+
+    def reporte(self, segundos):
+        print(f"\n{'endpoint':<32}{'n':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  estados")
+        for nombre in sorted(self.latencias):
+            valores = self.latencias[nombre]
+            if len(valores) > 1:
+                cuantiles = statistics.quantiles(valores, n=100, method="inclusive")
+                p50, p95, p99 = cuantiles[49], cuantiles[94], cuantiles[98]
+            else:
+                p50 = p95 = p99 = valores[0]
+            estados = " ".join(f"{codigo}:{cantidad}" for codigo, cantidad in sorted(self.estados[nombre].items()))
+            print(f"{nombre:<32}{len(valores):>7}{len(valores) / segundos:>8.1f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}  {estados}")
+
+# === ACCIONES ===
+
+def reservar_clase(cliente, metricas, sesiones):
+    # Pico de reservas: ver la grilla de la semana siguiente y reservar un bloque con cupo
+    sesion = random.choice(sesiones["alumnos"])
+    _, bloques = metricas.medir(
+        "GET /bloques/semanal", cliente, "GET",
+        f"/bloques/semanal?semana=1&id_alumno={sesion['id_alumno']}", sesion["token"]
+    )
+    libres = [b for b in bloques or [] if b["reservas_actuales"] < b["capacidad_max"]]
+    if not libres or not sesion["id_matricula"]:
+        return
+    metricas.medir("POST /reservas", cliente, "POST", "/reservas/", sesion["token"], {
+        "id_matricula": sesion["id_matricula"],
+        "id_alumno": sesion["id_alumno"],
+        "reservas": [{"id_bloque": random.choice(libres)["id"]}],
+    })
+
+def ver_dashboard(cliente, metricas, sesiones):
+    token = sesiones["admin"]
+    metricas.medir("GET /reportes/admin-dashboard", cliente, "GET", "/reportes/admin-dashboard", token)
+    metricas.medir("GET /matriculas/estadisticas", cliente, "GET", "/matriculas/estadisticas", token)
+    metricas.medir("GET /matriculas", cliente, "GET", f"/matriculas/?page={random.randint(1, 20)}&per_page=20", token)
+
+def buscar_tickets(cliente, metricas, sesiones):
+    token = sesiones["admin"]
+    busqueda = random.choice(APELLIDOS_BUSQUEDA)
+    metricas.medir("GET /tickets?busqueda", cliente, "GET", f"/tickets/?busqueda={urllib.parse.quote(busqueda)}", token)
+    metricas.medir("GET /alumnos?busqueda", cliente, "GET", f"/alumnos/?busqueda={urllib.parse.quote(busqueda)}", token)
+
+def iniciar_sesion(cliente, metricas, sesiones):
+    # Logins por segundo: cada login verifica un hash pbkdf2 (ver HASH_PROCESOS)
+    sesion = random.choice(sesiones["alumnos"])
+    metricas.medir("POST /auth/login", cliente, "POST", "/auth/login", cuerpo={
+        "nombre_usuario": sesion["dni"], "contrasena": sesiones["clave"]
+    })
+
+ESCENARIOS = {
+    "reservas": [(1, reservar_clase)],
+    "login": [(1, iniciar_sesion)],
+    "dashboard": [(1, ver_dashboard)],
+    "tickets": [(1, buscar_tickets)],
+    "mixto": [(6, reservar_clase), (1, ver_dashboard), (3, buscar_tickets)],
+}
+
+def iniciar_sesiones(cliente, args):
+    estado, datos = cliente.solicitar("POST", "/auth/login", cuerpo={
+        "nombre_usuario": args.admin_usuario, "contrasena": args.admin_clave
+    })
+    if estado != 200:
+        sys.exit(f"No se pudo iniciar sesión como administrador ({estado})")
+    admin = datos["access_token"]
+
+    # Alumnos sinteticos (DNI 9xxxxxxx) con su matrícula
+    _, datos = cliente.solicitar("GET", f"/alumnos/?busqueda=9&per_page={args.sesiones}", admin)
+    alumnos = []
+    for alumno in (datos or {}).get("alumnos", []):
+        estado, login = cliente.solicitar("POST", "/auth/login", cuerpo={
+            "nombre_usuario": alumno["dni"], "contrasena": args.clave
+        })
+        if estado != 200:
+            continue
+        _, matricula = cliente.solicitar("GET", f"/matriculas/?id_alumno={alumno['id']}", login["access_token"])
+        alumnos.append({
+            "token": login["access_token"],
+            "id_alumno": alumno["id"],
+            "dni": alumno["dni"],
+            "id_matricula": (matricula or {}).get("id"),
+        })
+
+    if not alumnos:
+        sys.exit("No hay alumnos sintéticos, ejecute primero script_datos_prueba.py")
+    print(f"Sesiones iniciadas: 1 administrador, {len(alumnos)} alumnos")
+    return {"admin": admin, "alumnos": alumnos, "clave": args.clave}
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--url", default="http://localhost:5000/api")
+    parser.add_argument("--local", action="store_true", help="usar la app en proceso en lugar de HTTP")
+    parser.add_argument("--escenario", choices=ESCENARIOS.keys(), default="mixto")
+    parser.add_argument("--duracion", type=int, default=30, help="segundos")
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--sesiones", type=int, default=50, help="alumnos con sesion iniciada")
+    parser.add_argument("--admin-usuario", default="12345678")
+    parser.add_argument("--admin-clave", default="12345678")
+    parser.add_argument("--clave", default="alumno123", help="contraseña de los alumnos sinteticos")
+    args = parser.parse_args()
+
+    app = None
+    if args.local:
+        os.environ.setdefault("RATELIMIT_ENABLED", "false")
+        from app import create_app
+        app = create_app()
+
+    sesiones = iniciar_sesiones(Cliente(args.url, app), args)
+    acciones = ESCENARIOS[args.escenario]
+    pesos = [peso for peso, _ in acciones]
+    metricas = Metricas()
+    fin = time.monotonic() + args.duracion
+
+    def trabajador():
+        cliente = Cliente(args.url, app)
+        while time.monotonic() < fin:
+            accion = random.choices(acciones, weights=pesos)[0][1]
+            accion(cliente, metricas, sesiones)
+
+    print(f"Escenario '{args.escenario}' durante {args.duracion}s con {args.concurrencia} hilos...")
+    hilos = [threading.Thread(target=trabajador) for _ in range(args.concurrencia)]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    metricas.reporte(time.monotonic() - inicio)
+
+if __name__ == "__main__":
+    main()
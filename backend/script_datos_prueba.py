@@ -0,0 +1,258 @@
+import os
+import sys
+import random
+import argparse
+from bisect import bisect_left
+from datetime import timedelta, datetime
+
+# Añadir la ruta del proyecto para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, func, text
+from app import create_app
+from app.extensions import db, guard
+from app.models import (
+    Usuario, Alumno, Matricula, Paquete, Pago, Bloque, Reserva,
+    Asistencia, Ticket, Instructor, Auto
+)
+from app.services.admin_tareas_service import obtener_horarios_bloques
+from app.datetime_utils import today_peru, now_peru, combine_peru
+from script_inicio import poblar_db
+
+# Genera un conjunto de datos sintetico de tamaño realista para pruebas de rendimiento.
+# Todas las inserciones son masivas (executemany) con ids asignados por el script.
+#
+# Uso:
+#   python script_datos_prueba.py --alumnos 5000 --dias 365 --capacidad 60
+#
+# Los alumnos generados usan su DNI como usuario y --clave como contraseña.
+
+NOMBRES = ["José", "María", "Luis", "Ana", "Carlos", "Lucía", "Jorge", "Rosa", "Miguel", "Carmen",
+           "Andrés", "Sofía", "Diego", "Valeria", "Raúl", "Ángela", "Iván", "Nicolás", "Inés", "Óscar"]
+APELLIDOS = ["Quispe", "Pérez", "Rodríguez", "Gómez", "Fernández", "Sánchez", "Ramírez", "Mamani",
+             "Flores", "Chávez", "Vásquez", "Castillo", "Rojas", "Huamán", "Núñez", "Ibáñez"]
+
+TAMANO_LOTE = 5000
+
+def insertar(modelo, filas):
+    for i in range(0, len(filas), TAMANO_LOTE):
+        db.session.execute(insert(modelo), filas[i:i + TAMANO_LOTE])
+    db.session.commit()
+    print(f"  {modelo.__tablename__}: {len(filas)} filas")
+
+def siguiente_id(modelo):
+    return (db.session.query(func.max(modelo.id)).scalar() or 0) + 1
+
+def ajustar_secuencias(modelos):
+    # Las inserciones con id explicito no avanzan las secuencias de Postgres
+    if db.engine.dialect.name != "postgresql":
+        return
+    for modelo in modelos:
+        tabla = modelo.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), COALESCE((SELECT MAX(id) FROM {tabla}), 1))"
+        ))
+    db.session.commit()
+
+def generar_bloques_historicos(dias, capacidad):
+    hoy = today_peru()
+    inicio = hoy - timedelta(days=dias)
+    fin = hoy + timedelta(days=14)
+    horarios = obtener_horarios_bloques()
+
+    existentes = {
+        tuple(fila) for fila in db.session.query(
+            Bloque.fecha, Bloque.hora_inicio, Bloque.hora_fin
+        ).filter(Bloque.fecha.between(inicio, fin)).all()
+    }
+
+    nuevos = []
+    fecha = inicio
+    while fecha <= fin:
+        for hora_inicio, hora_fin in horarios.get(fecha.weekday(), []):
+            if (fecha, hora_inicio, hora_fin) not in existentes:
+                nuevos.append({
+                    "fecha": fecha,
+                    "hora_inicio": hora_inicio,
+                    "hora_fin": hora_fin,
+                    "capacidad_max": capacidad,
+                    "reservas_actuales": 0,
+                })
+        fecha += timedelta(days=1)
+    insertar(Bloque, nuevos)
+
+    return db.session.query(
+        Bloque.id, Bloque.fecha, Bloque.hora_inicio, Bloque.capacidad_max, Bloque.reservas_actuales
+    ).filter(Bloque.fecha.between(inicio, fin)).order_by(Bloque.fecha, Bloque.hora_inicio).all()
+
+def generar_datos(cantidad_alumnos, dias, capacidad, clave, semilla):
+    random.seed(semilla)
+    hoy = today_peru()
+    ahora = now_peru().replace(tzinfo=None)
+
+    paquetes = [p for p in Paquete.query.all() if p.horas_total]
+    instructores = [i.id for i in Instructor.query.all()]
+    autos = [a.id for a in Auto.query.all()]
+
+    print("Generando bloques...")
+    bloques = generar_bloques_historicos(dias, capacidad)
+    ocupacion = {b.id: b.reservas_actuales for b in bloques}
+    capacidad_bloque = {b.id: b.capacidad_max for b in bloques}
+    fechas_bloques = [b.fecha for b in bloques]
+
+    print("Generando alumnos...")
+    contraseña_hash = guard.hash_password(clave)  # un solo hash para todos los alumnos sinteticos
+    id_usuario = siguiente_id(Usuario)
+    id_alumno = siguiente_id(Alumno)
+    dni_base = 90000000 + (db.session.query(func.count(Alumno.id)).scalar() or 0)
+
+    usuarios, alumnos = [], []
+    for i in range(cantidad_alumnos):
+        dni = str(dni_base + i)
+        nombre = f"{random.choice(NOMBRES)} {random.choice(NOMBRES)}"
+        apellidos = f"{random.choice(APELLIDOS)} {random.choice(APELLIDOS)}"
+        usuarios.append({
+            "id": id_usuario + i,
+            "nombre_usuario": dni,
+            "contraseña_hash": contraseña_hash,
+            "rol": "alumno",
+        })
+        alumnos.append({
+            "id": id_alumno + i,
+            "id_usuario": id_usuario + i,
+            "nombre": nombre,
+            "apellidos": apellidos,
+            "dni": dni,
+            "telefono": f"9{random.randint(10000000, 99999999)}",
+            "email": f"alumno{dni}@correo.com",
+            "activo": True,
+        })
+    insertar(Usuario, usuarios)
+    insertar(Alumno, alumnos)
+
+    print("Generando matrículas, reservas, asistencias, tickets y pagos...")
+    matriculas, reservas, asistencias, tickets, pagos = [], [], [], [], []
+    id_matricula = siguiente_id(Matricula)
+    id_reserva = siguiente_id(Reserva)
+    id_asistencia = siguiente_id(Asistencia)
+    id_pago = siguiente_id(Pago)
+
+    for alumno in alumnos:
+        paquete = random.choice(paquetes)
+        fecha_matricula = hoy - timedelta(days=random.randint(0, dias))
+        fecha_limite = fecha_matricula + timedelta(days=30)
+
+        # Bloques dentro de la vigencia de la matricula con cupo disponible
+        desde = bisect_left(fechas_bloques, fecha_matricula)
+        hasta = bisect_left(fechas_bloques, fecha_limite + timedelta(days=1))
+        candidatos = [b for b in bloques[desde:hasta] if ocupacion[b.id] < capacidad_bloque[b.id]]
+        elegidos = sorted(
+            random.sample(candidatos, min(len(candidatos), random.randint(1, paquete.horas_total))),
+            key=lambda b: (b.fecha, b.hora_inicio)
+        )
+
+        horas_completadas = 0
+        for bloque in elegidos:
+            ocupacion[bloque.id] += 1
+            reservas.append({
+                "id": id_reserva,
+                "id_bloque": bloque.id,
+                "id_matricula": id_matricula,
+                "duracion_horas": 1,
+            })
+
+            inicio_bloque = combine_peru(bloque.fecha, bloque.hora_inicio).replace(tzinfo=None)
+            if inicio_bloque < ahora:
+                asistio = random.random() < 0.9
+                horas_completadas += 1
+                asistencias.append({
+                    "id": id_asistencia,
+                    "id_reserva": id_reserva,
+                    "asistio": asistio,
+                    "fecha_asistencia": inicio_bloque + timedelta(minutes=random.randint(0, 10)),
+                })
+                if asistio:
+                    tickets.append({
+                        "id_asistencia": id_asistencia,
+                        "numero_clase_alumno": horas_completadas,
+                        "id_instructor": random.choice(instructores),
+                        "id_auto": random.choice(autos),
+                    })
+                id_asistencia += 1
+            id_reserva += 1
+
+        # Pagos: entre uno y tres abonos, algunos incompletos
+        total_pagado = 0.0
+        for _ in range(random.randint(1, 3)):
+            monto = round(min(paquete.costo_total - total_pagado, paquete.costo_total * random.uniform(0.3, 0.7)), 2)
+            if monto <= 0:
+                break
+            total_pagado += monto
+            pagos.append({
+                "id": id_pago,
+                "id_matricula": id_matricula,
+                "monto": monto,
+                "fecha_pago": combine_peru(fecha_matricula, datetime.min.time()),
+            })
+            id_pago += 1
+
+        if horas_completadas >= paquete.horas_total:
+            estado_clases = "completado"
+        elif horas_completadas > 0:
+            estado_clases = "en_progreso"
+        else:
+            estado_clases = "pendiente"
+
+        matriculas.append({
+            "id": id_matricula,
+            "id_alumno": alumno["id"],
+            "id_paquete": paquete.id,
+            "categoria": random.choice(["A-I", "A-II"]),
+            "tipo_contratacion": "paquete",
+            "costo_total": paquete.costo_total,
+            "total_pagado": round(total_pagado, 2),
+            "saldo_pendiente": round(paquete.costo_total - total_pagado, 2),
+            "fecha_matricula": combine_peru(fecha_matricula, datetime.min.time()),
+            "fecha_limite": combine_peru(fecha_limite, datetime.max.time()),
+            "estado_pago": "completo" if total_pagado >= paquete.costo_total else "pendiente",
+            "estado_clases": estado_clases,
+            "horas_completadas": horas_completadas,
+        })
+        id_matricula += 1
+
+    insertar(Matricula, matriculas)
+    insertar(Reserva, reservas)
+    insertar(Asistencia, asistencias)
+    insertar(Ticket, tickets)
+    insertar(Pago, pagos)
+
+    # Contadores de ocupacion de los bloques en una sola sentencia
+    conteo = db.session.query(func.count(Reserva.id)).filter(
+        Reserva.id_bloque == Bloque.id
+    ).scalar_subquery()
+    db.session.query(Bloque).filter(
+        Bloque.id.in_(db.session.query(Reserva.id_bloque))
+    ).update({Bloque.reservas_actuales: conteo}, synchronize_session=False)
+    db.session.commit()
+
+    ajustar_secuencias([Usuario, Alumno, Matricula, Reserva, Asistencia, Pago])
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sinteticos para pruebas de carga")
+    parser.add_argument("--alumnos", type=int, default=3000)
+    parser.add_argument("--dias", type=int, default=365, help="dias de historia de bloques y matriculas")
+    parser.add_argument("--capacidad", type=int, default=5, help="capacidad de los bloques generados")
+    parser.add_argument("--clave", default="alumno123", help="contraseña de los alumnos generados")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    # Datos base: tipos de auto, paquetes, autos, instructores y administrador
+    poblar_db()
+
+    app = create_app()
+    with app.app_context():
+        generar_datos(args.alumnos, args.dias, args.capacidad, args.clave, args.semilla)
+        print("\n¡Datos de prueba generados!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import io
+from app.models import Alumno
+
+def importar(cliente, token_admin, contenido):
+    return cliente.post(
+        "/api/alumnos/importar",
+        data={"archivo": (io.BytesIO(contenido), "alumnos.csv")},
+        headers=token_admin,
+    )
+
+def test_importa_csv_de_excel_en_ansi(cliente, token_admin):
+    # "CSV (delimitado por comas)" de Excel en español: cp1252 y ";"
+    contenido = (
+        "nombre;apellidos;dni;telefono;email\r\n"
+        "José;Pérez Núñez;12345678;999999999;jose@correo.com\r\n"
+        "María;Ibáñez;87654321;988888888;\r\n"
+    ).encode("cp1252")
+
+    respuesta = importar(cliente, token_admin, contenido)
+
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["errores"] == []
+    assert {(a.nombre, a.apellidos) for a in Alumno.query} == {("José", "Pérez Núñez"), ("María", "Ibáñez")}
+
+def test_fila_con_bytes_invalidos_no_detiene_la_importacion(cliente, token_admin):
+    contenido = (
+        "nombre,apellidos,dni,telefono\n".encode()
+        + "José,Pérez,12345678,999999999\n".encode("utf-8")
+        + b"Ana,Ro\x81s,87654321,988888888\n"  # 0x81 no existe en UTF-8 ni en cp1252
+        + "Raúl,Quispe,11223344,977777777\n".encode("cp1252")
+    )
+
+    respuesta = importar(cliente, token_admin, contenido)
+
+    datos = respuesta.get_json()
+    assert respuesta.status_code == 200
+    assert datos["creados"] == 2
+    assert [(e["fila"], e["dni"]) for e in datos["errores"]] == [(3, "87654321")]
+    assert {a.nombre for a in Alumno.query} == {"José", "Raúl"}
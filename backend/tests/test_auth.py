@@ -0,0 +1,32 @@
+from passlib.context import CryptContext
+from app.extensions import db, guard
+from app.models import Usuario
+from app.services import hash_service
+
+def crear_usuario(contraseña_hash):
+    usuario = Usuario(nombre_usuario="usuario", contraseña_hash=contraseña_hash, rol="admin")
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+def test_pool_verifica_esquemas_no_predeterminados(bd, monkeypatch):
+    monkeypatch.setitem(hash_service._configuracion, "procesos", 1)
+    monkeypatch.setattr(hash_service, "_executor", None)
+    hash_legado = guard.pwd_ctx.handler("sha512_crypt").hash("clave123")
+    try:
+        assert hash_service.verificar_contrasena("clave123", hash_legado)
+        assert not hash_service.verificar_contrasena("otra", hash_legado)
+    finally:
+        hash_service._cerrar_executor()
+
+def test_autenticar_actualiza_hash_desactualizado(bd, monkeypatch):
+    contexto = guard.pwd_ctx.to_dict()
+    monkeypatch.setattr(guard, "pwd_ctx", CryptContext(**{**contexto, "deprecated": ["sha512_crypt"]}))
+    usuario = crear_usuario(guard.pwd_ctx.handler("sha512_crypt").hash("clave123"))
+
+    hash_service.autenticar("usuario", "clave123")
+
+    db.session.expire_all()
+    nuevo_hash = db.session.get(Usuario, usuario.id).contraseña_hash
+    assert guard.pwd_ctx.identify(nuevo_hash) == guard.pwd_ctx.default_scheme()
+    assert guard.pwd_ctx.verify("clave123", nuevo_hash)
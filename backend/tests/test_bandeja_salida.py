@@ -0,0 +1,68 @@
+import smtplib
+import pytest
+from app.extensions import db, mail
+from app.models import CorreoSaliente
+from app.datetime_utils import now_peru
+from app.services import bandeja_salida_service
+
+class ConexionFalsa:
+    def __init__(self, rechazados=()):
+        self.rechazados = rechazados
+        self.enviados = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def send(self, mensaje):
+        if mensaje.recipients[0] in self.rechazados:
+            raise smtplib.SMTPRecipientsRefused({mensaje.recipients[0]: (550, b"no existe")})
+        self.enviados.append(mensaje.recipients[0])
+
+@pytest.fixture
+def bandeja(app, bd, monkeypatch):
+    monkeypatch.setitem(app.config, "MAIL_DEFAULT_SENDER", "escuela@correo.com")
+    monkeypatch.setitem(app.config, "MAIL_LIMITE_POR_MINUTO", 0)
+    bandeja_salida_service.encolar([
+        {"destinatario": f"alumno{i}@correo.com", "asunto": "Prueba", "cuerpo": "Hola"} for i in range(3)
+    ])
+
+def reintentar_ahora():
+    db.session.query(CorreoSaliente).update({"proximo_intento": now_peru()})
+    db.session.commit()
+
+def test_caida_del_servidor_no_consume_intentos(app, bandeja, monkeypatch):
+    def conexion_rechazada():
+        raise smtplib.SMTPAuthenticationError(535, b"credenciales invalidas")
+    monkeypatch.setattr(mail, "connect", conexion_rechazada)
+
+    for _ in range(app.config["MAIL_MAX_INTENTOS"] + 2):
+        reintentar_ahora()
+        bandeja_salida_service.procesar_correos()
+
+    db.session.expire_all()
+    correos = CorreoSaliente.query.all()
+    assert {correo.estado for correo in correos} == {"pendiente"}
+    assert {correo.intentos for correo in correos} == {0}
+    assert all("credenciales" in correo.ultimo_error for correo in correos)
+
+    conexion = ConexionFalsa()
+    monkeypatch.setattr(mail, "connect", lambda: conexion)
+    reintentar_ahora()
+    assert bandeja_salida_service.procesar_correos()["enviados"] == 3
+
+def test_rechazo_del_destinatario_cuenta_como_intento(app, bandeja, monkeypatch):
+    conexion = ConexionFalsa(rechazados={"alumno1@correo.com"})
+    monkeypatch.setattr(mail, "connect", lambda: conexion)
+
+    for _ in range(app.config["MAIL_MAX_INTENTOS"]):
+        reintentar_ahora()
+        bandeja_salida_service.procesar_correos()
+
+    db.session.expire_all()
+    rechazado = CorreoSaliente.query.filter_by(destinatario="alumno1@correo.com").one()
+    assert rechazado.estado == "fallido"
+    assert rechazado.intentos == app.config["MAIL_MAX_INTENTOS"]
+    assert sorted(set(conexion.enviados)) == ["alumno0@correo.com", "alumno2@correo.com"]
@@ -0,0 +1,40 @@
+import pytest
+from app.services.admin_tareas_service import obtener_horarios_bloques
+
+def test_horarios_aceptan_dias_con_tildes(app, monkeypatch):
+    monkeypatch.setitem(app.config, "HORARIOS_BLOQUES", {"Miércoles": "07:00-09:00", "sábado": "08:00-09:00"})
+    with app.app_context():
+        horarios = obtener_horarios_bloques()
+    assert sorted(horarios) == [2, 5]
+    assert len(horarios[2]) == 2
+
+def test_horarios_rechazan_dias_desconocidos(app, monkeypatch):
+    monkeypatch.setitem(app.config, "HORARIOS_BLOQUES", {"feriado": "07:00-09:00"})
+    with app.app_context(), pytest.raises(ValueError, match="feriado"):
+        obtener_horarios_bloques()
+
+def limpiar(cliente, **parametros):
+    return cliente.post(
+        "/api/admin-tareas/limpiar-bloques", json=parametros,
+        headers={"Authorization": f"Bearer {cliente.application.config['CRON_API_TOKEN']}"},
+    )
+
+@pytest.mark.parametrize("parametros", [
+    {"dias_por_lote": "30"}, {"dias_por_lote": None}, {"dias_por_lote": 0}, {"max_lotes": -1}, {"max_lotes": 10**6},
+])
+def test_limpiar_bloques_rechaza_parametros_invalidos(cliente, parametros):
+    respuesta = limpiar(cliente, **parametros)
+    assert respuesta.status_code == 400
+    assert list(parametros)[0] in respuesta.get_json()["error"]
+
+def test_limpiar_bloques_solo_reporta_pendientes_si_quedan(cliente, crear_bloque):
+    crear_bloque(dias=-40)
+    respuesta = limpiar(cliente, dias_por_lote=5, max_lotes=1).get_json()
+    assert respuesta["bloques_eliminados"] == 1
+    assert respuesta["quedan_pendientes"] is False
+
+    crear_bloque(dias=-40)
+    crear_bloque(dias=-10)
+    respuesta = limpiar(cliente, dias_por_lote=5, max_lotes=1).get_json()
+    assert respuesta["bloques_eliminados"] == 1
+    assert respuesta["quedan_pendientes"] is True
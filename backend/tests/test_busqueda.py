@@ -0,0 +1,28 @@
+import pytest
+from app.models import Alumno
+from app.services import busqueda_service
+
+def buscar(termino):
+    return Alumno.query.filter(busqueda_service.filtro_alumnos(termino)).order_by(Alumno.id).all()
+
+def test_busqueda_sin_tildes(crear_matriculas):
+    alumno = crear_matriculas(3)[1].alumno
+    alumno.nombre = "José"
+    assert [encontrado.id for encontrado in buscar("JOSE prueba")] == [alumno.id]
+
+def test_termino_corto_busca_inicio_de_palabra(crear_matriculas):
+    alumnos = [matricula.alumno for matricula in crear_matriculas(3)]
+    alumnos[1].apellidos = "Wang Lí"
+    alumnos[2].nombre = "Ye"
+    assert buscar("li") == [alumnos[1]]
+    assert buscar("YE") == [alumnos[2]]
+    assert buscar("mn") == []  # "alumno" la contiene, pero no al inicio de una palabra
+    assert len(buscar("alu")) == 3
+
+def test_muchas_coincidencias_no_se_truncan(app, crear_matriculas, monkeypatch):
+    if busqueda_service._usa_trigramas():
+        pytest.skip("la base tiene pg_trgm, no usa el indice en memoria")
+    monkeypatch.setitem(app.config, "BUSQUEDA_MAX_RESULTADOS", 2)
+    ids = [matricula.id_alumno for matricula in crear_matriculas(5)]
+    assert [alumno.id for alumno in buscar("alumno")] == sorted(ids)
+    assert [alumno.id for alumno in buscar("alumno3")] == [ids[3]]
@@ -0,0 +1,114 @@
+from datetime import timedelta
+import pytest
+from sqlalchemy import event, text
+from app.extensions import db
+from app.datetime_utils import today_peru
+from app.services import admin_tareas_service, bloque_service, pago_service, reserva_service, ticket_service
+
+# Regresion de los indices de c3f1a7d2e9b4: con un volumen parecido al de produccion, las
+# consultas frecuentes no deben recorrer completas las tablas que filtran.
+
+SEMILLA = """
+INSERT INTO tipos_auto (id, tipo) VALUES (1, 'mecánico');
+INSERT INTO paquetes (id, nombre, id_tipo_auto, horas_total, costo_total) VALUES (1, 'Básico', 1, 10, 500);
+INSERT INTO instructores (id, nombre, apellidos, dni, telefono) VALUES (1, 'Instructor', 'Prueba', '00000001', '999999999');
+
+INSERT INTO usuarios (id, nombre_usuario, contraseña_hash, rol)
+SELECT i, 'alumno' || i, 'hash', 'alumno' FROM generate_series(1, :alumnos) i;
+
+INSERT INTO alumnos (id, id_usuario, nombre, apellidos, dni, telefono, email)
+SELECT i, i, 'Alumno' || i, 'Prueba', lpad(i::text, 8, '0'), '999999999', 'alumno' || i || '@correo.com'
+FROM generate_series(1, :alumnos) i;
+
+-- Solo las matriculas recientes siguen activas, como en la historia real de la escuela
+INSERT INTO matriculas (id, id_alumno, id_paquete, categoria, tipo_contratacion, costo_total,
+                        total_pagado, saldo_pendiente, fecha_limite, estado_pago, estado_clases, horas_completadas)
+SELECT i, i, 1, 'A-I', 'paquete', 500, 500, 0,
+       CAST(:hoy AS date) + (i - :alumnos + 60),
+       'completo',
+       CASE WHEN i > :alumnos - 150 THEN 'en_progreso' ELSE 'completado' END,
+       10
+FROM generate_series(1, :alumnos) i;
+
+INSERT INTO pagos (id_matricula, monto)
+SELECT 1 + i % :alumnos, 250 FROM generate_series(1, :alumnos * 2) i;
+
+INSERT INTO bloques (id, fecha, hora_inicio, hora_fin, capacidad_max, reservas_actuales)
+SELECT d * 11 + h + 1, CAST(:hoy AS date) - 1000 + d, make_time(7 + h, 0, 0), make_time(8 + h, 0, 0), 5, 4
+FROM generate_series(0, 1030) d, generate_series(0, 10) h;
+
+INSERT INTO reservas (id, id_bloque, id_matricula, duracion_horas)
+SELECT i, 1 + i % (1031 * 11), 1 + i % :alumnos, 1 FROM generate_series(1, 1031 * 11 * 4) i;
+
+INSERT INTO asistencias (id, id_reserva, asistio, fecha_asistencia)
+SELECT r.id, r.id, true, b.fecha + b.hora_inicio
+FROM reservas r JOIN bloques b ON b.id = r.id_bloque
+WHERE b.fecha < CAST(:hoy AS date);
+
+INSERT INTO tickets (id_asistencia, numero_clase_alumno, id_instructor)
+SELECT id, 1, 1 FROM asistencias;
+"""
+
+TABLAS_INDEXADAS = {"bloques", "reservas", "pagos", "matriculas", "asistencias"}
+
+@pytest.fixture
+def datos_realistas(bd):
+    # generate_series y make_time: la semilla solo corre en PostgreSQL
+    for sentencia in SEMILLA.split(";"):
+        if sentencia.strip():
+            db.session.execute(text(sentencia), {"alumnos": 5000, "hoy": today_peru()})
+    db.session.commit()
+    for tabla in ("usuarios", "alumnos", "matriculas", "pagos", "bloques", "reservas", "asistencias", "tickets"):
+        db.session.execute(text(f"ANALYZE {tabla}"))
+    db.session.commit()
+
+def capturar_consultas(funcion):
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            consultas.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", registrar)
+    return consultas
+
+def recorridos_secuenciales(plan):
+    nodos = [plan]
+    while nodos:
+        nodo = nodos.pop()
+        if nodo["Node Type"] == "Seq Scan":
+            yield nodo["Relation Name"]
+        nodos.extend(nodo.get("Plans", []))
+
+def lunes_actual():
+    hoy = today_peru()
+    return hoy - timedelta(days=hoy.weekday())
+
+CONSULTAS = {
+    "bloques de la semana": lambda: bloque_service.listar_bloques_semana(lunes_actual()),
+    "fecha limite del alumno": lambda: bloque_service.obtener_fecha_limite_alumno(4990),
+    "pagos de una matricula": lambda: pago_service.consulta_pagos(id_matricula=4990).all(),
+    "reservas de hoy": reserva_service.listar_reservas_hoy,
+    "reservas de la semana del alumno": lambda: reserva_service.listar_reservas(id_alumno=4990, semana_offset=0),
+    "recordatorios de clases": admin_tareas_service.verificar_clases_reservadas,
+    "tickets de la semana": lambda: ticket_service.consulta_tickets_admin(
+        fecha_inicio=lunes_actual() - timedelta(days=7), fecha_fin=lunes_actual()
+    ).limit(20).all(),
+}
+
+def test_consultas_frecuentes_usan_indices(datos_realistas):
+    conexion = db.session.connection()
+    errores = []
+    for nombre, funcion in CONSULTAS.items():
+        consultas = capturar_consultas(funcion)
+        assert consultas, nombre
+        for sentencia, parametros in consultas:
+            plan = conexion.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sentencia}", parametros).scalar()[0]["Plan"]
+            recorridas = TABLAS_INDEXADAS.intersection(recorridos_secuenciales(plan))
+            if recorridas:
+                errores.append(f"{nombre}: Seq Scan sobre {sorted(recorridas)}\n{sentencia}")
+    assert not errores, "\n\n".join(errores)
@@ -0,0 +1,30 @@
+from collections import Counter
+import pytest
+from flask import g
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from app.extensions import db
+from app import instrumentacion_sql
+
+@pytest.fixture
+def instrumentado(app, bd):
+    event.listen(db.engine, "before_cursor_execute", instrumentacion_sql._antes_de_ejecutar)
+    event.listen(db.engine, "after_cursor_execute", instrumentacion_sql._despues_de_ejecutar)
+    yield
+    event.remove(db.engine, "before_cursor_execute", instrumentacion_sql._antes_de_ejecutar)
+    event.remove(db.engine, "after_cursor_execute", instrumentacion_sql._despues_de_ejecutar)
+
+def test_sentencias_fallidas_no_dejan_inicios_en_la_conexion(app, instrumentado):
+    with app.test_request_context():
+        g.sql_estadisticas = {
+            "consultas": 0, "tiempo_ms": 0.0, "mas_lenta_ms": 0.0, "mas_lenta": None, "repeticiones": Counter(),
+        }
+        conexion = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(DBAPIError), db.session.begin_nested():
+                db.session.execute(text("SELECT * FROM tabla_inexistente"))
+        db.session.execute(text("SELECT 1"))
+
+        assert g.sql_estadisticas["repeticiones"]["SELECT 1"] == 1
+        assert "tabla_inexistente" not in str(g.sql_estadisticas["repeticiones"])
+        assert not conexion.info.get("sql_inicio")
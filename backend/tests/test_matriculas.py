@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Pago
+
+@contextmanager
+def contar_consultas(tablas):
+    """Cuenta las sentencias que tocan alguna de las tablas (ignora la autenticacion)"""
+    contador = {"consultas": 0}
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if any(tabla in statement for tabla in tablas):
+            contador["consultas"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(db.engine, "before_cursor_execute", registrar)
+
+def test_listar_matriculas_usa_consultas_constantes(cliente, crear_matriculas, token_admin):
+    for i, matricula in enumerate(crear_matriculas(120)):
+        db.session.add_all(Pago(id_matricula=matricula.id, monto=50.0 + i) for _ in range(i % 3))
+    db.session.commit()
+    db.session.remove()
+
+    # Primera peticion: carga el usuario y la lista de tokens revocados
+    cliente.get("/api/matriculas/?per_page=1", headers=token_admin)
+
+    consultas = {}
+    for per_page in (5, 20, 100):
+        with contar_consultas(("matriculas", "alumnos", "paquetes", "tipos_auto", "pagos")) as contador:
+            respuesta = cliente.get(f"/api/matriculas/?per_page={per_page}", headers=token_admin)
+        assert respuesta.status_code == 200
+        assert len(respuesta.get_json()["matriculas"]) == per_page
+        consultas[per_page] = contador["consultas"]
+
+    assert len(set(consultas.values())) == 1, consultas
+    assert consultas[100] <= 2  # total y pagina
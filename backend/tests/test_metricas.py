@@ -0,0 +1,10 @@
+def test_metricas_requieren_token(app, cliente, monkeypatch):
+    assert cliente.get("/api/metrics").status_code == 404
+
+    monkeypatch.setitem(app.config, "METRICAS_TOKEN", "token-metricas")
+    assert cliente.get("/api/metrics").status_code == 403
+    assert cliente.get("/api/metrics", headers={"Authorization": "Bearer otro"}).status_code == 403
+
+    respuesta = cliente.get("/api/metrics", headers={"Authorization": "Bearer token-metricas"})
+    assert respuesta.status_code == 200
+    assert b"http_request" in respuesta.data
@@ -0,0 +1,26 @@
+import pytest
+from app.models import Alumno, Matricula
+from app.paginacion import estimar_total, paginar_por_cursor
+
+def test_estimar_total_con_filtro_in(crear_matriculas):
+    ids = [matricula.id_alumno for matricula in crear_matriculas(5)]
+    query = Alumno.query.filter(Alumno.id.in_(ids[:3]))
+    assert estimar_total(query) >= 1
+
+def test_paginar_por_cursor_con_total_estimado(crear_matriculas):
+    ids = [matricula.id for matricula in crear_matriculas(5)]
+    pagina = paginar_por_cursor(
+        Matricula.query.filter(Matricula.id.in_(ids)),
+        [(Matricula.id, True)], lambda matricula: (matricula.id,),
+        per_page=2, total="estimado",
+    )
+    assert [matricula.id for matricula in pagina.items] == sorted(ids, reverse=True)[:2]
+    assert pagina.total >= 1
+
+@pytest.mark.parametrize("per_page", [0, -5])
+def test_per_page_menor_a_uno_devuelve_una_fila(cliente, crear_matriculas, token_admin, per_page):
+    crear_matriculas(3)
+    for parametros in (f"cursor=&per_page={per_page}", f"page=1&per_page={per_page}"):
+        respuesta = cliente.get(f"/api/alumnos/?{parametros}", headers=token_admin)
+        assert respuesta.status_code == 200, parametros
+        assert len(respuesta.get_json()["alumnos"]) == 1
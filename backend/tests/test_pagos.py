@@ -0,0 +1,38 @@
+import re
+import pytest
+from sqlalchemy import event
+from werkzeug.exceptions import BadRequest
+from app.extensions import db
+from app.services.pago_service import crear_pago
+
+def test_pagos_actualizan_saldo_y_estado(crear_matriculas):
+    matricula, = crear_matriculas(1)
+
+    crear_pago({"id_matricula": matricula.id, "monto": 300.0})
+    db.session.refresh(matricula)
+    assert (matricula.total_pagado, matricula.saldo_pendiente, matricula.estado_pago) == (300.0, 200.0, "pendiente")
+
+    with pytest.raises(BadRequest):
+        crear_pago({"id_matricula": matricula.id, "monto": 250.0})
+
+    crear_pago({"id_matricula": matricula.id, "monto": 200.0})
+    db.session.refresh(matricula)
+    assert (matricula.total_pagado, matricula.saldo_pendiente, matricula.estado_pago) == (500.0, 0.0, "completo")
+
+def test_estado_se_asigna_antes_que_el_saldo(crear_matriculas):
+    # MySQL evalua el SET de izquierda a derecha: el CASE debe ver el saldo anterior
+    matricula, = crear_matriculas(1)
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE matriculas"):
+            sentencias.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    try:
+        crear_pago({"id_matricula": matricula.id, "monto": 100.0})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", registrar)
+
+    asignaciones = re.findall(r"(\w+)=", sentencias[0].split(" WHERE ")[0])
+    assert asignaciones.index("estado_pago") < asignaciones.index("saldo_pendiente")
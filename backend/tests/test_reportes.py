@@ -0,0 +1,60 @@
+from threading import Event, Thread
+from app.extensions import db
+from app.models import ReporteSnapshot, Auto
+from app.services import reporte_service
+
+def test_escritura_durante_el_refresco_no_espera_y_lo_descarta(app, bd, monkeypatch):
+    reporte_service.obtener_reporte_admin_snapshot()
+    calculando = Event()
+    escrito = Event()
+
+    def escribir():
+        with app.app_context():
+            calculando.wait(5)
+            db.session.add(Auto(placa="ABC-123", marca="Toyota", modelo="Yaris"))
+            reporte_service.invalidar_reporte_admin()
+            db.session.commit()
+            db.session.remove()
+            escrito.set()
+
+    def calculo_lento():
+        calculando.set()
+        # La escritura termina mientras el reporte se sigue calculando
+        assert escrito.wait(5)
+        return {"estadisticas_generales": {}}
+
+    escritura = Thread(target=escribir)
+    escritura.start()
+    monkeypatch.setattr(reporte_service, "obtener_reporte_admin", calculo_lento)
+    resultado = reporte_service.refrescar_reporte_admin()
+    escritura.join()
+
+    assert not resultado["vigente"]
+    db.session.expire_all()
+    snapshot = ReporteSnapshot.query.one()
+    assert snapshot.generacion_datos != snapshot.generacion
+
+def test_snapshot_vigente_no_se_recalcula(bd, monkeypatch):
+    primero = reporte_service.obtener_reporte_admin_snapshot()
+    monkeypatch.setattr(reporte_service, "obtener_reporte_admin", lambda: {"recalculado": True})
+
+    segundo = reporte_service.obtener_reporte_admin_snapshot()
+    assert "recalculado" not in segundo
+    assert segundo["snapshot"]["generado"] == primero["snapshot"]["generado"]
+
+    reporte_service.invalidar_reporte_admin()
+    db.session.commit()
+    tercero = reporte_service.obtener_reporte_admin_snapshot()
+    assert tercero["recalculado"]
+    assert tercero["snapshot"]["vigente"]
+
+def test_rollback_no_invalida_el_snapshot(bd, monkeypatch):
+    reporte_service.obtener_reporte_admin_snapshot()
+    db.session.add(Auto(placa="ABC-123", marca="Toyota", modelo="Yaris"))
+    db.session.flush()
+    reporte_service.invalidar_reporte_admin()
+    db.session.rollback()
+    db.session.commit()
+
+    monkeypatch.setattr(reporte_service, "obtener_reporte_admin", lambda: {"recalculado": True})
+    assert "recalculado" not in reporte_service.obtener_reporte_admin_snapshot()
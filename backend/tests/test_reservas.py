@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from werkzeug.exceptions import BadRequest
+from app.extensions import db
+from app.models import Bloque, Reserva
+from app.services.reserva_service import crear_reservas, eliminar_reservas
+
+SOLICITUDES = 20
+
+def test_reservas_concurrentes_no_exceden_la_capacidad(app, crear_matriculas, crear_bloque):
+    bloque = crear_bloque(capacidad=5)
+    id_bloque = bloque.id
+    ids_matriculas = [matricula.id for matricula in crear_matriculas(SOLICITUDES)]
+    barrera = Barrier(SOLICITUDES)
+
+    def reservar(id_matricula):
+        with app.app_context():
+            barrera.wait()
+            try:
+                crear_reservas({"id_matricula": id_matricula, "reservas": [{"id_bloque": id_bloque}]}, por_admin=True)
+                return True
+            except BadRequest:
+                db.session.rollback()
+                return False
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(SOLICITUDES) as ejecutor:
+        resultados = list(ejecutor.map(reservar, ids_matriculas))
+
+    db.session.expire_all()
+    assert sum(resultados) == 5
+    assert db.session.get(Bloque, id_bloque).reservas_actuales == 5
+    assert Reserva.query.filter_by(id_bloque=id_bloque).count() == 5
+
+def test_eliminar_reservas_del_mismo_bloque_descuenta_cada_una(crear_matriculas, crear_bloque):
+    matricula, = crear_matriculas(1)
+    bloque = crear_bloque()
+    # Reservas duplicadas del mismo bloque (no las bloquea ninguna restriccion)
+    reservas = [Reserva(id_bloque=bloque.id, id_matricula=matricula.id) for _ in range(2)]
+    bloque.reservas_actuales = 2
+    db.session.add_all(reservas)
+    db.session.commit()
+
+    eliminar_reservas({"id_matricula": matricula.id, "ids_reservas": [reserva.id for reserva in reservas]}, por_admin=True)
+
+    db.session.expire_all()
+    assert db.session.get(Bloque, bloque.id).reservas_actuales == 0
+
+def reconciliar(cliente, **parametros):
+    return cliente.post(
+        "/api/admin-tareas/reconciliar-reservas", json=parametros,
+        headers={"Authorization": f"Bearer {cliente.application.config['CRON_API_TOKEN']}"},
+    )
+
+def test_reconciliar_corrige_el_contador(cliente, crear_bloque):
+    bloque = crear_bloque()
+    bloque.reservas_actuales = 3
+    db.session.commit()
+
+    respuesta = reconciliar(cliente).get_json()
+    assert (respuesta["total"], respuesta["corregidos"]) == (1, 1)
+    db.session.expire_all()
+    assert db.session.get(Bloque, bloque.id).reservas_actuales == 0
+
+def test_reconciliar_rechaza_parametros_invalidos(cliente):
+    for parametros in ({"dias": "7"}, {"dias": -1}, {"limite": None}, {"limite": 10**6}):
+        respuesta = reconciliar(cliente, **parametros)
+        assert respuesta.status_code == 400, parametros
+        assert list(parametros)[0] in respuesta.get_json()["error"]